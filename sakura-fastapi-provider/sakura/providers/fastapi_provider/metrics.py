@@ -0,0 +1,37 @@
+import time
+
+from sakura.metrics import instruments
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request.
+    Requests are labelled by endpoint function rather than raw path to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            endpoint = scope.get("endpoint")
+            instruments.http_request_duration.labels(
+                scope["method"],
+                getattr(endpoint, "__name__", "unknown"),
+                str(status),
+            ).observe(time.perf_counter() - start)
@@ -1,29 +1,58 @@
+import asyncio
 import functools
 import logging
 import signal
+import socket
 import typing
 from typing import Any, Optional
 
 import fastapi
 import pydantic
 import uvicorn
+from fastapi.responses import Response
 from uvicorn import Config, Server
 
 from sakura.logging.loguru import InterceptHandler
+from sakura.metrics import REGISTRY, PrometheusExporter
 from sakura.providers import Provider
+from sakura.providers.fastapi_provider.metrics import MetricsMiddleware
 from sakura.settings import SakuraBaseSettings
+from sakura.supervisor import current_worker
 from sakura.utils.decorators import DynamicSelfFunc
 
 logger = logging.getLogger(__name__)
 
 
+class ReadyServer(Server):
+    """
+    A uvicorn server that reports once it listens, so the lifecycle knows when it accepts traffic.
+    """
+
+    def __init__(self, config: Config, on_started: typing.Callable[[], None]):
+        super().__init__(config=config)
+        self.on_started = on_started
+
+    async def startup(self, sockets: Optional[list[socket.socket]] = None):
+        await super().startup(sockets=sockets)
+        if self.started:
+            self.on_started()
+
+
 class FastAPIProvider(Provider):
     server: Optional[Server] = None
+    metrics_server: Optional[Server] = None
 
     class Settings(SakuraBaseSettings):
         extra: dict = pydantic.Field(default_factory=dict)
         port: int = "8080"
         title: str = "FastAPI"
+        # Serves the metrics registry and records request durations when set, e.g. to "/metrics"
+        metrics_path: Optional[str] = None
+        # In worker mode every worker serves its own registry, with a `worker` label on each series. Requests to
+        # `port` reach a random worker, so each one also serves `metrics_path` on `metrics_port` + its index,
+        # which makes one scrape target per worker
+        metrics_port: Optional[int] = None
+        reuse_port: bool = False
 
     def __init__(self, settings: Settings):
         self.settings = settings
@@ -32,6 +61,11 @@ class FastAPIProvider(Provider):
             **settings.extra,
         )
 
+        self.exporter = PrometheusExporter()
+        if settings.metrics_path:
+            self.app.add_middleware(MetricsMiddleware)
+            self.app.add_api_route(settings.metrics_path, self.metrics, methods=["GET"], include_in_schema=False)
+
         def deco(func):
             def wildcard_method(*args, **kwargs):
                 result = func(*args, **kwargs)
@@ -42,6 +76,9 @@ class FastAPIProvider(Provider):
         for method in ["get", "post", "put", "delete"]:
             self.app.__setattr__(method, deco(self.app.__getattribute__(method)))
 
+    def metrics(self) -> Response:
+        return Response(self.exporter.export(REGISTRY), media_type=self.exporter.content_type)
+
     def setup(self) -> typing.Coroutine:
         # TODO: make sure that Config is running on the same event loop as the other services
         config = Config(
@@ -50,7 +87,9 @@ class FastAPIProvider(Provider):
             port=self.settings.port,
         )
 
-        self.server = Server(config=config)
+        self.server = ReadyServer(config=config, on_started=self.notify_ready)
+        if self.settings.metrics_path and (worker := current_worker()) is not None:
+            self.setup_worker_metrics(worker.index)
         logging.getLogger("uvicorn").removeHandler(logging.getLogger("uvicorn").handlers[0])
         logging.getLogger("uvicorn.access").removeHandler(logging.getLogger("uvicorn.access").handlers[0])
 
@@ -62,10 +101,48 @@ class FastAPIProvider(Provider):
 
         logger.info("Starting fastapi_provider server")
 
-        return self.server.serve()
+        return self.serve()
+
+    def setup_worker_metrics(self, index: int):
+        self.exporter = PrometheusExporter(const_labels={"worker": str(index)})
+        if self.settings.metrics_port is None:
+            logger.warning(f"Each worker serves only its own metrics on {self.settings.metrics_path}, and requests "
+                           f"to port {self.settings.port} reach a random worker. Set metrics_port to scrape each "
+                           f"worker on its own port")
+            return
+
+        metrics_app = fastapi.FastAPI()
+        metrics_app.add_api_route(self.settings.metrics_path, self.metrics, methods=["GET"], include_in_schema=False)
+        self.metrics_server = Server(Config(
+            metrics_app,
+            host=self.server.config.host,
+            port=self.settings.metrics_port + index,
+            # The uvicorn loggers were set up with the main server's config already
+            log_config=None,
+        ))
+
+    async def serve(self):
+        sockets = None
+        # Every worker binds its own SO_REUSEPORT socket, so the kernel balances connections between them
+        if self.settings.reuse_port or current_worker() is not None:
+            sockets = [self.bind_reuse_port_socket()]
+
+        servers = [self.server.serve(sockets=sockets)]
+        if self.metrics_server is not None:
+            servers.append(self.metrics_server.serve())
+        await asyncio.gather(*servers)
+
+    def bind_reuse_port_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((self.server.config.host, self.server.config.port))
+        return sock
 
     async def teardown(self):
         self.server.handle_exit(sig=signal.SIGINT, frame=None)
+        if self.metrics_server is not None:
+            self.metrics_server.handle_exit(sig=signal.SIGINT, frame=None)
 
     def get_dependency(self) -> Any:
         return self.app
@@ -1,2 +1,42 @@
+import importlib.metadata
+
+from sakura import supervisor
+from sakura.providers.fastapi_provider.metrics import MetricsMiddleware
+from sakura.providers.fastapi_provider.provider import FastAPIProvider
+from sakura.supervisor import WorkerInfo
+
+
 def test_provider():
     assert True
+
+
+def test_provider_registers_through_its_entry_point():
+    distribution = importlib.metadata.distribution("sakura-fastapi-provider")
+    entry_points = [entry_point for entry_point in distribution.entry_points if entry_point.group == "sakura.providers"]
+
+    assert [entry_point.load() for entry_point in entry_points] == [FastAPIProvider]
+
+
+def test_metrics_are_opt_in():
+    default = FastAPIProvider(FastAPIProvider.Settings())
+    enabled = FastAPIProvider(FastAPIProvider.Settings(metrics_path="/metrics"))
+
+    def middleware(provider):
+        return [item.cls for item in provider.app.user_middleware]
+
+    def paths(provider):
+        return {route.path for route in provider.app.routes}
+
+    assert MetricsMiddleware not in middleware(default)
+    assert "/metrics" not in paths(default)
+    assert MetricsMiddleware in middleware(enabled)
+    assert "/metrics" in paths(enabled)
+
+
+def test_workers_serve_labelled_metrics_on_their_own_port(monkeypatch):
+    monkeypatch.setattr(supervisor, "_current_worker", WorkerInfo(index=1, count=2))
+    provider = FastAPIProvider(FastAPIProvider.Settings(metrics_path="/metrics", metrics_port=9100))
+    provider.setup().close()
+
+    assert provider.metrics_server.config.port == 9100 + 1
+    assert provider.exporter.const_labels == {"worker": "1"}
@@ -0,0 +1,61 @@
+"""
+Runs the hot path benchmarks against the in-process fake AMQP transport.
+
+    python -m benchmarks --output bench.json
+    python -m benchmarks --compare bench.json --max-regression 0.1
+"""
+import argparse
+import asyncio
+import dataclasses
+import json
+import platform
+import sys
+from pathlib import Path
+
+from benchmarks import hotpaths  # noqa: F401
+from benchmarks.harness import BENCHMARKS, compare, run
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=1000)
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this string")
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this file")
+    parser.add_argument("--compare", type=Path, help="JSON results of a previous run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="allowed throughput drop (fraction)")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = asyncio.run(run(names, args.iterations, args.warmup))
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "iterations": args.iterations,
+        },
+        "results": {result.name: dataclasses.asdict(result) for result in results},
+    }
+
+    for result in results:
+        sys.stdout.write(
+            f"{result.name:<28} {result.ops_per_sec:>12,.0f} ops/s"
+            f"   p50 {result.p50_us:>8.2f}us   p99 {result.p99_us:>8.2f}us\n",
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())["results"]
+        if regressions := compare(results, baseline, args.max_regression):
+            sys.stdout.write("Regressions:\n" + "\n".join(regressions) + "\n")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
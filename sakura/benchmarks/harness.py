@@ -0,0 +1,117 @@
+import asyncio
+import dataclasses
+import gc
+import statistics
+import time
+from collections.abc import Awaitable
+from typing import Callable, Union
+
+BenchmarkFunc = Callable[[], Union[None, Awaitable[None]]]
+
+BENCHMARKS: dict[str, Callable[[], Awaitable["BenchmarkCase"]]] = {}
+
+
+@dataclasses.dataclass
+class BenchmarkCase:
+    """
+    An operation to measure, with an optional teardown run once measuring is done.
+    """
+    operation: BenchmarkFunc
+    teardown: Callable[[], Awaitable[None]] = None
+
+
+@dataclasses.dataclass
+class BenchmarkResult:
+    name: str
+    iterations: int
+    ops_per_sec: float
+    mean_us: float
+    p50_us: float
+    p99_us: float
+
+
+def benchmark(name: str):
+    def decorator(factory: Callable[[], Awaitable[BenchmarkCase]]):
+        BENCHMARKS[name] = factory
+        return factory
+
+    return decorator
+
+
+def summarize(name: str, samples_ns: list[int], elapsed: float) -> BenchmarkResult:
+    samples_ns = sorted(samples_ns)
+    quantiles = statistics.quantiles(samples_ns, n=100, method="inclusive")
+    return BenchmarkResult(
+        name=name,
+        iterations=len(samples_ns),
+        ops_per_sec=len(samples_ns) / elapsed,
+        mean_us=statistics.fmean(samples_ns) / 1000,
+        p50_us=quantiles[49] / 1000,
+        p99_us=quantiles[98] / 1000,
+    )
+
+
+async def measure(name: str, operation: BenchmarkFunc, iterations: int, warmup: int) -> BenchmarkResult:
+    is_async = asyncio.iscoroutinefunction(operation)
+
+    for _ in range(warmup):
+        if is_async:
+            await operation()
+        else:
+            operation()
+
+    samples_ns = [0] * iterations
+    perf_counter_ns = time.perf_counter_ns
+
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for i in range(iterations):
+            op_start = perf_counter_ns()
+            if is_async:
+                await operation()
+            else:
+                operation()
+            samples_ns[i] = perf_counter_ns() - op_start
+        elapsed = time.perf_counter() - start
+    finally:
+        gc.enable()
+
+    return summarize(name, samples_ns, elapsed)
+
+
+async def run(names: list[str], iterations: int, warmup: int) -> list[BenchmarkResult]:
+    results = []
+    for name in names:
+        case = await BENCHMARKS[name]()
+        try:
+            results.append(await measure(name, case.operation, iterations, warmup))
+        finally:
+            if case.teardown:
+                await case.teardown()
+
+    return results
+
+
+def compare(
+    results: list[BenchmarkResult],
+    baseline: dict[str, dict],
+    max_regression: float,
+) -> list[str]:
+    """
+    Returns a description of every benchmark whose throughput dropped by more than `max_regression`
+    (a fraction) compared to the baseline run.
+    """
+    regressions = []
+    for result in results:
+        if (previous := baseline.get(result.name)) is None:
+            continue
+
+        change = result.ops_per_sec / previous["ops_per_sec"] - 1
+        if change < -max_regression:
+            regressions.append(
+                f"{result.name}: {previous['ops_per_sec']:.0f} -> {result.ops_per_sec:.0f} ops/s ({change:+.1%})",
+            )
+
+    return regressions
@@ -0,0 +1,187 @@
+import datetime
+from typing import Optional
+
+import aio_pika
+import pydantic
+
+from benchmarks.harness import BenchmarkCase, benchmark
+from sakura.codecs import get_decoder, get_encoder
+from sakura.inmemory import InMemoryClient
+from sakura.metrics import MetricsRegistry
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Exchange, Queue
+from sakura.tests.fake_amqp import FakeIncomingMessage, FakeRabbitMQClient
+from sakura.tests.mocks import PassthroughApp
+from sakura.utils.decorators import DynamicSelfFunc
+
+PAYLOAD = {
+    "id": 1234,
+    "name": "order-created",
+    "tags": ["a", "b", "c"],
+    "amount": 99.5,
+    "customer": {"id": 42, "email": "customer@example.com", "vip": False},
+}
+
+
+class Order(pydantic.BaseModel):
+    id: int  # noqa: A003
+    name: str
+    amount: float
+    created_at: datetime.datetime
+    tags: list[str]
+
+
+ORDER = Order(
+    id=1234,
+    name="order-created",
+    amount=99.5,
+    created_at=datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc),
+    tags=["a", "b", "c"],
+)
+
+
+async def _client() -> FakeRabbitMQClient:
+    client = FakeRabbitMQClient()
+    await client.setup()
+    return client
+
+
+@benchmark("encode.json_dict")
+async def encode_json_dict() -> BenchmarkCase:
+    client = await _client()
+
+    async def operation():
+        await client.create_message_from_payload(PAYLOAD)
+
+    return BenchmarkCase(operation, client.close)
+
+
+@benchmark("encode.json_pydantic")
+async def encode_json_pydantic() -> BenchmarkCase:
+    client = await _client()
+
+    async def operation():
+        await client.create_message_from_payload(ORDER)
+
+    return BenchmarkCase(operation, client.close)
+
+
+@benchmark("decode.json")
+async def decode_json() -> BenchmarkCase:
+    decoder = get_decoder("application/json")
+    body = get_encoder("application/json").encode(PAYLOAD)
+    return BenchmarkCase(lambda: decoder.decode(body))
+
+
+@benchmark("decode.msgpack")
+async def decode_msgpack() -> BenchmarkCase:
+    decoder = get_decoder("application/msgpack")
+    body = get_encoder("application/msgpack").encode(PAYLOAD)
+    return BenchmarkCase(lambda: decoder.decode(body))
+
+
+@benchmark("produce")
+async def produce() -> BenchmarkCase:
+    client = await _client()
+    exchange = Exchange("bench")
+
+    async def operation():
+        await client.produce(exchange, "bench", PAYLOAD)
+
+    return BenchmarkCase(operation, client.close)
+
+
+@benchmark("produce_many.100")
+async def produce_many() -> BenchmarkCase:
+    client = await _client()
+    exchange = Exchange("bench")
+    payloads = [PAYLOAD] * 100
+
+    async def operation():
+        await client.produce_many(exchange, "bench", payloads)
+
+    return BenchmarkCase(operation, client.close)
+
+
+@benchmark("inmemory.produce")
+async def inmemory_produce() -> BenchmarkCase:
+    client = InMemoryClient(broker="bench")
+    await client.setup()
+    queue = Queue("bench", exchange=Exchange("bench"), routing_key="bench")
+    rmq_queue = client.broker.declare_queue(queue)
+
+    async def operation():
+        await client.produce(queue.exchange, "bench", PAYLOAD)
+        rmq_queue.get_nowait()
+
+    return BenchmarkCase(operation, client.close)
+
+
+@benchmark("subscriber.callback")
+async def subscriber_callback() -> BenchmarkCase:
+    client = await _client()
+    queue = Queue("bench")
+    client.broker.declare_queue(queue.name)
+
+    channel = await (await client.get_connection()).channel()
+    rmq_queue = await channel.get_queue(queue.name)
+    await rmq_queue.consume(lambda _: None)
+    consumer = next(iter(channel.consumers.values()))
+
+    body = get_encoder("application/json").encode(PAYLOAD)
+    message = aio_pika.Message(body, content_type="application/json", content_encoding="utf-8", message_id="1")
+
+    async def handler(request: PubSubRequest):
+        return request.data
+
+    callback = RabbitMQSubscriber("bench", queue).create_callback(client, PassthroughApp(), handler)
+
+    async def operation():
+        await callback(FakeIncomingMessage(consumer, message, "", queue.name, 1))
+
+    return BenchmarkCase(operation, client.close)
+
+
+class Service:
+    name = "bench"
+
+
+async def _route(self, item_id: int, q: Optional[str] = None):
+    return self.name, item_id, q
+
+
+async def _plain_route(item_id: int, q: Optional[str] = None):
+    return item_id, q
+
+
+@benchmark("dispatch.dynamic_self")
+async def dispatch_dynamic_self() -> BenchmarkCase:
+    # FastAPI calls endpoints with keyword arguments only
+    DynamicSelfFunc._instance = Service()
+    route = DynamicSelfFunc(_route)()
+
+    async def operation():
+        await route(item_id=1, q="a")
+
+    return BenchmarkCase(operation)
+
+
+@benchmark("dispatch.direct")
+async def dispatch_direct() -> BenchmarkCase:
+    async def operation():
+        await _plain_route(item_id=1, q="a")
+
+    return BenchmarkCase(operation)
+
+
+@benchmark("metrics.counter_inc")
+async def metrics_counter_inc() -> BenchmarkCase:
+    counter = MetricsRegistry().counter("bench_total", "Benchmark counter.", ("queue",)).labels("bench")
+    return BenchmarkCase(counter.inc)
+
+
+@benchmark("metrics.histogram_observe")
+async def metrics_histogram_observe() -> BenchmarkCase:
+    histogram = MetricsRegistry().histogram("bench_seconds", "Benchmark histogram.", ("queue",)).labels("bench")
+    return BenchmarkCase(lambda: histogram.observe(0.0042))
@@ -0,0 +1,75 @@
+"""
+Measures the cold start of a small service: importing sakura and building its loggers and providers from
+settings, each run in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 20
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = ("aio_pika", "aiormq", "fastapi", "starlette", "uvicorn")
+
+SCRIPT = """
+import json, resource, sys, time
+
+start = time.perf_counter()
+from sakura.logging import Logger
+from sakura.providers import Provider
+from sakura.utils.factory import dict_factory, list_factory
+
+list_factory({"Loguru": {"handlers": []}}, Logger)
+dict_factory({}, Provider)
+elapsed = time.perf_counter() - start
+
+sys.stdout.write(json.dumps({
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "heavy": [name for name in sys.argv[1:] if name in sys.modules],
+}))
+"""
+
+
+def measure(runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT, *HEAVY_MODULES],  # noqa: S603
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        samples.append(json.loads(output))
+
+    return {
+        "startup_ms_p50": statistics.median(sample["seconds"] for sample in samples) * 1000,
+        "max_rss_mb_p50": statistics.median(sample["max_rss_kb"] for sample in samples) / 1024,
+        "modules": samples[-1]["modules"],
+        "heavy_modules": samples[-1]["heavy"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--output", type=Path, help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    sys.stdout.write(
+        f"startup p50 {result['startup_ms_p50']:.1f}ms   max RSS p50 {result['max_rss_mb_p50']:.1f}MiB   "
+        f"{result['modules']} modules   heavy: {', '.join(result['heavy_modules']) or '-'}\n",
+    )
+
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
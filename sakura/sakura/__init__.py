@@ -1,3 +1,8 @@
+import pkgutil
+
+# Providers shipped as separate distributions, like sakura-fastapi-provider, install their modules into this package
+__path__ = pkgutil.extend_path(__path__, __name__)
+
 from .microservice import Microservice
 
 __all__ = [
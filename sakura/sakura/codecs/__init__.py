@@ -0,0 +1,13 @@
+from .compression import decompress, get_compressor, register_compression, register_zstd_dictionary
+from .registry import DEFAULT_CONTENT_TYPE, get_decoder, get_encoder, register_codec
+
+__all__ = [
+    "DEFAULT_CONTENT_TYPE",
+    "decompress",
+    "get_compressor",
+    "get_decoder",
+    "get_encoder",
+    "register_codec",
+    "register_compression",
+    "register_zstd_dictionary",
+]
@@ -0,0 +1,139 @@
+import gzip
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from sakura.exceptions import DecodeError, UnsupportedContentTypeError
+
+
+class Compressor(ABC):
+    """
+    Compresses message bodies, the `encoding` it's registered under is sent as the message's `content_encoding`.
+    """
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        ...
+
+
+class GzipCompressor(Compressor):
+    def __init__(self, level: Optional[int] = None):
+        self.level = 6 if level is None else level
+
+    def compress(self, data: bytes) -> bytes:
+        # A fixed mtime keeps the output of equal bodies equal
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+
+class LZ4Compressor(Compressor):
+    def __init__(self, level: Optional[int] = None):
+        import lz4.frame
+
+        self._frame = lz4.frame
+        self.level = 0 if level is None else level
+
+    def compress(self, data: bytes) -> bytes:
+        return self._frame.compress(data, compression_level=self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._frame.decompress(data)
+
+
+_zstd_dictionaries: dict[int, bytes] = {}
+
+
+def register_zstd_dictionary(dictionary: bytes) -> int:
+    """
+    Makes a trained zstd dictionary available for decompression. Frames record the id of the dictionary they
+    were compressed with, so any process that registered it can decompress them. Returns the dictionary id.
+    """
+    import zstandard
+
+    dict_id = zstandard.ZstdCompressionDict(dictionary).dict_id()
+    _zstd_dictionaries[dict_id] = dictionary
+    return dict_id
+
+
+class ZstdCompressor(Compressor):
+    """
+    Compresses with zstd, optionally with a trained dictionary, which pays off for small messages that repeat
+    the same keys and values: on their own they're too short for zstd to find much to reference.
+    """
+
+    def __init__(self, level: Optional[int] = None, dictionary: Optional[bytes] = None):
+        import zstandard
+
+        self._zstd = zstandard
+        self.level = 3 if level is None else level
+        dict_data = None
+        if dictionary is not None:
+            register_zstd_dictionary(dictionary)
+            dict_data = zstandard.ZstdCompressionDict(dictionary)
+        self._compressor = zstandard.ZstdCompressor(level=self.level, dict_data=dict_data)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        dict_id = self._zstd.get_frame_parameters(data).dict_id
+        dict_data = None
+        if dict_id:
+            if dict_id not in _zstd_dictionaries:
+                raise DecodeError(f"Message was compressed with the unregistered zstd dictionary {dict_id}")
+            dict_data = self._zstd.ZstdCompressionDict(_zstd_dictionaries[dict_id])
+
+        # Decompressors aren't thread safe and handlers decode in threads too, so one is made per message
+        return self._zstd.ZstdDecompressor(dict_data=dict_data).decompress(data)
+
+
+_compressor_factories: dict[str, Callable[..., Compressor]] = {}
+_decompressors: dict[str, Compressor] = {}
+
+
+def register_compression(encoding: str, factory: Callable[..., Compressor]):
+    encoding = encoding.lower()
+    _compressor_factories[encoding] = factory
+    _decompressors.pop(encoding, None)
+
+
+def get_compressor(encoding: str, level: Optional[int] = None, **options) -> Compressor:
+    encoding = encoding.lower()
+    if encoding not in _compressor_factories:
+        raise UnsupportedContentTypeError(f"No compression registered for content encoding '{encoding}'")
+
+    return _compressor_factories[encoding](level, **options)
+
+
+def decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """
+    Decompresses a body by its `content_encoding`. Bodies with any other encoding, such as the charset
+    uncompressed messages are sent with, are returned as they are.
+    """
+    if not content_encoding:
+        return body
+
+    encoding = content_encoding.lower()
+    decompressor = _decompressors.get(encoding)
+    if decompressor is None and encoding not in _compressor_factories:
+        return body
+
+    try:
+        if decompressor is None:
+            # Building it imports the algorithm's package, a missing extra makes the message undecodable as well
+            decompressor = _decompressors[encoding] = _compressor_factories[encoding]()
+        return decompressor.decompress(body)
+    except DecodeError:
+        raise
+    except Exception as e:  # noqa: BLE001
+        raise DecodeError(f"{encoding} decompression failed due to {{{e}}}") from e
+
+
+register_compression("gzip", GzipCompressor)
+register_compression("lz4", LZ4Compressor)
+register_compression("zstd", ZstdCompressor)
@@ -0,0 +1,68 @@
+from typing import Callable, Optional
+
+from sakura.decoders.decoder import Decoder
+from sakura.decoders.json_decoder import JSONDecoder
+from sakura.decoders.msgpack_decoder import MsgPackDecoder
+from sakura.decoders.raw_decoder import RawDecoder
+from sakura.encoders.encoder import Encoder
+from sakura.encoders.json_encoder import JSONEncoder
+from sakura.encoders.msgpack_encoder import MsgPackEncoder
+from sakura.encoders.raw_encoder import RawEncoder
+from sakura.exceptions import UnsupportedContentTypeError
+
+DEFAULT_CONTENT_TYPE = "application/json"
+
+_encoder_factories: dict[str, Callable[[], Encoder]] = {}
+_decoder_factories: dict[str, Callable[[], Decoder]] = {}
+_encoders: dict[str, Encoder] = {}
+_decoders: dict[Optional[str], Decoder] = {}
+
+
+def _normalize(content_type: Optional[str]) -> str:
+    if not content_type:
+        return DEFAULT_CONTENT_TYPE
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def register_codec(
+    content_type: str,
+    encoder_factory: Callable[[], Encoder],
+    decoder_factory: Callable[[], Decoder],
+):
+    content_type = _normalize(content_type)
+    _encoder_factories[content_type] = encoder_factory
+    _decoder_factories[content_type] = decoder_factory
+    _encoders.pop(content_type, None)
+    _decoders.clear()
+
+
+def get_encoder(content_type: Optional[str]) -> Encoder:
+    content_type = _normalize(content_type)
+    if encoder := _encoders.get(content_type):
+        return encoder
+
+    if content_type not in _encoder_factories:
+        raise UnsupportedContentTypeError(f"No encoder registered for content type '{content_type}'")
+
+    encoder = _encoders[content_type] = _encoder_factories[content_type]()
+    return encoder
+
+
+def get_decoder(content_type: Optional[str]) -> Decoder:
+    # Decoders are looked up once per delivery, so cache by the raw header value as well
+    if decoder := _decoders.get(content_type):
+        return decoder
+
+    normalized = _normalize(content_type)
+    if normalized not in _decoder_factories:
+        raise UnsupportedContentTypeError(f"No decoder registered for content type '{normalized}'")
+
+    decoder = _decoders[content_type] = _decoders.get(normalized) or _decoder_factories[normalized]()
+    _decoders[normalized] = decoder
+    return decoder
+
+
+register_codec("application/json", JSONEncoder, JSONDecoder)
+register_codec("application/msgpack", MsgPackEncoder, MsgPackDecoder)
+register_codec("application/x-msgpack", MsgPackEncoder, MsgPackDecoder)
+register_codec("application/octet-stream", RawEncoder, RawDecoder)
@@ -1,7 +1,14 @@
 from abc import abstractmethod
+from typing import Any
 
 
 class Decoder:
     @abstractmethod
     def decode(self, body: bytes) -> dict:
         raise NotImplementedError
+
+    def validate(self, obj: Any) -> Any:
+        """
+        Validates an already decoded object, decoders without a schema return it as is.
+        """
+        return obj
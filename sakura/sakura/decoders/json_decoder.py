@@ -5,12 +5,19 @@ from typing import Union
 from sakura.decoders.decoder import Decoder
 from sakura.exceptions import DecodeError
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
 class JSONDecoder(Decoder):
     def decode(self, body: Union[str, bytes]) -> dict:
         try:
+            if orjson is not None:
+                return orjson.loads(body)
             return json.loads(body)
-        except json.JSONDecodeError as e:
-            raise DecodeError(f"JSON decoding failed due to {{{e}}}")
+        except ValueError as e:
+            raise DecodeError(f"JSON decoding failed due to {{{e}}}") from e
@@ -0,0 +1,15 @@
+from sakura.decoders.decoder import Decoder
+from sakura.exceptions import DecodeError
+
+
+class MsgPackDecoder(Decoder):
+    def __init__(self):
+        import msgpack
+
+        self._unpackb = msgpack.unpackb
+
+    def decode(self, body: bytes) -> dict:
+        try:
+            return self._unpackb(body, raw=False)
+        except ValueError as e:
+            raise DecodeError(f"MessagePack decoding failed due to {{{e}}}") from e
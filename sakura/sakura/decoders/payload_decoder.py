@@ -0,0 +1,17 @@
+from typing import Any, Optional
+
+from sakura.decoders.decoder import Decoder
+
+
+class PayloadDecoder(Decoder):
+    """
+    Decodes deliveries that carry the published object itself instead of an encoded body, like in-memory ones.
+    The body is ignored, the payload is only validated by `decoder`.
+    """
+
+    def __init__(self, payload: Any, decoder: Decoder):
+        self.payload = payload
+        self.decoder = decoder
+
+    def decode(self, body: Optional[bytes]) -> Any:  # noqa: ARG002
+        return self.decoder.validate(self.payload)
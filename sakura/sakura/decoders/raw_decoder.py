@@ -0,0 +1,6 @@
+from sakura.decoders.decoder import Decoder
+
+
+class RawDecoder(Decoder):
+    def decode(self, body: bytes) -> bytes:
+        return bytes(body)
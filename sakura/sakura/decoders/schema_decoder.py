@@ -0,0 +1,75 @@
+import copy
+from typing import Any, Callable, Optional, Union
+
+import pydantic
+
+from sakura.decoders.decoder import Decoder
+from sakura.exceptions import ValidationError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _compile_validators(schema: Any) -> tuple[Callable[[Union[str, bytes]], Any], Callable[[Any], Any]]:
+    if hasattr(pydantic, "TypeAdapter"):
+        adapter = pydantic.TypeAdapter(schema)
+        return adapter.validate_json, adapter.validate_python
+
+    # pydantic v1 has no TypeAdapter, a `__root__` model parsing with orjson is the closest thing
+    json_loads = orjson.loads if orjson is not None else pydantic.BaseConfig.json_loads
+    config = type("Config", (pydantic.BaseConfig,), {"json_loads": staticmethod(json_loads)})
+
+    if isinstance(schema, type) and issubclass(schema, pydantic.BaseModel):
+        # Parsed with the model itself rather than a subclass carrying the loader, so handlers get the declared class
+        def validate_json(body: Union[str, bytes]) -> Any:
+            try:
+                obj = json_loads(body)
+            except ValueError as e:
+                raise pydantic.ValidationError([pydantic.error_wrappers.ErrorWrapper(e, loc="__root__")], schema) from e
+            return schema.parse_obj(obj)
+
+        return validate_json, schema.parse_obj
+
+    name = f"{getattr(schema, '__name__', 'Schema')}Root"
+    model = pydantic.create_model(name, __config__=config, __root__=(schema, ...))
+    return lambda body: model.parse_raw(body).__root__, lambda obj: model.parse_obj(obj).__root__
+
+
+class SchemaDecoder(Decoder):
+    """
+    Decodes straight into the handler's declared type.
+    The validators are compiled once per schema. JSON bodies are validated from the raw bytes, other
+    content types are decoded by `decoder` first and the result is validated.
+    """
+
+    def __init__(self, schema: Any, decoder: Optional[Decoder] = None):
+        self.schema = schema
+        self.decoder = decoder
+        self._validate_json, self._validate_python = _compile_validators(schema)
+
+    def with_decoder(self, decoder: Optional[Decoder]) -> "SchemaDecoder":
+        """
+        Returns a decoder validating with the same compiled validators, after decoding bodies with `decoder`.
+        """
+        schema_decoder = copy.copy(self)
+        schema_decoder.decoder = decoder
+        return schema_decoder
+
+    def decode(self, body: Union[str, bytes]) -> Any:
+        if self.decoder is None:
+            try:
+                return self._validate_json(body)
+            except pydantic.ValidationError as e:
+                raise ValidationError.from_pydantic(e) from e
+        return self.validate(self.decoder.decode(body))
+
+    def validate(self, obj: Any) -> Any:
+        """
+        Validates an already decoded object, like the payload of an in-memory delivery.
+        """
+        try:
+            return self._validate_python(obj)
+        except pydantic.ValidationError as e:
+            raise ValidationError.from_pydantic(e) from e
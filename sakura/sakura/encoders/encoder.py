@@ -0,0 +1,8 @@
+from abc import abstractmethod
+from typing import Any
+
+
+class Encoder:
+    @abstractmethod
+    def encode(self, payload: Any) -> bytes:
+        raise NotImplementedError
@@ -0,0 +1,25 @@
+import json
+from typing import Any
+
+from sakura.encoders.encoder import Encoder
+from sakura.encoders.jsonable import to_jsonable
+from sakura.exceptions import EncodeError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONEncoder(Encoder):
+    """
+    Encodes JSON as UTF-8, the only encoding orjson produces and the one the decoders expect.
+    """
+
+    def encode(self, payload: Any) -> bytes:
+        try:
+            if orjson is not None:
+                return orjson.dumps(payload, default=to_jsonable, option=orjson.OPT_NON_STR_KEYS)
+            return json.dumps(payload, default=to_jsonable).encode()
+        except (TypeError, ValueError) as e:
+            raise EncodeError(f"JSON encoding failed due to {{{e}}}") from e
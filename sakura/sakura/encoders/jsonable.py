@@ -0,0 +1,19 @@
+from typing import Any
+
+import pydantic
+
+
+def to_jsonable(obj: Any) -> Any:
+    """
+    `default` hook for serializers that can't handle `obj` natively.
+    Primitives and containers never reach it, pydantic models are dumped directly and only the
+    remaining types go through FastAPI's `jsonable_encoder`.
+    """
+    if isinstance(obj, pydantic.BaseModel):
+        if hasattr(obj, "model_dump"):
+            return obj.model_dump(mode="json", by_alias=True)
+        return obj.dict(by_alias=True)
+
+    from fastapi.encoders import jsonable_encoder
+
+    return jsonable_encoder(obj)
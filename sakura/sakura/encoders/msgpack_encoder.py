@@ -0,0 +1,18 @@
+from typing import Any
+
+from sakura.encoders.encoder import Encoder
+from sakura.encoders.jsonable import to_jsonable
+from sakura.exceptions import EncodeError
+
+
+class MsgPackEncoder(Encoder):
+    def __init__(self):
+        import msgpack
+
+        self._packb = msgpack.packb
+
+    def encode(self, payload: Any) -> bytes:
+        try:
+            return self._packb(payload, default=to_jsonable, use_bin_type=True)
+        except (TypeError, ValueError) as e:
+            raise EncodeError(f"MessagePack encoding failed due to {{{e}}}") from e
@@ -0,0 +1,19 @@
+from typing import Any
+
+from sakura.encoders.encoder import Encoder
+from sakura.exceptions import EncodeError
+
+
+class RawEncoder(Encoder):
+    def __init__(self, encoding: str = "utf-8"):
+        self.encoding = encoding
+
+    def encode(self, payload: Any) -> bytes:
+        if isinstance(payload, bytes):
+            return payload
+        if isinstance(payload, (bytearray, memoryview)):
+            return bytes(payload)
+        if isinstance(payload, str):
+            return payload.encode(self.encoding)
+
+        raise EncodeError(f"Raw encoding supports only bytes-like or str payloads, got {type(payload).__name__}")
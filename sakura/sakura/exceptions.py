@@ -22,7 +22,7 @@ class ValidationError(Exception):
     def from_pydantic(cls, pydantic_error: pydantic.ValidationError):
         errors = [
             {
-                "field": ".".join(error["loc"]),
+                "field": ".".join(str(loc) for loc in error["loc"]),
                 "error": error["msg"],
             }
             for error in pydantic_error.errors()
@@ -43,5 +43,23 @@ class DecodeError(Exception):
     pass
 
 
+class EncodeError(Exception):
+    pass
+
+
+class UnsupportedContentTypeError(Exception):
+    pass
+
+
 class PropertyDoesntExistError(Exception):
     pass
+
+
+class PartialBatchError(Exception):
+    """
+    Raised by batch handlers to nack only the failed requests, the rest of the batch is acked.
+    """
+
+    def __init__(self, failed: list, *args):
+        super().__init__(*args or (f"{len(failed)} messages of the batch failed",))
+        self.failed = failed
@@ -0,0 +1,5 @@
+from .inmemory_client import InMemoryClient
+
+__all__ = [
+    "InMemoryClient",
+]
@@ -0,0 +1,231 @@
+import asyncio
+import itertools
+import re
+from logging import getLogger
+from typing import Any, Callable, Optional
+
+from sakura.inmemory.types import InMemoryMessage
+from sakura.rabbitmq.types import Exchange, Queue
+
+DEFAULT_EXCHANGE = ""
+MAX_CACHED_ROUTES = 4096
+
+logger = getLogger(__name__)
+
+
+def compile_binding(exchange_type: str, binding_key: str) -> Callable[[str], bool]:
+    if exchange_type == "fanout":
+        return lambda _: True
+
+    if exchange_type == "topic":
+        # "*" matches exactly one word and "#" zero or more, like in RabbitMQ
+        pattern = r"\.".join(
+            r"[^.]+" if word == "*" else r".*" if word == "#" else re.escape(word) for word in binding_key.split(".")
+        )
+        pattern = pattern.replace(r"\..*", r"(\..*)?").replace(r".*\.", r"(.*\.)?")
+        return re.compile(pattern).fullmatch
+
+    return binding_key.__eq__
+
+
+class InMemoryConsumer:
+    """
+    Delivers messages of a queue to a callback, one task per delivery like aiormq does.
+    At most `prefetch_count` deliveries are unacked at a time, nacked and requeued messages go back to the queue.
+    """
+
+    def __init__(self, queue: "asyncio.Queue[InMemoryMessage]", callback: Optional[Callable], prefetch_count: int = 0):
+        self.queue = queue
+        self.callback = callback
+        self.unacked: dict[int, InMemoryMessage] = {}
+        self._delivery_tags = itertools.count(1)
+        self.prefetch_count = prefetch_count
+        self._settled = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        self._runner: Optional[asyncio.Task] = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._runner = asyncio.current_task()
+        while True:
+            while self.prefetch_count and len(self.unacked) >= self.prefetch_count:
+                self._settled.clear()
+                await self._settled.wait()
+
+            message = self.take(await self.queue.get())
+            task = loop.create_task(self.callback(message))
+            self._tasks.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        # A failing callback only loses its own delivery, like an exception in one of aiormq's delivery tasks
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Consumer callback failed", exc_info=task.exception())
+
+    def take(self, message: InMemoryMessage) -> InMemoryMessage:
+        message.delivery_tag = next(self._delivery_tags)
+        message.consumer = self
+        self.unacked[message.delivery_tag] = message
+        return message
+
+    def settle(self, message: InMemoryMessage, multiple: bool = False, requeue: bool = False):
+        tags = [tag for tag in self.unacked if tag <= message.delivery_tag] if multiple else [message.delivery_tag]
+
+        for tag in tags:
+            settled = self.unacked.pop(tag, None)
+            if settled is None:
+                continue
+
+            if requeue:
+                settled.redelivered = True
+                self.queue.put_nowait(settled)
+
+        self._settled.set()
+
+    def set_prefetch(self, prefetch_count: int):
+        self.prefetch_count = prefetch_count
+        self._settled.set()
+
+    def requeue_unacked(self):
+        for message in list(self.unacked.values()):
+            self.settle(message, requeue=True)
+
+    def cancel(self):
+        if self._runner is not None:
+            self._runner.cancel()
+        self.requeue_unacked()
+
+
+class DelayQueue(asyncio.Queue):
+    """
+    A queue with `x-message-ttl` and a dead-letter exchange but no consumers, which is how RabbitMQ delays messages:
+    they're dead-lettered once they expire. Messages are only held by their expiry timer.
+    """
+
+    def __init__(self, broker: "InMemoryBroker", ttl_ms: int, exchange: str, routing_key: Optional[str]):
+        super().__init__()
+        self.broker = broker
+        self.ttl = ttl_ms / 1000
+        self.exchange = exchange
+        self.routing_key = routing_key
+
+    def put_nowait(self, item: InMemoryMessage):
+        asyncio.get_running_loop().call_later(self.ttl, self.dead_letter, item)
+
+    def dead_letter(self, message: InMemoryMessage):
+        self.broker.publish(
+            self.exchange,
+            self.routing_key or message.routing_key,
+            message.payload,
+            message.headers,
+            message.message_id,
+            message.reply_to,
+            message.correlation_id,
+        )
+
+
+class InMemoryBroker:
+    """
+    Exchanges, bindings and queues living in the current process.
+    Routing follows RabbitMQ's direct, fanout and topic exchanges and the resolved queues are cached
+    per (exchange, routing key), so publishing is a dict lookup and a `put_nowait` per queue.
+    """
+
+    def __init__(self):
+        self.exchanges: dict[str, str] = {DEFAULT_EXCHANGE: "direct"}
+        self.queues: dict[str, asyncio.Queue[InMemoryMessage]] = {}
+        self.bindings: dict[str, list[tuple[str, str, Callable[[str], bool]]]] = {}
+        self._routes: dict[tuple[str, str], tuple[asyncio.Queue, ...]] = {}
+        self.reply_consumers: dict[str, Callable[[InMemoryMessage], Any]] = {}
+
+    def declare_exchange(self, exchange: Exchange):
+        if exchange.name not in self.exchanges:
+            self.exchanges[exchange.name] = exchange.type
+            self._routes.clear()
+
+    def declare_queue(self, queue: Queue) -> "asyncio.Queue[InMemoryMessage]":
+        if queue.name not in self.queues:
+            if "x-message-ttl" in queue.arguments and "x-dead-letter-exchange" in queue.arguments:
+                self.queues[queue.name] = DelayQueue(
+                    self,
+                    queue.arguments["x-message-ttl"],
+                    queue.arguments["x-dead-letter-exchange"],
+                    queue.arguments.get("x-dead-letter-routing-key"),
+                )
+            else:
+                self.queues[queue.name] = asyncio.Queue()
+            self._routes.clear()
+
+        if queue.exchange:
+            self.declare_exchange(queue.exchange)
+            self.bind(queue.name, queue.exchange.name, queue.routing_key or queue.name)
+
+        return self.queues[queue.name]
+
+    def bind(self, queue: str, exchange: str, routing_key: str):
+        bindings = self.bindings.setdefault(exchange, [])
+        if any(name == queue and key == routing_key for name, key, _ in bindings):
+            return
+
+        bindings.append((queue, routing_key, compile_binding(self.exchanges.get(exchange, "direct"), routing_key)))
+        self._routes.clear()
+
+    def route(self, exchange: str, routing_key: str) -> tuple["asyncio.Queue[InMemoryMessage]", ...]:
+        if (queues := self._routes.get((exchange, routing_key))) is not None:
+            return queues
+
+        if exchange == DEFAULT_EXCHANGE:
+            names = [routing_key] if routing_key in self.queues else []
+        else:
+            names = list(dict.fromkeys(
+                name for name, _, matches in self.bindings.get(exchange, []) if matches(routing_key)
+            ))
+
+        if len(self._routes) >= MAX_CACHED_ROUTES:
+            self._routes.clear()
+
+        queues = self._routes[(exchange, routing_key)] = tuple(self.queues[name] for name in names)
+        return queues
+
+    def publish(  # noqa: PLR0913
+        self,
+        exchange: str,
+        routing_key: str,
+        payload: Any,
+        headers: Optional[dict] = None,
+        message_id: Optional[str] = None,
+        reply_to: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+    ) -> int:
+        """
+        Enqueues the payload on every bound queue and returns how many queues it was routed to.
+        The payload object is shared, not copied, between those queues.
+        """
+        queues = self.route(exchange, routing_key)
+        for queue in queues:
+            queue.put_nowait(
+                InMemoryMessage(payload, exchange, routing_key, headers, message_id, reply_to, correlation_id),
+            )
+
+        return len(queues)
+
+    def reply(self, reply_to: str, payload: Any, correlation_id: Optional[str]):
+        """
+        Hands an RPC reply to the consumer of its reply-to address, replies to callers that are gone are dropped.
+        """
+        if on_reply := self.reply_consumers.get(reply_to):
+            on_reply(InMemoryMessage(payload, DEFAULT_EXCHANGE, reply_to, correlation_id=correlation_id))
+
+
+_brokers: dict[str, InMemoryBroker] = {}
+
+
+def get_broker(name: str = "default") -> InMemoryBroker:
+    """
+    Clients created with the same broker name share their exchanges and queues.
+    """
+    if name not in _brokers:
+        _brokers[name] = InMemoryBroker()
+
+    return _brokers[name]
@@ -0,0 +1,292 @@
+import asyncio
+import itertools
+import os
+from collections.abc import Awaitable, Iterable
+from logging import getLogger
+from typing import Any, Callable, Optional
+
+from aio_pika.abc import DeliveryMode
+
+from sakura.decoders.decoder import Decoder
+from sakura.decoders.payload_decoder import PayloadDecoder
+from sakura.inmemory.broker import DEFAULT_EXCHANGE, InMemoryBroker, InMemoryConsumer, get_broker
+from sakura.inmemory.types import InMemoryMessage
+from sakura.metrics import instruments
+from sakura.pubsub.client import PubSubClient, pull_timeout_ms
+from sakura.rabbitmq.types import DIRECT_REPLY_TO, Exchange, Queue
+
+logger = getLogger(__name__)
+
+
+class InMemoryClient(PubSubClient):
+    """
+    PubSubClient backed by an in-process broker.
+    Payloads are handed to consumers as is, without encoding or copying, so handlers must not mutate
+    what they receive. Clients using the same `broker` name in one process share exchanges and queues.
+    """
+
+    is_open: bool = False
+
+    def __init__(self, broker: str = "default"):
+        self.broker_name = broker
+        self.broker: InMemoryBroker = get_broker(broker)
+        self._consumers: set[InMemoryConsumer] = set()
+        self._pullers: dict[str, InMemoryConsumer] = {}
+        self._reply_to = f"{DIRECT_REPLY_TO}.{os.urandom(6).hex()}"
+        self._calls: dict[str, asyncio.Future] = {}
+        self._call_ids = itertools.count()
+
+    async def setup(self):
+        self.is_open = True
+
+    async def consume(  # noqa: PLR0913
+        self,
+        queue: Queue,
+        callback: Callable,
+        declare: bool = True,  # noqa: ARG002
+        prefetch_count: int = 10,
+        on_started: Optional[Callable[[], Any]] = None,
+        stop: Optional[asyncio.Event] = None,
+        wait_settled: Optional[Callable[[], Awaitable]] = None,
+        adaptive_qos: bool = False,  # noqa: ARG002
+        on_lost: Optional[Callable[[Optional[BaseException]], Any]] = None,  # noqa: ARG002
+        on_restored: Optional[Callable[[], Any]] = None,  # noqa: ARG002
+    ):
+        # There's no broker outliving the process, so the topology is always declared
+        consumer = InMemoryConsumer(self.broker.declare_queue(queue), callback, prefetch_count)
+        self._consumers.add(consumer)
+        instruments.prefetch_count.labels(queue.name).set(prefetch_count)
+
+        logger.info(f'Consuming in-memory queue: "{queue.name}"')
+        self._consumer_attached()
+        if on_started:
+            on_started()
+        runner = asyncio.ensure_future(consumer.run())
+        try:
+            await (stop.wait() if stop else runner)
+
+            # Like basic.cancel: no new deliveries, but the ones being handled can still be settled
+            runner.cancel()
+            if wait_settled:
+                await wait_settled()
+        finally:
+            runner.cancel()
+            self._consumer_attached(False)
+            self._consumers.discard(consumer)
+            consumer.requeue_unacked()
+
+    def message_decoder(self, message: InMemoryMessage, decoder: Decoder) -> Decoder:
+        # Deliveries carry the published object itself, which is only validated against the handler's schema
+        return PayloadDecoder(message.payload, decoder)
+
+    async def set_prefetch(self, queue: Queue, prefetch_count: int) -> bool:
+        messages = self.broker.declare_queue(queue)
+        consumer = next((consumer for consumer in self._consumers if consumer.queue is messages), None)
+        if consumer is None:
+            return False
+
+        consumer.set_prefetch(prefetch_count)
+        instruments.prefetch_count.labels(queue.name).set(prefetch_count)
+        return True
+
+    async def message_count(self, queue: Queue) -> int:
+        return self.broker.declare_queue(queue).qsize()
+
+    async def get_exchange(self, exchange: Exchange) -> Exchange:
+        self.broker.declare_exchange(exchange)
+        return exchange
+
+    async def get_queue(self, queue: Queue, declare: bool = False) -> "asyncio.Queue[InMemoryMessage]":  # noqa: ARG002
+        return self.broker.declare_queue(queue)
+
+    async def get_puller(
+        self,
+        queue: Queue,
+        prefetch_count: int = 10,  # noqa: ARG002
+        declare: bool = False,  # noqa: ARG002
+    ) -> InMemoryConsumer:
+        # Pulled messages are taken straight off the queue, there's nothing to prefetch
+        if queue.name not in self._pullers:
+            self._pullers[queue.name] = InMemoryConsumer(self.broker.declare_queue(queue), callback=None)
+
+        return self._pullers[queue.name]
+
+    async def get_message(
+        self,
+        queue: Queue,
+        timeout: Optional[float] = None,
+        *,
+        timeout_ms: Optional[int] = None,
+    ) -> Optional[InMemoryMessage]:
+        timeout_ms = pull_timeout_ms(timeout_ms, timeout, "timeout")
+        puller = await self.get_puller(queue)
+        return await self._pull(puller, timeout_ms)
+
+    async def get_messages(
+        self,
+        queue: Queue,
+        count: int,
+        timeout: Optional[float] = None,
+        *,
+        timeout_ms: Optional[int] = None,
+    ) -> list[InMemoryMessage]:
+        timeout_ms = pull_timeout_ms(timeout_ms, timeout, "timeout")
+        puller = await self.get_puller(queue)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        messages: list[InMemoryMessage] = []
+
+        while len(messages) < count:
+            while not puller.queue.empty() and len(messages) < count:
+                messages.append(puller.take(puller.queue.get_nowait()))
+
+            remaining = deadline - loop.time()
+            if len(messages) == count or remaining <= 0:
+                break
+
+            try:
+                messages.append(puller.take(await asyncio.wait_for(puller.queue.get(), remaining)))
+            except asyncio.TimeoutError:
+                break
+
+        return messages
+
+    async def stream_get_messages(
+        self,
+        queue: Queue,
+        count: int,
+        max_time_between_messages: Optional[float] = None,
+        *,
+        max_time_between_messages_ms: Optional[int] = None,
+    ):
+        max_time_between_messages_ms = pull_timeout_ms(
+            max_time_between_messages_ms, max_time_between_messages, "max_time_between_messages",
+        )
+        puller = await self.get_puller(queue)
+        for _ in range(count):
+            message = await self._pull(puller, max_time_between_messages_ms)
+            if message is None:
+                return
+
+            yield message
+
+    @staticmethod
+    async def _pull(puller: InMemoryConsumer, timeout_ms: int) -> Optional[InMemoryMessage]:
+        if not puller.queue.empty():
+            return puller.take(puller.queue.get_nowait())
+
+        try:
+            return puller.take(await asyncio.wait_for(puller.queue.get(), timeout_ms / 1000))
+        except asyncio.TimeoutError:
+            return None
+
+    @staticmethod
+    async def ack_messages(messages: list[InMemoryMessage]):
+        for message in messages:
+            await message.ack()
+
+    async def produce(  # noqa: PLR0913
+        self,
+        exchange: Exchange,
+        routing_key: str,
+        payload: Any,
+        delivery_mode: DeliveryMode = DeliveryMode.PERSISTENT,  # noqa: ARG002
+        declare: bool = True,
+        headers: Optional[dict] = None,
+    ):
+        # Nothing outlives the process, so every delivery mode is as persistent as the other
+        if declare:
+            self.broker.declare_exchange(exchange)
+
+        self.broker.publish(exchange.name, routing_key, payload, headers)
+        instruments.published_messages.labels(exchange.name).inc()
+
+    async def produce_many(  # noqa: PLR0913
+        self,
+        exchange: Exchange,
+        routing_key: str,
+        payloads: Iterable[Any],
+        delivery_mode: DeliveryMode = DeliveryMode.PERSISTENT,  # noqa: ARG002
+        declare: bool = True,
+    ):
+        if declare:
+            self.broker.declare_exchange(exchange)
+
+        published = 0
+        for payload in payloads:
+            self.broker.publish(exchange.name, routing_key, payload)
+            published += 1
+
+        instruments.published_messages.labels(exchange.name).inc(published)
+
+    async def produce_buffered(  # noqa: PLR0913
+        self,
+        exchange: Exchange,
+        routing_key: str,
+        payload: Any,
+        delivery_mode: DeliveryMode = DeliveryMode.PERSISTENT,
+        declare: bool = True,
+    ) -> asyncio.Future:
+        """
+        Publishes at once, there's no broker to confirm the message, so the returned future is already resolved.
+        """
+        await self.produce(exchange, routing_key, payload, delivery_mode, declare)
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    async def republish(self, message: InMemoryMessage, routing_key: str, headers: dict):
+        self.broker.publish(
+            DEFAULT_EXCHANGE,
+            routing_key,
+            message.payload,
+            headers,
+            message.message_id,
+            message.reply_to,
+            message.correlation_id,
+        )
+
+    async def call(  # noqa: PLR0913
+        self,
+        exchange: Exchange,
+        routing_key: str,
+        payload: Any,
+        timeout: float = 30,
+        declare: bool = True,
+    ) -> Any:
+        if declare:
+            self.broker.declare_exchange(exchange)
+        self.broker.reply_consumers[self._reply_to] = self._on_reply
+
+        correlation_id = str(next(self._call_ids))
+        future = self._calls[correlation_id] = asyncio.get_running_loop().create_future()
+        try:
+            self.broker.publish(
+                exchange.name, routing_key, payload, reply_to=self._reply_to, correlation_id=correlation_id,
+            )
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._calls.pop(correlation_id, None)
+
+    async def reply(self, request: InMemoryMessage, payload: Any):
+        self.broker.reply(request.reply_to, payload, request.correlation_id)
+
+    def _on_reply(self, message: InMemoryMessage):
+        future = self._calls.pop(message.correlation_id, None)
+        if future is not None and not future.done():
+            future.set_result(message.payload)
+
+    async def close(self):
+        if not self.is_open:
+            return
+
+        self.is_open = False
+        self.broker.reply_consumers.pop(self._reply_to, None)
+        for consumer in list(self._consumers):
+            consumer.cancel()
+        self._consumers.clear()
+
+        # Pulled but never acked messages go back to their queue, like on a closed AMQP channel
+        for puller in self._pullers.values():
+            puller.requeue_unacked()
+        self._pullers.clear()
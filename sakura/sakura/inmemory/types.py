@@ -0,0 +1,63 @@
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from sakura.inmemory.broker import InMemoryConsumer
+
+
+class InMemoryMessage:
+    """
+    A delivery of the in-memory broker.
+    Mirrors the parts of `aio_pika.IncomingMessage` the subscribers use, but carries the published
+    object itself in `payload` instead of an encoded body.
+    """
+
+    __slots__ = (
+        "payload",
+        "exchange",
+        "routing_key",
+        "headers",
+        "message_id",
+        "reply_to",
+        "correlation_id",
+        "delivery_tag",
+        "redelivered",
+        "consumer",
+    )
+
+    body = None
+    content_type = None
+    content_encoding = None
+
+    def __init__(  # noqa: PLR0913
+        self,
+        payload: Any,
+        exchange: str,
+        routing_key: str,
+        headers: Optional[dict] = None,
+        message_id: Optional[str] = None,
+        reply_to: Optional[str] = None,
+        correlation_id: Optional[str] = None,
+    ):
+        self.payload = payload
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.headers = headers or {}
+        self.message_id = message_id
+        self.reply_to = reply_to
+        self.correlation_id = correlation_id
+        self.delivery_tag = 0
+        self.redelivered = False
+        self.consumer: Optional[InMemoryConsumer] = None
+
+    @property
+    def headers_raw(self) -> dict:
+        return self.headers
+
+    async def ack(self, multiple: bool = False):
+        self.consumer.settle(self, multiple=multiple)
+
+    async def nack(self, multiple: bool = False, requeue: bool = True):
+        self.consumer.settle(self, multiple=multiple, requeue=requeue)
+
+    async def reject(self, requeue: bool = False):
+        self.consumer.settle(self, requeue=requeue)
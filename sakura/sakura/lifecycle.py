@@ -0,0 +1,154 @@
+import asyncio
+import functools
+import logging
+import time
+import typing
+from collections.abc import Iterable
+from typing import Optional
+
+from sakura.metrics import instruments
+from sakura.providers import Provider
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """
+    Starts and stops a service's providers.
+    Providers start concurrently, except that each one waits until the providers it depends on are ready, so an
+    HTTP server can be held back until the consumers behind it are running. Teardown is concurrent too but runs in
+    reverse: a provider is torn down once its dependents are, and each one gets `shutdown_timeout` seconds.
+    The duration of every provider's startup and teardown is logged and recorded.
+    """
+
+    def __init__(
+        self,
+        providers: dict[str, Provider],
+        dependencies: Optional[dict[str, Iterable[str]]] = None,
+        startup_timeout: float = 60,
+        shutdown_timeout: float = 30,
+    ):
+        self.providers = providers
+        self.dependencies = {name: tuple((dependencies or {}).get(name, ())) for name in providers}
+        self.startup_timeout = startup_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.timings: dict[str, dict[str, float]] = {name: {} for name in providers}
+        self._ready: dict[str, asyncio.Event] = {}
+        self._stopped: dict[str, asyncio.Event] = {}
+        self._stopping: Optional[asyncio.Event] = None
+        self._started_at: dict[str, float] = {}
+        self._teardown: Optional[asyncio.Future] = None
+        self.validate()
+
+    def validate(self):
+        for name, dependencies in self.dependencies.items():
+            if unknown := [dependency for dependency in dependencies if dependency not in self.providers]:
+                raise ValueError(f"Provider '{name}' depends on unknown providers {unknown}")
+
+        visited: set[str] = set()
+
+        def visit(name: str, path: tuple[str, ...]):
+            if name in path:
+                raise ValueError(f"Providers depend on each other: {' -> '.join((*path, name))}")
+            if name in visited:
+                return
+            for dependency in self.dependencies[name]:
+                visit(dependency, (*path, name))
+            visited.add(name)
+
+        for name in self.providers:
+            visit(name, ())
+
+    async def run(self, setups: dict[str, Optional[typing.Coroutine]]):
+        """
+        Runs the providers' setup coroutines, returning once all of them finished.
+        A provider is ready when its setup returns or, for providers that keep serving inside setup, when it calls
+        `notify_ready()`.
+        """
+        self._create_events()
+        for name, provider in self.providers.items():
+            provider.ready_callback = functools.partial(self.mark_ready, name)
+
+        await asyncio.gather(*(self._run_provider(name, setups.get(name)) for name in self.providers))
+
+    async def _run_provider(self, name: str, setup: Optional[typing.Coroutine]):
+        if dependencies := self.dependencies[name]:
+            ready = asyncio.ensure_future(self.wait_ready(*dependencies))
+            stopping = asyncio.ensure_future(self._stopping.wait())
+            done, _ = await asyncio.wait(
+                {ready, stopping}, timeout=self.startup_timeout, return_when=asyncio.FIRST_COMPLETED,
+            )
+            ready.cancel()
+            stopping.cancel()
+
+            if ready not in done:
+                if setup is not None:
+                    setup.close()
+                if stopping in done:
+                    return
+                raise TimeoutError(
+                    f"Provider '{name}' gave up after waiting {self.startup_timeout} seconds for {list(dependencies)}",
+                )
+
+        self._started_at[name] = time.perf_counter()
+        if setup is not None:
+            await setup
+        self.mark_ready(name)
+
+    def mark_ready(self, name: str):
+        if self._ready[name].is_set():
+            return
+
+        self._ready[name].set()
+        self._record(name, "startup", self._started_at[name])
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._ready and self._ready[name].is_set()
+
+    async def wait_ready(self, *names: str):
+        """
+        Waits until the given providers, or all of them when none are given, are ready.
+        """
+        self._create_events()
+        await asyncio.gather(*(self._ready[name].wait() for name in names or self.providers))
+
+    async def teardown(self):
+        """
+        Tears the providers down, only once no matter how often it's called.
+        """
+        if self._teardown is None:
+            self._teardown = asyncio.ensure_future(self._teardown_all())
+        await asyncio.shield(self._teardown)
+
+    async def _teardown_all(self):
+        self._create_events()
+        self._stopping.set()
+        await asyncio.gather(*(self._teardown_provider(name) for name in self.providers))
+
+    async def _teardown_provider(self, name: str):
+        dependents = [other for other, dependencies in self.dependencies.items() if name in dependencies]
+        await asyncio.gather(*(self._stopped[dependent].wait() for dependent in dependents))
+
+        started_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.providers[name].teardown(), self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Provider '{name}' didn't tear down within {self.shutdown_timeout} seconds")
+        except Exception:
+            logger.exception(f"Provider '{name}' failed to tear down")
+        finally:
+            self._record(name, "teardown", started_at)
+            self._stopped[name].set()
+
+    def _create_events(self):
+        # Created on first use, since asyncio primitives bind to the running loop on older Pythons
+        if self._stopping is None:
+            self._ready = {name: asyncio.Event() for name in self.providers}
+            self._stopped = {name: asyncio.Event() for name in self.providers}
+            self._stopping = asyncio.Event()
+
+    def _record(self, name: str, phase: str, started_at: float):
+        elapsed = time.perf_counter() - started_at
+        self.timings[name][phase] = elapsed
+        instruments.lifecycle_phase_duration.labels(name, phase).observe(elapsed)
+        logger.info(f"Provider '{name}' {phase} took {elapsed * 1000:.1f}ms")
@@ -1,5 +1,10 @@
+from sakura.utils.factory import get_registry
+
 from .logger import Logger
 
 __all__ = [
     "Logger",
 ]
+
+registry = get_registry(Logger, "sakura.loggers")
+registry.register("Loguru", "sakura.logging.loguru:Loguru")
@@ -0,0 +1,12 @@
+from .exporter import MetricsExporter, PrometheusExporter
+from .registry import REGISTRY, Counter, Gauge, Histogram, MetricsRegistry
+
+__all__ = [
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsExporter",
+    "MetricsRegistry",
+    "PrometheusExporter",
+]
@@ -0,0 +1,62 @@
+from abc import abstractmethod
+from typing import Any, Optional
+
+from sakura.metrics.registry import Histogram, MetricsRegistry
+
+
+class MetricsExporter:
+    @abstractmethod
+    def export(self, registry: MetricsRegistry) -> Any:
+        raise NotImplementedError
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')  # noqa: PLW2901
+        pairs.append(f'{name}="{value}"')
+
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class PrometheusExporter(MetricsExporter):
+    """
+    Renders the registry in the Prometheus text exposition format (version 0.0.4).
+    `const_labels` are added to every series, like the index of the worker process that exports them.
+    """
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, const_labels: Optional[dict[str, str]] = None):
+        self.const_labels = const_labels or {}
+
+    def export(self, registry: MetricsRegistry) -> str:
+        lines: list[str] = []
+
+        for metric in registry.collect():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+
+            for series_labels, child in metric.children():
+                labels = {**self.const_labels, **series_labels}
+                if isinstance(metric, Histogram):
+                    total, count, buckets = child.value
+                    cumulative = 0
+                    for bound, bucket in zip((*metric.buckets, float("inf")), buckets):
+                        cumulative += bucket
+                        bucket_labels = {**labels, "le": _format_value(bound)}
+                        lines.append(f"{metric.name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                    lines.append(f"{metric.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                    lines.append(f"{metric.name}_count{_format_labels(labels)} {count}")
+                else:
+                    lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(child.value)}")
+
+        return "\n".join(lines) + "\n"
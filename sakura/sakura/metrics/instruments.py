@@ -0,0 +1,75 @@
+from sakura.metrics.registry import REGISTRY
+
+published_messages = REGISTRY.counter(
+    "sakura_published_messages_total", "Messages confirmed by the broker.", ("exchange",),
+)
+publish_errors = REGISTRY.counter(
+    "sakura_publish_errors_total", "Publishes that failed or were nacked by the broker.", ("exchange",),
+)
+publish_latency = REGISTRY.histogram(
+    "sakura_publish_latency_seconds", "Time from publish to broker confirm.", ("exchange",),
+)
+consumed_messages = REGISTRY.counter(
+    "sakura_consumed_messages_total", "Deliveries handled by subscribers.", ("queue",),
+)
+handler_duration = REGISTRY.histogram(
+    "sakura_handler_duration_seconds", "Time spent in the subscriber handler.", ("queue",),
+)
+handler_errors = REGISTRY.counter(
+    "sakura_handler_errors_total", "Subscriber handlers that raised.", ("queue",),
+)
+inflight_messages = REGISTRY.gauge(
+    "sakura_inflight_messages", "Unacked deliveries held by the subscriber (prefetch occupancy).", ("queue",),
+)
+prefetch_count = REGISTRY.gauge(
+    "sakura_prefetch_count", "Prefetch count of the consumer channel.", ("queue",),
+)
+duplicate_messages = REGISTRY.counter(
+    "sakura_duplicate_messages_total", "Redelivered messages skipped because they were already processed.", ("queue",),
+)
+retried_messages = REGISTRY.counter(
+    "sakura_retried_messages_total", "Failed messages republished to a delay queue.", ("queue",),
+)
+dead_lettered_messages = REGISTRY.counter(
+    "sakura_dead_lettered_messages_total", "Failed messages moved to the dead-letter queue.", ("queue",),
+)
+drain_duration = REGISTRY.histogram(
+    "sakura_drain_duration_seconds", "Time a subscriber took to drain its in-flight deliveries.", ("queue",),
+)
+drain_abandoned_messages = REGISTRY.counter(
+    "sakura_drain_abandoned_messages_total", "Deliveries still in flight when a drain hit its deadline.", ("queue",),
+)
+outbound_buffered_messages = REGISTRY.gauge(
+    "sakura_outbound_buffered_messages", "Publishes held by the outbound buffer until the broker is reachable.",
+)
+outbound_spilled_messages = REGISTRY.counter(
+    "sakura_outbound_spilled_messages_total", "Buffered publishes spilled to the segment file.",
+)
+outbound_dropped_messages = REGISTRY.counter(
+    "sakura_outbound_dropped_messages_total",
+    "Buffered publishes dropped after an error other than the broker being away.",
+)
+open_connections = REGISTRY.gauge(
+    "sakura_open_connections", "Broker connections opened by the client.", ("role",),
+)
+channel_pool_size = REGISTRY.gauge(
+    "sakura_channel_pool_size", "Channels the publishing pool may open.",
+)
+channel_pool_created = REGISTRY.gauge(
+    "sakura_channel_pool_created", "Channels the publishing pool has opened.",
+)
+channel_pool_in_use = REGISTRY.gauge(
+    "sakura_channel_pool_in_use", "Pooled channels currently acquired.",
+)
+dedicated_channels = REGISTRY.gauge(
+    "sakura_dedicated_channels", "Channels pinned by consumers and pullers outside of the pool.", ("owner",),
+)
+reconnects = REGISTRY.counter(
+    "sakura_reconnects_total", "Broker connections re-established by the robust connection.",
+)
+http_request_duration = REGISTRY.histogram(
+    "sakura_http_request_duration_seconds", "HTTP request handling time.", ("method", "endpoint", "status"),
+)
+lifecycle_phase_duration = REGISTRY.histogram(
+    "sakura_lifecycle_phase_duration_seconds", "Time a provider took to start up or tear down.", ("provider", "phase"),
+)
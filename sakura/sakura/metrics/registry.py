@@ -0,0 +1,199 @@
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import get_ident
+from typing import Optional
+
+# 100us .. ~10s, roughly x2.5 per bucket
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+
+class _Child:
+    """
+    A single labelled time series.
+    Values are kept in one shard per thread (i.e. per event loop), so the hot path never takes a lock;
+    shards are only merged when the metric is collected.
+    """
+    __slots__ = ("_shards",)
+
+    def __init__(self):
+        self._shards: dict[int, list] = {}
+
+    def _new_shard(self) -> list:
+        return [0.0]
+
+    def _shard(self) -> list:
+        shard = self._shards.get(get_ident())
+        if shard is None:
+            shard = self._shards.setdefault(get_ident(), self._new_shard())
+        return shard
+
+
+class CounterChild(_Child):
+    __slots__ = ()
+
+    def inc(self, amount: float = 1):
+        shard = self._shards.get(get_ident()) or self._shard()
+        shard[0] += amount
+
+    @property
+    def value(self) -> float:
+        return sum(shard[0] for shard in list(self._shards.values()))
+
+
+class GaugeChild(CounterChild):
+    """
+    Gauges are summed over the per-loop shards, `set` only replaces the calling loop's share.
+    """
+    __slots__ = ()
+
+    def dec(self, amount: float = 1):
+        shard = self._shards.get(get_ident()) or self._shard()
+        shard[0] -= amount
+
+    def set(self, value: float):  # noqa: A003
+        shard = self._shards.get(get_ident()) or self._shard()
+        shard[0] = value
+
+
+class HistogramChild(_Child):
+    __slots__ = ("bounds",)
+
+    def __init__(self, bounds: tuple[float, ...]):
+        super().__init__()
+        self.bounds = bounds
+
+    def _new_shard(self) -> list:
+        # [sum, count, bucket_0, ..., bucket_n, +Inf bucket]
+        return [0.0, 0] + [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float):
+        shard = self._shards.get(get_ident()) or self._shard()
+        shard[0] += value
+        shard[1] += 1
+        shard[2 + bisect_left(self.bounds, value)] += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    @property
+    def value(self) -> tuple[float, int, list[int]]:
+        total, count, buckets = 0.0, 0, [0] * (len(self.bounds) + 1)
+        for shard in list(self._shards.values()):
+            total += shard[0]
+            count += shard[1]
+            for i, bucket in enumerate(shard[2:]):
+                buckets[i] += bucket
+
+        return total, count, buckets
+
+
+class Metric:
+    type: str  # noqa: A003
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], _Child] = {}
+
+    def _new_child(self) -> _Child:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> _Child:
+        if child := self._children.get(values):
+            return child
+
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {values}")
+
+        return self._children.setdefault(values, self._new_child())
+
+    def children(self) -> list[tuple[dict[str, str], _Child]]:
+        return [(dict(zip(self.labelnames, values)), child) for values, child in list(self._children.items())]
+
+
+class Counter(Metric):
+    type = "counter"  # noqa: A003
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    type = "gauge"  # noqa: A003
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+    def set(self, value: float):  # noqa: A003
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    type = "histogram"  # noqa: A003
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if existing := self._metrics.get(metric.name):
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} is already registered with a different definition")
+            return existing
+
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def collect(self) -> list[Metric]:
+        return list(self._metrics.values())
+
+
+REGISTRY = MetricsRegistry()
@@ -8,6 +8,7 @@ from sakura.logging import Logger
 from sakura.providers import Provider
 from sakura.sakura import Sakura
 from sakura.settings import Settings
+from sakura.supervisor import WorkerSupervisor
 from sakura.utils.decorators import DynamicSelfFunc
 from sakura.utils.factory import dict_factory, list_factory
 
@@ -41,7 +42,14 @@ class Microservice(type):
         providers = dict_factory(settings.providers, Provider)
         loggers = list_factory(settings.loggers, Logger)
 
-        cls.__sakura_service = Sakura(providers=providers, loggers=loggers)
+        cls.__sakura_service = Sakura(
+            providers=providers,
+            loggers=loggers,
+            dependencies={name: value.get("depends_on", ()) for name, value in settings.providers.items()},
+            startup_timeout=settings.startup_timeout,
+            shutdown_timeout=settings.shutdown_timeout,
+        )
+        cls.settings = settings
         sakura = cls.__sakura_service
 
         sakura.setup()
@@ -60,5 +68,13 @@ class Microservice(type):
             cls._instance = super().__new__(cls, name, bases, attrs)
             DynamicSelfFunc._instance = cls._instance
 
-        asyncio.run(cls.__sakura_service.start())
+        if cls.settings.workers > 1:
+            # Workers are forked only now, so they all inherit the fully declared service class
+            WorkerSupervisor(
+                lambda: asyncio.run(cls.__sakura_service.start()),
+                cls.settings.workers,
+                shutdown_timeout=cls.settings.worker_shutdown_timeout,
+            ).run()
+        else:
+            asyncio.run(cls.__sakura_service.start())
         return cls._instance
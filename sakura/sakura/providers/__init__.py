@@ -1,9 +1,15 @@
 import pkgutil
 
+from sakura.utils.factory import get_registry
+
 from .provider import Provider
 
+# Lets separately installed providers add their modules to this package, see `sakura/__init__.py`
+__path__ = pkgutil.extend_path(__path__, __name__)
+
 __all__ = ["Provider"]
-for loader, module_name, _ in pkgutil.walk_packages(__path__):
-    __all__.append(module_name)
-    _module = loader.find_module(module_name).load_module(module_name)
-    globals()[module_name] = _module
+
+# Providers are imported when a setting names them, so services don't load the dependencies of unused ones.
+# Providers shipped as separate distributions register themselves through the "sakura.providers" entry points
+registry = get_registry(Provider, "sakura.providers")
+registry.register("RabbitMQProvider", "sakura.providers.rabbitmq_provider.provider:RabbitMQProvider")
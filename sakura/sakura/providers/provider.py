@@ -3,12 +3,23 @@ from abc import abstractmethod
 
 
 class Provider:
+    # Set by the lifecycle engine before setup() runs
+    ready_callback: typing.Optional[typing.Callable[[], None]] = None
+
     def setup(self) -> typing.Coroutine:
         pass
 
     async def teardown(self):
         pass
 
+    def notify_ready(self):
+        """
+        Marks the provider as ready. Providers are ready once setup() returns, so only those that keep serving
+        inside setup(), like an HTTP server, need to call this.
+        """
+        if self.ready_callback is not None:
+            self.ready_callback()
+
     @abstractmethod
     def get_dependency(self) -> typing.Any:
         raise NotImplementedError
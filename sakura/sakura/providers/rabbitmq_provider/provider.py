@@ -1,11 +1,14 @@
 import typing
+from logging import getLogger
 from typing import Any
 
 from sakura.providers import Provider
-from sakura.rabbitmq import RabbitMQClient
+from sakura.pubsub.client import PubSubClient
 from sakura.settings import SakuraBaseSettings
 from sakura.utils.factory import client_factory
 
+logger = getLogger(__name__)
+
 
 class ClientSettings(SakuraBaseSettings):
     type: str  # noqa: A003
@@ -15,22 +18,35 @@ class ClientSettings(SakuraBaseSettings):
 class RabbitMQProvider(Provider):
     class Settings(SakuraBaseSettings):
         client: ClientSettings
+        # Kept below the service's shutdown_timeout, so the client still gets closed after a drain gave up
+        drain_timeout: float = 20
+        # Consumers that must be attached before the provider is ready, so providers depending on it, like an
+        # HTTP server, don't take traffic before then. Whatever starts those subscribers can't depend on it, and
+        # once functions only run after every provider is ready, so they can't start them either
+        ready_consumers: int = 0
 
     def __init__(self, settings: Settings):
         self.settings = settings
-        self.__client: RabbitMQClient = client_factory(
+        self.__client: PubSubClient = client_factory(
             self.settings.client.params,
             self.settings.client.type,
-            RabbitMQClient,
+            PubSubClient,
         )
 
         self.is_open = False
 
     def setup(self) -> typing.Coroutine:
-        return self.__client.setup()
+        return self.start()
+
+    async def start(self):
+        await self.__client.setup()
+        if self.settings.ready_consumers:
+            logger.info(f"Waiting for {self.settings.ready_consumers} consumers to attach")
+            await self.__client.wait_consuming(self.settings.ready_consumers)
 
     async def teardown(self):
-        return self.__client.close()
+        await self.__client.drain(self.settings.drain_timeout)
+        await self.__client.close()
 
     def get_dependency(self) -> Any:
         return self.__client
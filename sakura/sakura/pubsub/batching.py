@@ -0,0 +1,57 @@
+import asyncio
+from collections.abc import Awaitable
+from typing import Any, Callable, Optional
+
+
+class BatchCollector:
+    """
+    Buffers items until `batch_size` of them arrived or `max_wait` milliseconds passed since the first one,
+    then hands the batch to `handler`. Batches are handled one at a time, in arrival order.
+    """
+
+    def __init__(self, handler: Callable[[list[Any]], Awaitable[Any]], batch_size: int, max_wait: int):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._handler = handler
+        self._buffer: list[Any] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    async def add(self, item: Any):
+        self._buffer.append(item)
+
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait / 1000, self._flush_later)
+
+    async def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            await self._handler(batch)
+
+    async def join(self):
+        await self.flush()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    def _flush_later(self):
+        self._timer = None
+        task = asyncio.get_running_loop().create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
@@ -1,7 +1,155 @@
+import asyncio
+import warnings
 from abc import abstractmethod
+from collections.abc import Awaitable
+from logging import getLogger
+from typing import Any, Callable, Optional
+
+from sakura.decoders.decoder import Decoder
+from sakura.utils.factory import get_registry
+
+logger = getLogger(__name__)
+
+DEFAULT_PULL_TIMEOUT_MS = 1000
+
+
+def pull_timeout_ms(timeout_ms: Optional[int], seconds: Optional[float], name: str) -> int:
+    """
+    Returns the pull deadline in milliseconds. It used to be given in seconds, which is still accepted with a warning.
+    """
+    if seconds is None:
+        return DEFAULT_PULL_TIMEOUT_MS if timeout_ms is None else timeout_ms
+    if timeout_ms is not None:
+        raise TypeError(f"Pass either {name} or {name}_ms, not both")
+
+    warnings.warn(f"{name} in seconds is deprecated, use {name}_ms instead", DeprecationWarning, stacklevel=3)
+    return int(seconds * 1000)
 
 
 class PubSubClient:
+    _drain_listeners: tuple[Callable[[float], Awaitable[bool]], ...] = ()
+    _consuming: int = 0
+    _consuming_changed: Optional[asyncio.Event] = None
+
     @abstractmethod
     def setup(self):
         raise NotImplementedError
+
+    @abstractmethod
+    async def close(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def produce(self, exchange: Any, routing_key: str, payload: Any, **kwargs: Any):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def produce_many(self, exchange: Any, routing_key: str, payloads: Any, **kwargs: Any):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def republish(self, message: Any, routing_key: str, headers: dict):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def call(self, exchange: Any, routing_key: str, payload: Any, timeout: float = 30, **kwargs: Any) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reply(self, request: Any, payload: Any):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def consume(self, queue: Any, callback: Callable, **kwargs: Any):
+        raise NotImplementedError
+
+    async def set_prefetch(self, queue: Any, prefetch_count: int) -> bool:  # noqa: ARG002
+        """
+        Changes the prefetch count of the queue's running consumer, returns False if there's none
+        or the client can't change it.
+        """
+        return False
+
+    async def message_count(self, queue: Any) -> Optional[int]:  # noqa: ARG002
+        """
+        Returns the number of messages ready in the queue, None for clients that can't tell.
+        """
+        return None
+
+    @abstractmethod
+    async def get_messages(
+        self,
+        queue: Any,
+        count: int,
+        timeout: Optional[float] = None,
+        *,
+        timeout_ms: Optional[int] = None,
+    ) -> list:
+        raise NotImplementedError
+
+    def message_decoder(self, message: Any, decoder: Decoder) -> Decoder:  # noqa: ARG002
+        """
+        Returns the decoder the request of a consumed message decodes its data with, given the `decoder` for its
+        content type. Clients whose messages carry something other than an encoded body hand out their own.
+        """
+        return decoder
+
+    def add_connection_listener(self, on_lost: Callable, on_restored: Callable):
+        """
+        Registers callbacks for connection loss and recovery, a no-op for clients without a connection.
+        """
+
+    async def flush(self):
+        """
+        Waits until buffered publishes are confirmed, a no-op for clients that don't buffer.
+        """
+
+    async def wait_writable(self):
+        """
+        Waits until the client takes publishes without buffering more, returns at once for clients that don't buffer.
+        """
+
+    def add_drain_listener(self, on_drain: Callable[[float], Awaitable[bool]]):
+        """
+        Registers a coroutine function run by `drain()` with the timeout, which stops a consumer and waits
+        for its in-flight deliveries. It returns whether they all finished in time.
+        """
+        self._drain_listeners = (*self._drain_listeners, on_drain)
+
+    def _consumer_attached(self, attached: bool = True):
+        # Called by `consume()` once deliveries can arrive, and again with False when it stops
+        self._consuming += 1 if attached else -1
+        if self._consuming_changed is not None:
+            self._consuming_changed.set()
+
+    async def wait_consuming(self, count: int = 1):
+        """
+        Waits until at least `count` consumers are attached to their queues.
+        """
+        if self._consuming_changed is None:
+            self._consuming_changed = asyncio.Event()
+        while self._consuming < count:
+            self._consuming_changed.clear()
+            await self._consuming_changed.wait()
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Stops the consumers and waits up to `timeout` seconds for their in-flight deliveries to be handled
+        and for buffered publishes to be confirmed, so `close()` doesn't cut them off.
+        Returns whether everything finished in time.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        drained = all(await asyncio.gather(*(on_drain(timeout) for on_drain in self._drain_listeners)))
+
+        try:
+            await asyncio.wait_for(self.flush(), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            logger.warning(f"Buffered publishes weren't confirmed within the {timeout} seconds drain timeout")
+            return False
+        return drained
+
+
+registry = get_registry(PubSubClient, "sakura.clients")
+registry.register("RabbitMQClient", "sakura.rabbitmq.rabbitmq_client:RabbitMQClient")
+registry.register("InMemoryClient", "sakura.inmemory.inmemory_client:InMemoryClient")
@@ -0,0 +1,151 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import sqlite3
+import time
+from abc import abstractmethod
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+
+def hash_message_id(message_id: str) -> int:
+    """
+    Hashes a message id into a signed 64-bit key. Collisions are negligible for the number of ids a dedup store
+    keeps, and the keys take 8 bytes each whatever the id looks like.
+    """
+    return int.from_bytes(hashlib.blake2b(message_id.encode(), digest_size=8).digest(), "little", signed=True)
+
+
+class DedupStore:
+    """
+    Remembers keys of recently processed messages, so a subscriber can skip redeliveries of them.
+    """
+
+    @abstractmethod
+    async def contains(self, key: int) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add(self, key: int):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryDedupStore(DedupStore):
+    """
+    Keeps the last `capacity` keys, each for at most `ttl` seconds when given.
+    Keys are stored in insertion order in a preallocated ring of 64-bit ints next to a set for lookups,
+    so a full store evicts the oldest key and expiring keys only needs to look at the oldest end of the ring.
+    """
+
+    def __init__(self, capacity: int = 100_000, ttl: Optional[float] = None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+
+        self.capacity = capacity
+        self.ttl = ttl
+        self._keys = array("q", bytes(8 * capacity))
+        self._added_at = array("d", bytes(8 * capacity)) if ttl is not None else None
+        self._members: set[int] = set()
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    async def contains(self, key: int) -> bool:
+        if self._added_at is not None:
+            self._expire(time.monotonic() - self.ttl)
+        return key in self._members
+
+    async def add(self, key: int):
+        if key in self._members:
+            return
+
+        if self._size == self.capacity:
+            self._members.discard(self._keys[self._head])
+            self._size -= 1
+
+        self._keys[self._head] = key
+        if self._added_at is not None:
+            self._added_at[self._head] = time.monotonic()
+        self._members.add(key)
+        self._head = (self._head + 1) % self.capacity
+        self._size += 1
+
+    def _expire(self, cutoff: float):
+        while self._size:
+            oldest = (self._head - self._size) % self.capacity
+            if self._added_at[oldest] > cutoff:
+                return
+            self._members.discard(self._keys[oldest])
+            self._size -= 1
+
+
+class SQLiteDedupStore(DedupStore):
+    """
+    Keeps keys in a SQLite database, so they survive restarts and can be shared by the workers of a host.
+    Lookups are single primary key reads, old keys are pruned every `prune_interval` additions.
+    The database is only used from a dedicated thread, so the event loop never waits on the disk.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        capacity: int = 1_000_000,
+        ttl: Optional[float] = None,
+        prune_interval: int = 1000,
+    ):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.prune_interval = prune_interval
+        self._added = 0
+        self._closed = False
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="sakura-dedup")
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS processed (key INTEGER PRIMARY KEY, added_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS processed_added_at ON processed (added_at)")
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def contains(self, key: int) -> bool:
+        added_at = await self._run(self._lookup, key)
+        return added_at is not None and (self.ttl is None or added_at > time.time() - self.ttl)
+
+    async def add(self, key: int):
+        await self._run(self._add, key)
+
+    def _lookup(self, key: int) -> Optional[float]:
+        row = self._db.execute("SELECT added_at FROM processed WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _add(self, key: int):
+        self._db.execute("INSERT OR REPLACE INTO processed (key, added_at) VALUES (?, ?)", (key, time.time()))
+        self._added += 1
+        if self._added % self.prune_interval == 0:
+            self.prune()
+
+    def prune(self):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM processed WHERE added_at <= ?", (time.time() - self.ttl,))
+
+        (count,) = self._db.execute("SELECT COUNT(*) FROM processed").fetchone()
+        if count > self.capacity:
+            self._db.execute(
+                "DELETE FROM processed WHERE key IN (SELECT key FROM processed ORDER BY added_at LIMIT ?)",
+                (count - self.capacity,),
+            )
+
+    async def close(self):
+        # Partitions of a partitioned subscriber share the store and each close it on shutdown
+        if self._closed:
+            return
+        self._closed = True
+        await self._run(self._db.close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,57 @@
+import dataclasses
+import random
+import time
+from enum import Enum
+from typing import Optional
+
+
+class SubscriberState(str, Enum):
+    STARTING = "starting"
+    RUNNING = "running"
+    RECONNECTING = "reconnecting"
+    BACKOFF = "backoff"
+    DRAINING = "draining"
+    STOPPED = "stopped"
+
+
+@dataclasses.dataclass
+class Backoff:
+    """
+    Exponential backoff with equal jitter: half of the exponential delay is kept and the other half is random,
+    so restarts of many consumers that failed together get spread out instead of hitting the broker at once.
+    """
+    initial: float = 5
+    maximum: float = 60
+    multiplier: float = 2
+
+    def delay(self, attempt: int) -> float:
+        delay = min(self.maximum, self.initial * self.multiplier ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)  # noqa: S311
+
+
+@dataclasses.dataclass
+class SubscriberHealth:
+    client_id: str
+    queue: Optional[str]
+    state: SubscriberState = SubscriberState.STARTING
+    restarts: int = 0
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
+    state_since: float = dataclasses.field(default_factory=time.monotonic)
+
+    @property
+    def is_healthy(self) -> bool:
+        return self.state == SubscriberState.RUNNING
+
+    def set_state(self, state: SubscriberState):
+        if state != self.state:
+            self.state = state
+            self.state_since = time.monotonic()
+
+    def as_dict(self) -> dict:
+        return {
+            **dataclasses.asdict(self),
+            "state": self.state.value,
+            "healthy": self.is_healthy,
+            "state_for": time.monotonic() - self.state_since,
+        }
@@ -1,37 +1,112 @@
-import dataclasses
 from abc import abstractmethod
-from typing import Callable, Optional
+from enum import Enum
+from typing import Any, Optional, Union
 
+from sakura.codecs.compression import decompress
+from sakura.decoders.decoder import Decoder
 from sakura.utils.types import DecoratedCallable
 
 
-@dataclasses.dataclass
+class ConcurrencyMode(str, Enum):
+    INLINE = "inline"
+    ASYNCIO = "asyncio"
+    THREAD = "thread"
+    PROCESS = "process"
+
+
+_MISSING = object()
+
+
 class PubSubRequest:
-    raw_data: bytes
-    _approve: Callable
-    _decline: Callable
-    message_headers: dict
-    content_encoding: str
-    content_type: str
-    data: Optional[dict] = None
-    message_id: Optional[str] = None
-    extra: Optional[dict] = None
-    auto_ack: bool = True
+    """
+    A delivery as handed to handlers.
+    Wraps the incoming message instead of copying it: `raw_data` is a memoryview over the body, and `data`,
+    `message_headers` and `extra` are only built on first access, so handlers that route on headers alone
+    never parse the body. Compressed bodies are decompressed by their `content_encoding` on first access too.
+    """
+
+    __slots__ = ("message", "queue", "auto_ack", "approved", "_decoder", "_body", "_data", "_extra")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        message: Any,
+        queue: Optional[str] = None,
+        auto_ack: bool = True,
+        decoder: Optional[Decoder] = None,
+        data: Any = _MISSING,
+    ):
+        self.message = message
+        self.queue = queue
+        self.auto_ack = auto_ack
+        # Whether the handler acked the message itself, only ever set with auto_ack=False
+        self.approved = False
+        self._decoder = decoder
+        self._body: Optional[bytes] = None
+        self._data = data
+        self._extra: Optional[dict] = None
+
+    @property
+    def body(self) -> Optional[bytes]:
+        if self._body is None and self.message.body is not None:
+            self._body = decompress(self.message.body, self.content_encoding)
+        return self._body
+
+    @property
+    def raw_data(self) -> Optional[memoryview]:
+        body = self.body
+        return None if body is None else memoryview(body)
+
+    @property
+    def data(self) -> Any:
+        if self._data is _MISSING:
+            self._data = self._decoder.decode(self.body)
+        return self._data
+
+    @data.setter
+    def data(self, value: Any):
+        self._data = value
+
+    @property
+    def message_headers(self) -> dict:
+        return self.message.headers_raw
+
+    @property
+    def content_encoding(self) -> Optional[str]:
+        return self.message.content_encoding
+
+    @property
+    def content_type(self) -> Optional[str]:
+        return self.message.content_type
+
+    @property
+    def message_id(self) -> Optional[str]:
+        return self.message.message_id
+
+    @property
+    def extra(self) -> dict:
+        if self._extra is None:
+            self._extra = {
+                "queue": self.queue,
+                "exchange": self.message.exchange,
+                "routing_key": self.message.routing_key,
+            }
+        return self._extra
 
     async def approve(self):
         if self.auto_ack:
             raise TypeError("approve() is not supported with auto_ack=True")
-        await self._approve()
+        await self.message.ack()
+        self.approved = True
 
     async def decline(self):
         if self.auto_ack:
             raise TypeError("decline() is not supported with auto_ack=True")
-        await self._decline()
+        await self.message.nack()
 
 
 class PubSubApp:
     request: PubSubRequest
 
     @abstractmethod
-    async def __call__(self, request: PubSubRequest, handler: DecoratedCallable):
+    async def __call__(self, request: Union[PubSubRequest, list[PubSubRequest]], handler: DecoratedCallable):
         raise NotImplementedError
@@ -0,0 +1,34 @@
+import inspect
+import typing
+from typing import Any, Callable, Optional
+
+from sakura.pubsub.types import PubSubRequest
+
+
+def get_handler_schema(func: Callable, batch: bool = False) -> Optional[Any]:
+    """
+    Returns the type the handler expects its payload to be, taken from the annotation of the parameter the payload
+    is passed to, its first positional one, or None when that one isn't annotated or takes the `PubSubRequest`.
+    Other parameters, like dependencies, are never used for validation.
+    For batch handlers a `list[T]` annotation gives `T`, since messages are validated one by one.
+    """
+    func = inspect.unwrap(func)
+    try:
+        hints = typing.get_type_hints(func)
+    except (NameError, TypeError):
+        return None
+
+    parameters = [parameter for name, parameter in inspect.signature(func).parameters.items() if name != "self"]
+    positional = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    if not parameters or parameters[0].kind not in positional:
+        return None
+
+    hint = hints.get(parameters[0].name)
+    if hint is None:
+        return None
+
+    item = typing.get_args(hint)[0] if typing.get_origin(hint) is list and typing.get_args(hint) else hint
+    if item is PubSubRequest:
+        return None
+
+    return item if batch else hint
@@ -0,0 +1,188 @@
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import inspect
+import logging
+from collections.abc import Awaitable, Hashable
+from typing import Any, Callable, Optional
+
+import anyio
+from asyncer import asyncify
+
+from sakura.pubsub.types import ConcurrencyMode, PubSubRequest
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """
+    Runs `handler` on `size` asyncio worker tasks fed through a bounded queue.
+    `submit` blocks while the queue is full. aiormq calls the consumer callback in a task of its own for every
+    delivery though, so this only holds those tasks back, it's the prefetch count that bounds the deliveries.
+    """
+
+    def __init__(self, handler: Callable[[Any], Awaitable[Any]], size: int, maxsize: int):
+        self.size = size
+        self.maxsize = maxsize
+        self._handler = handler
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self):
+        if self.is_running:
+            return
+
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [loop.create_task(self._work()) for _ in range(self.size)]
+
+    async def submit(self, item: Any):
+        await self._queue.put(item)
+
+    async def join(self):
+        if self._queue:
+            await self._queue.join()
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self):
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._handler(item)
+            except Exception:
+                logger.exception("Unhandled error in worker")
+            finally:
+                self._queue.task_done()
+
+
+class KeyedWorkerPool:
+    """
+    Runs `handler` on items in submission order per key, and on up to `size` keys at a time.
+    Every key with pending items gets a lane, a deque drained by a task of its own, that is dropped once it's empty,
+    so there are never more lanes than items in flight. `submit` blocks while `maxsize` items are in flight.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[Any]],
+        key: Callable[[Any], Hashable],
+        size: int,
+        maxsize: int,
+    ):
+        self.size = size
+        self.maxsize = maxsize
+        self._handler = handler
+        self._key = key
+        self._lanes: dict[Hashable, collections.deque] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._capacity: Optional[asyncio.Semaphore] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._slots is not None
+
+    @property
+    def pending(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def start(self):
+        if not self.is_running:
+            self._slots = asyncio.Semaphore(self.size)
+            self._capacity = asyncio.Semaphore(self.maxsize)
+
+    async def submit(self, item: Any):
+        await self._capacity.acquire()
+        key = self._key(item)
+        if (lane := self._lanes.get(key)) is not None:
+            lane.append(item)
+            return
+
+        self._lanes[key] = collections.deque([item])
+        task = asyncio.get_running_loop().create_task(self._drain(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def join(self):
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._lanes.clear()
+        self._slots = self._capacity = None
+
+    async def _drain(self, key: Hashable):
+        async with self._slots:
+            lane = self._lanes[key]
+            while lane:
+                # The item stays in the lane while it's handled, so later items of the key queue up behind it
+                try:
+                    await self._handler(lane[0])
+                except Exception:
+                    logger.exception("Unhandled error in worker")
+                finally:
+                    lane.popleft()
+                    self._capacity.release()
+
+            del self._lanes[key]
+
+
+def offload_sync_handler(
+    func: Callable,
+    mode: ConcurrencyMode,
+    concurrency: int,
+    executor: Optional[concurrent.futures.Executor] = None,
+) -> tuple[Callable, Optional[concurrent.futures.Executor]]:
+    """
+    Wraps a sync handler so it runs off the event loop, in a thread (through `asyncify`, the same way
+    `Sakura.once` does) or in a process pool, which is reused when passed as `executor`.
+    Async handlers and the inline/asyncio modes are returned as is.
+    A request holds the channel it was delivered on and can't be pickled, so in process mode the handler is
+    called with its decoded payload, `request.data`, instead. The handler, the payload and the result
+    must be picklable.
+    """
+    if inspect.iscoroutinefunction(func) or mode in (ConcurrencyMode.INLINE, ConcurrencyMode.ASYNCIO):
+        return func, None
+
+    if mode is ConcurrencyMode.THREAD:
+        return asyncify(func, limiter=anyio.CapacityLimiter(concurrency)), None
+
+    if executor is None:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=concurrency)
+
+    @functools.wraps(func)
+    async def run_in_process(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        args = [_payload(arg) for arg in args]
+        kwargs = {name: _payload(arg) for name, arg in kwargs.items()}
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    return run_in_process, executor
+
+
+def _payload(arg: Any) -> Any:
+    if isinstance(arg, PubSubRequest):
+        return arg.data
+    if isinstance(arg, list) and arg and all(isinstance(item, PubSubRequest) for item in arg):
+        # Batch handlers get a list of requests
+        return [item.data for item in arg]
+    return arg
@@ -1,5 +1,18 @@
-from .rabbitmq_client import RabbitMQClient
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .rabbitmq_client import RabbitMQClient  # noqa: TCH004
 
 __all__ = [
     "RabbitMQClient",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Importing the client pulls in aio_pika, which modules that only need `sakura.rabbitmq.types` don't need
+    if name == "RabbitMQClient":
+        from .rabbitmq_client import RabbitMQClient
+
+        return RabbitMQClient
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,42 @@
+import asyncio
+from collections.abc import Awaitable
+from typing import Callable, Optional
+
+from aio_pika.abc import AbstractRobustConnection
+
+
+class ConnectionGroup:
+    """
+    Fixed-size group of robust connections, opened lazily and handed out round-robin so that
+    channels spread over several TCP connections to the broker.
+    """
+
+    def __init__(self, factory: Callable[[], Awaitable[AbstractRobustConnection]], size: int, name: str):
+        self.name = name
+        self.size = size
+        self._factory = factory
+        self._connections: list[AbstractRobustConnection] = []
+        self._next = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def opened(self) -> int:
+        return len(self._connections)
+
+    async def get(self) -> AbstractRobustConnection:
+        if len(self._connections) < self.size:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+
+            async with self._lock:
+                if len(self._connections) < self.size:
+                    self._connections.append(await self._factory())
+                    return self._connections[-1]
+
+        connection = self._connections[self._next % len(self._connections)]
+        self._next += 1
+        return connection
+
+    async def close(self):
+        connections, self._connections = self._connections, []
+        await asyncio.gather(*(connection.close() for connection in connections), return_exceptions=True)
@@ -0,0 +1,316 @@
+import asyncio
+import collections
+import contextlib
+import itertools
+import json
+import mmap
+import struct
+from collections.abc import Awaitable, Iterator
+from logging import getLogger
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import aio_pika
+from aio_pika.exceptions import AMQPConnectionError, ChannelInvalidStateError
+from pamqp.header import ContentHeader
+
+from sakura.metrics import instruments
+from sakura.pubsub.supervision import Backoff
+from sakura.rabbitmq.settings import OutboundSettings
+from sakura.rabbitmq.types import Exchange
+
+logger = getLogger(__name__)
+
+# Failures caused by the broker being unreachable, publishes failing with these are buffered and replayed
+BROKER_UNAVAILABLE = (AMQPConnectionError, ChannelInvalidStateError, ConnectionError, asyncio.TimeoutError)
+
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<II")
+
+Publish = Callable[[Exchange, str, list[aio_pika.Message], bool], Awaitable[Any]]
+
+
+def encode_record(exchange: Exchange, routing_key: str, message: aio_pika.Message, declare: bool) -> bytes:
+    """
+    Encodes a publish, keeping the message's properties in the content header the broker would have received.
+    Raises TypeError for header values AMQP can't carry, just like publishing the message directly would.
+    """
+    meta = json.dumps({"exchange": exchange.name, "routing_key": routing_key, "declare": declare}).encode()
+    header = ContentHeader(body_size=len(message.body), properties=message.properties).marshal()
+    return _HEADER.pack(len(meta), len(header)) + meta + header + message.body
+
+
+def decode_record(record: bytes) -> tuple[str, str, aio_pika.Message, bool]:
+    meta_length, header_length = _HEADER.unpack_from(record)
+    meta = json.loads(record[_HEADER.size:_HEADER.size + meta_length])
+    header = ContentHeader()
+    header.unmarshal(record[_HEADER.size + meta_length:_HEADER.size + meta_length + header_length])
+    body_offset = _HEADER.size + meta_length + header_length
+    properties = header.properties
+    # The header carries the expiration in milliseconds, messages take it in seconds
+    expiration = None if properties.expiration is None else int(properties.expiration) / 1000
+    message = aio_pika.Message(
+        bytes(record[body_offset:body_offset + header.body_size]),
+        headers=properties.headers,
+        content_type=properties.content_type,
+        content_encoding=properties.content_encoding,
+        delivery_mode=properties.delivery_mode,
+        priority=properties.priority,
+        correlation_id=properties.correlation_id,
+        reply_to=properties.reply_to,
+        expiration=expiration,
+        message_id=properties.message_id,
+        timestamp=properties.timestamp,
+        type=properties.message_type,
+        user_id=properties.user_id,
+        app_id=properties.app_id,
+    )
+    return meta["exchange"], meta["routing_key"], message, meta["declare"]
+
+
+class SpillSegment:
+    """
+    Append-only segment of length-prefixed records in a memory-mapped file of fixed size.
+    Records are read back from the front. Once all of them were read the segment is rewound and reused, and once the
+    read ones take up half of it the unread ones are moved to the front and the file is cut back to them, so a long
+    outage that's only partially replayed gives the disk space back as it goes.
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = Path(path)
+        self.size = size
+        self._file = self.path.open("w+b")
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._read = 0
+        self._write = 0
+        self.records = 0
+
+    @property
+    def used(self) -> int:
+        return self._write - self._read
+
+    def append(self, record: bytes) -> bool:
+        end = self._write + _LENGTH.size + len(record)
+        if end > self.size and self._read:
+            self.compact()
+            end = self._write + _LENGTH.size + len(record)
+        if end > self.size:
+            return False
+
+        _LENGTH.pack_into(self._map, self._write, len(record))
+        self._map[self._write + _LENGTH.size:end] = record
+        self._write = end
+        self.records += 1
+        return True
+
+    def __iter__(self) -> Iterator[bytes]:
+        offset = self._read
+        while offset < self._write:
+            (length,) = _LENGTH.unpack_from(self._map, offset)
+            offset += _LENGTH.size + length
+            yield self._map[offset - length:offset]
+
+    def pop(self):
+        (length,) = _LENGTH.unpack_from(self._map, self._read)
+        self._read += _LENGTH.size + length
+        self.records -= 1
+        if not self.records:
+            self._read = self._write = 0
+        elif self._read >= self.size // 2:
+            self.compact()
+
+    def compact(self):
+        used = self.used
+        self._map.move(0, self._read, used)
+        self._map.flush()
+        # Shrinking the file frees the blocks past the unread records, growing it again only leaves a hole
+        self._map.close()
+        self._file.truncate(used)
+        self._file.truncate(self.size)
+        self._map = mmap.mmap(self._file.fileno(), self.size)
+        self._read = 0
+        self._write = used
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+        self.path.unlink()
+
+
+class OutboundBuffer:
+    """
+    Holds publishes the broker couldn't take and replays them in order once it's reachable again.
+    Messages are kept encoded in a ring bounded by `max_bytes`, which spills into a memory-mapped segment file
+    of `spill_bytes` when `spill_path` is set. Once both are full, `put` waits until replaying made room,
+    so producers are slowed down instead of growing memory without bounds.
+    Replayed messages are confirmed by the broker before they leave the buffer, so a replay interrupted
+    by another disconnect may publish some messages twice.
+    """
+
+    def __init__(self, publish: Publish, settings: OutboundSettings):
+        self.settings = settings
+        self._publish = publish
+        self._memory: collections.deque[bytes] = collections.deque()
+        self._memory_bytes = 0
+        self._spill: Optional[SpillSegment] = None
+        self._exchanges: dict[str, Exchange] = {}
+        self._writable: Optional[asyncio.Event] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._empty: Optional[asyncio.Event] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self.connected = True
+
+    def __len__(self) -> int:
+        return len(self._memory) + (self._spill.records if self._spill else 0)
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._memory_bytes + (self._spill.used if self._spill else 0)
+
+    @property
+    def is_writable(self) -> bool:
+        return self._writable is None or self._writable.is_set()
+
+    def _create_events(self):
+        if self._writable is None:
+            self._writable = asyncio.Event()
+            self._writable.set()
+            self._wakeup = asyncio.Event()
+            self._empty = asyncio.Event()
+            self._empty.set()
+
+    async def wait_writable(self):
+        self._create_events()
+        await self._writable.wait()
+
+    async def put(self, exchange: Exchange, routing_key: str, message: aio_pika.Message, declare: bool = True):
+        self._create_events()
+        self._exchanges[exchange.name] = exchange
+        record = encode_record(exchange, routing_key, message, declare)
+        while not self._append(record):
+            self._writable.clear()
+            await self._writable.wait()
+
+        self._empty.clear()
+        self._observe()
+        if self._replay_task is None or self._replay_task.done():
+            self._replay_task = asyncio.get_running_loop().create_task(self._replay())
+
+    def _append(self, record: bytes) -> bool:
+        # Records only go to the ring while nothing is spilled, so everything in the ring is older than the spill
+        spilled = self._spill is not None and self._spill.records
+        if not spilled and (not self._memory or self._memory_bytes + len(record) <= self.settings.max_bytes):
+            self._memory.append(record)
+            self._memory_bytes += len(record)
+            return True
+
+        if self.settings.spill_path is None:
+            return False
+
+        if self._spill is None:
+            self._spill = SpillSegment(self.settings.spill_path, self.settings.spill_bytes)
+        if self._spill.append(record):
+            instruments.outbound_spilled_messages.inc()
+            return True
+
+        return False
+
+    def _records(self) -> Iterator[bytes]:
+        # Everything in the ring is older than the spill, see `_append`
+        return itertools.chain(self._memory, self._spill or ())
+
+    def _pop(self):
+        if self._memory:
+            self._memory_bytes -= len(self._memory.popleft())
+        else:
+            self._spill.pop()
+
+        self._writable.set()
+
+    def _observe(self):
+        instruments.outbound_buffered_messages.set(len(self))
+
+    def pause(self):
+        self.connected = False
+
+    def resume(self):
+        self.connected = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _replay(self):
+        attempt = 0
+        backoff = Backoff(initial=self.settings.retry_interval, maximum=self.settings.max_retry_interval)
+        while len(self):
+            exchange_name, routing_key, declare, messages = self._next_batch()
+            try:
+                await self._publish(self._exchanges[exchange_name], routing_key, messages, declare)
+            except BROKER_UNAVAILABLE as e:
+                delay = backoff.delay(attempt)
+                attempt += 1
+                logger.warning(f"Replaying {len(self)} buffered messages failed, retrying in {delay:.1f}s: {e!r}")
+                self._wakeup.clear()
+                # A restored connection cuts the wait short
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                continue
+            except Exception:
+                # Retrying won't help with anything but the broker being away, and stopping here would hold
+                # back every publish behind these
+                logger.exception(f"Dropping {len(messages)} buffered messages to Exchange: '{exchange_name}' "
+                                 f"with routing key '{routing_key}' that couldn't be published")
+                instruments.outbound_dropped_messages.inc(len(messages))
+
+            attempt = 0
+            for _ in messages:
+                self._pop()
+            self._observe()
+
+        self._empty.set()
+
+    def _next_batch(self) -> tuple[str, str, bool, list[aio_pika.Message]]:
+        # Consecutive messages to the same destination are published together, their confirms are pipelined
+        destination = None
+        messages = []
+        for record in self._records():
+            exchange_name, routing_key, message, declare = decode_record(record)
+            if destination is None:
+                destination = (exchange_name, routing_key, declare)
+            elif destination != (exchange_name, routing_key, declare):
+                break
+
+            messages.append(message)
+            if len(messages) >= self.settings.replay_batch_size:
+                break
+
+        return (*destination, messages)
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until every buffered message was published, returns False if some were left after `timeout`.
+        """
+        if self._empty is None:
+            return True
+
+        try:
+            await asyncio.wait_for(self._empty.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        return True
+
+    async def close(self):
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._replay_task
+
+        if len(self):
+            logger.error(f"Dropping {len(self)} buffered messages that couldn't be published")
+        self._memory.clear()
+        self._memory_bytes = 0
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._observe()
@@ -0,0 +1,80 @@
+import asyncio
+import logging
+import signal
+from typing import Any, Callable, Optional
+
+from aio_pika.abc import AbstractIncomingMessage
+
+from sakura.pubsub import Subscriber
+from sakura.pubsub.types import PubSubApp
+from sakura.rabbitmq import RabbitMQClient
+from sakura.rabbitmq.partitioning import Partitions, partition_key
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.supervisor import WorkerInfo
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionedSubscriber(Subscriber):
+    """
+    Consumes the partitions of a queue assigned to this process, each through a `RabbitMQSubscriber` of its own.
+    Within a partition deliveries of the same key are handled one after another in delivery order, while up to
+    `concurrency` keys per partition are handled at once. Other keyword arguments go to every partition's subscriber.
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        partitions: Partitions,
+        worker: Optional[WorkerInfo] = None,
+        **kwargs: Any,
+    ):
+        self.client_id = client_id
+        self.partitions = partitions
+        kwargs.setdefault("ordering_key", partition_key)
+        self.subscribers = [
+            RabbitMQSubscriber(client_id, queue, **kwargs) for queue in partitions.assigned(worker)
+        ]
+
+    async def startup(self, client: RabbitMQClient, app: PubSubApp, func: Callable):
+        for subscriber in self.subscribers:
+            await subscriber.startup(client, app, func)
+
+    async def main_loop(self, client: RabbitMQClient, app: PubSubApp, func: Callable):
+        await asyncio.gather(*(subscriber.main_loop(client, app, func) for subscriber in self.subscribers))
+
+    async def shutdown(self, client: RabbitMQClient, app: PubSubApp, func: Callable):
+        # All partitions drain before the first subscriber's shutdown closes the shared client
+        await asyncio.gather(*(subscriber.drain() for subscriber in self.subscribers))
+        for subscriber in self.subscribers:
+            await subscriber.shutdown(client, app, func)
+
+    def create_callback(self, client: RabbitMQClient, app: PubSubApp, func: Callable) -> Callable:
+        """
+        Returns a callback handing each delivery to the callback of the partition it was routed to. Deliveries
+        republished through the default exchange, like retries, are routed by the partition's queue name.
+        """
+        callbacks = {}
+        for subscriber in self.subscribers:
+            callback = subscriber.create_callback(client, app, func)
+            callbacks[subscriber.queue.routing_key] = callbacks[subscriber.queue.name] = callback
+
+        async def process(msg: AbstractIncomingMessage):
+            callback = callbacks.get(msg.routing_key)
+            if callback is None:
+                logger.error(f"Requeueing message {msg.message_id} with routing key '{msg.routing_key}', "
+                             f"it wasn't routed to a partition assigned to this process")
+                await msg.nack(requeue=True)
+                return
+
+            await callback(msg)
+
+        return process
+
+    def handle_exit(self, sig: signal.Signals) -> None:
+        super().handle_exit(sig)
+        for subscriber in self.subscribers:
+            subscriber.handle_exit(sig)
+
+    def get_health(self) -> list[dict]:
+        return [subscriber.get_health() for subscriber in self.subscribers]
@@ -0,0 +1,82 @@
+import dataclasses
+import zlib
+from collections.abc import Hashable
+from typing import Any, Optional
+
+from sakura.rabbitmq.types import Headers, Queue
+from sakura.supervisor import WorkerInfo, current_worker
+
+PARTITION_KEY = Headers.PARTITION_KEY.value
+
+
+def partition_of(key: str, count: int) -> int:
+    """
+    Maps a key onto one of `count` partitions. CRC32 is stable across processes and Python versions,
+    unlike `hash()`, so every publisher picks the same partition for a key.
+    """
+    return zlib.crc32(key.encode()) % count
+
+
+def partition_key(message: Any) -> Hashable:
+    """
+    Returns the key a delivery was partitioned by, deliveries published without one are ordered by routing key.
+    """
+    return (message.headers or {}).get(PARTITION_KEY, message.routing_key)
+
+
+@dataclasses.dataclass(frozen=True)
+class Partitions:
+    """
+    Splits `queue` into `count` partition queues named `<queue>.<index>`, bound to the queue's exchange with the
+    routing keys `<routing key>.<index>`. Messages are routed to a partition by hashing their key on the publisher,
+    so all messages of a key land on the same partition in publish order and can be handled in that order while
+    other partitions and keys are handled in parallel.
+    """
+    queue: Queue
+    count: int
+
+    def __post_init__(self):
+        if self.queue.exchange is None:
+            raise ValueError("Partitioned queues need an exchange to be bound to")
+        if self.count <= 0:
+            raise ValueError("count must be positive")
+
+    @property
+    def base_routing_key(self) -> str:
+        return self.queue.routing_key or self.queue.name
+
+    def routing_key(self, key: str) -> str:
+        return f"{self.base_routing_key}.{partition_of(key, self.count)}"
+
+    def partition(self, index: int) -> Queue:
+        return dataclasses.replace(
+            self.queue,
+            name=f"{self.queue.name}.{index}",
+            routing_key=f"{self.base_routing_key}.{index}",
+        )
+
+    def queues(self) -> list[Queue]:
+        return [self.partition(index) for index in range(self.count)]
+
+    def assigned(self, worker: Optional[WorkerInfo] = None) -> list[Queue]:
+        """
+        Returns the partitions a worker process consumes. Partitions are dealt out statically by index,
+        so each one has a single consumer and keeps its order; without workers all partitions are returned.
+        """
+        worker = worker or current_worker()
+        if worker is None:
+            return self.queues()
+
+        return [self.partition(index) for index in range(worker.index, self.count, worker.count)]
+
+    async def produce(self, client: Any, key: str, payload: Any, **kwargs: Any):
+        """
+        Publishes `payload` to the partition of `key`, which also travels in the `x-partition-key` header.
+        """
+        await client.produce(
+            self.queue.exchange,
+            self.routing_key(key),
+            payload,
+            headers={PARTITION_KEY: key},
+            **kwargs,
+        )
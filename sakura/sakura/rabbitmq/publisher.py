@@ -0,0 +1,163 @@
+import asyncio
+import dataclasses
+import time
+from collections.abc import Awaitable
+from logging import getLogger
+from typing import Any, Callable, Optional
+
+import aio_pika
+from aio_pika.abc import AbstractExchange, AbstractRobustChannel
+
+from sakura.metrics import instruments
+from sakura.rabbitmq.settings import PublisherSettings
+from sakura.rabbitmq.types import Exchange
+
+logger = getLogger(__name__)
+
+ExchangeResolver = Callable[[Exchange, AbstractRobustChannel, bool], Awaitable[AbstractExchange]]
+
+
+@dataclasses.dataclass
+class _PendingBatch:
+    exchange: Exchange
+    routing_key: str
+    declare: bool
+    entries: list[tuple[aio_pika.Message, asyncio.Future]] = dataclasses.field(default_factory=list)
+
+
+class BatchPublisher:
+    """
+    Publishes messages on a dedicated confirm-mode channel.
+    Messages are coalesced per exchange/routing key and their broker confirms are awaited in
+    pipelined windows of up to `max_inflight_confirms` instead of one round trip per message.
+    """
+
+    def __init__(
+        self,
+        channel_factory: Callable[[], Awaitable[AbstractRobustChannel]],
+        exchange_resolver: ExchangeResolver,
+        settings: PublisherSettings,
+    ):
+        self.settings = settings
+        self._channel_factory = channel_factory
+        self._exchange_resolver = exchange_resolver
+        self._channel: Optional[AbstractRobustChannel] = None
+        self._channel_lock: Optional[asyncio.Lock] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._pending: dict[tuple[str, str], _PendingBatch] = {}
+        self._linger_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set[asyncio.Task] = set()
+
+    async def setup(self):
+        self._channel_lock = asyncio.Lock()
+        self._inflight = asyncio.Semaphore(self.settings.max_inflight_confirms)
+
+    async def get_channel(self) -> AbstractRobustChannel:
+        async with self._channel_lock:
+            if self._channel is None or self._channel.is_closed:
+                self._channel = await self._channel_factory()
+
+            return self._channel
+
+    async def publish_batch(self, exchange: AbstractExchange, routing_key: str, messages: list[aio_pika.Message]):
+        published = instruments.published_messages.labels(exchange.name)
+        errors = instruments.publish_errors.labels(exchange.name)
+        latency = instruments.publish_latency.labels(exchange.name)
+
+        async def publish(message: aio_pika.Message):
+            async with self._inflight:
+                start = time.perf_counter()
+                try:
+                    result = await exchange.publish(message, routing_key)
+                except Exception:
+                    errors.inc()
+                    raise
+
+                latency.observe(time.perf_counter() - start)
+                published.inc()
+                return result
+
+        return await asyncio.gather(*(publish(message) for message in messages), return_exceptions=True)
+
+    async def publish_many(
+        self,
+        exchange: Exchange,
+        routing_key: str,
+        messages: list[aio_pika.Message],
+        declare: bool = True,
+    ):
+        channel = await self.get_channel()
+        rmq_exchange = await self._exchange_resolver(exchange, channel, declare)
+
+        for result in await self.publish_batch(rmq_exchange, routing_key, messages):
+            if isinstance(result, BaseException):
+                raise result
+
+    def submit(
+        self,
+        exchange: Exchange,
+        routing_key: str,
+        message: aio_pika.Message,
+        declare: bool = True,
+    ) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        key = (exchange.name, routing_key)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = _PendingBatch(exchange, routing_key, declare)
+
+        batch.entries.append((message, future))
+
+        if len(batch.entries) >= self.settings.batch_size:
+            self._schedule(self._pending.pop(key))
+        elif self._linger_handle is None:
+            self._linger_handle = loop.call_later(self.settings.linger_ms / 1000, self._flush_pending)
+
+        return future
+
+    async def flush(self):
+        self._flush_pending()
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    async def close(self):
+        await self.flush()
+        if self._channel is not None and not self._channel.is_closed:
+            await self._channel.close()
+
+    def _flush_pending(self):
+        if self._linger_handle is not None:
+            self._linger_handle.cancel()
+            self._linger_handle = None
+
+        pending, self._pending = self._pending, {}
+        for batch in pending.values():
+            self._schedule(batch)
+
+    def _schedule(self, batch: _PendingBatch):
+        task = asyncio.get_running_loop().create_task(self._publish_pending(batch))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _publish_pending(self, batch: _PendingBatch):
+        messages = [message for message, _ in batch.entries]
+        futures = [future for _, future in batch.entries]
+
+        try:
+            channel = await self.get_channel()
+            rmq_exchange = await self._exchange_resolver(batch.exchange, channel, batch.declare)
+            results: list[Any] = await self.publish_batch(rmq_exchange, batch.routing_key, messages)
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"Failed publishing batch to Exchange: '{batch.exchange.name}': {type(e).__name__}: {e}")
+            results = [e] * len(futures)
+
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,106 @@
+import asyncio
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import Any, Optional
+
+from aio_pika.abc import AbstractIncomingMessage, AbstractRobustChannel, AbstractRobustQueue
+
+logger = getLogger(__name__)
+
+
+class MessagePuller:
+    """
+    Pull API on top of a push consumer.
+    A single consumer stays open on a dedicated channel and fills a local buffer (bounded by the channel's
+    prefetch), so pulling N messages costs one consumer setup instead of N `basic.get` round trips.
+    Pulls of more messages than the prefetch raise it only while they last, so one large pull doesn't keep that
+    many messages unacked for good.
+    """
+
+    def __init__(self, channel: AbstractRobustChannel, queue: AbstractRobustQueue, prefetch_count: int):
+        self.channel = channel
+        self.queue = queue
+        self.base_prefetch_count = prefetch_count
+        self.prefetch_count = prefetch_count
+        self._buffer: asyncio.Queue[AbstractIncomingMessage] = asyncio.Queue()
+        self._consumer_tag: Optional[str] = None
+        self._pulls: list[int] = []
+
+    @property
+    def buffered(self) -> int:
+        return self._buffer.qsize()
+
+    async def start(self):
+        await self.channel.set_qos(prefetch_count=self.prefetch_count)
+        self.channel.close_callbacks.add(self._on_channel_lost)
+        self._consumer_tag = await self.queue.consume(self._buffer.put)
+
+    def _on_channel_lost(self, _sender: Any, _exc: Optional[BaseException] = None):
+        # Buffered messages carry delivery tags of the lost channel, acking them would fail. The broker
+        # redelivers them to the consumer the robust channel restores
+        dropped = self.buffered
+        while not self._buffer.empty():
+            self._buffer.get_nowait()
+        if dropped:
+            logger.info(f"Dropped {dropped} buffered messages of Queue: '{self.queue.name}' with their lost channel")
+
+    @asynccontextmanager
+    async def prefetching(self, count: int):
+        """
+        Raises the prefetch to `count` while a pull of that many messages lasts.
+        """
+        self._pulls.append(count)
+        await self._apply_prefetch()
+        try:
+            yield
+        finally:
+            self._pulls.remove(count)
+            if not self.channel.is_closed:
+                await self._apply_prefetch()
+
+    async def _apply_prefetch(self):
+        prefetch_count = max([self.base_prefetch_count, *self._pulls])
+        if prefetch_count != self.prefetch_count:
+            self.prefetch_count = prefetch_count
+            await self.channel.set_qos(prefetch_count=prefetch_count)
+
+    async def get(self, timeout_ms: int) -> Optional[AbstractIncomingMessage]:
+        if not self._buffer.empty():
+            return self._buffer.get_nowait()
+
+        try:
+            return await asyncio.wait_for(self._buffer.get(), timeout_ms / 1000)
+        except asyncio.TimeoutError:
+            return None
+
+    async def get_many(self, count: int, timeout_ms: int) -> list[AbstractIncomingMessage]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        messages: list[AbstractIncomingMessage] = []
+
+        while len(messages) < count:
+            while not self._buffer.empty() and len(messages) < count:
+                messages.append(self._buffer.get_nowait())
+
+            remaining = deadline - loop.time()
+            if len(messages) == count or remaining <= 0:
+                break
+
+            try:
+                messages.append(await asyncio.wait_for(self._buffer.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return messages
+
+    async def close(self):
+        self.channel.close_callbacks.discard(self._on_channel_lost)
+        if self._consumer_tag is not None and not self.channel.is_closed:
+            await self.queue.cancel(self._consumer_tag)
+
+        # Hand buffered, never pulled messages back to the broker right away instead of on channel close
+        while not self._buffer.empty():
+            await self._buffer.get_nowait().nack(requeue=True)
+
+        if not self.channel.is_closed:
+            await self.channel.close()
@@ -0,0 +1,71 @@
+import dataclasses
+from typing import Optional
+
+
+@dataclasses.dataclass(frozen=True)
+class AdaptivePrefetch:
+    """
+    Adjusts a consumer's prefetch count every `interval` seconds from the handler time measured in between.
+
+    With `target_latency`, the prefetch is sized by Little's law so a delivery spends about that long
+    between arriving and being acked: the handlers get through `workers / service time` deliveries a second,
+    so `workers * target_latency / service time` of them can be held. Otherwise it aims at `target_utilization`
+    of the handlers being busy: it doubles while they're idler than that although the queue has messages ready,
+    which means they're starved by the round trip to the broker, and shrinks by an eighth while they're busy
+    and deliveries wait for them, which only holds messages in memory for longer.
+
+    Either way the prefetch stays within `min_prefetch` and `max_prefetch` and changes by at most a factor of
+    two per interval, so a burst of slow or fast handlers doesn't swing it from one bound to the other.
+    """
+    min_prefetch: int = 1
+    max_prefetch: int = 1000
+    target_latency: Optional[float] = None
+    target_utilization: float = 0.9
+    interval: float = 5
+
+    def __post_init__(self):
+        if not 1 <= self.min_prefetch <= self.max_prefetch:
+            raise ValueError("Prefetch bounds need 1 <= min_prefetch <= max_prefetch")
+        if not 0 < self.target_utilization <= 1:
+            raise ValueError("target_utilization must be within (0, 1]")
+
+    def next_prefetch(  # noqa: PLR0913
+        self,
+        current: int,
+        workers: Optional[int],
+        busy_time: float,
+        completed: int,
+        inflight: int,
+        queue_depth: Optional[int],
+    ) -> int:
+        """
+        Returns the prefetch count for the next interval.
+        `workers` is the number of deliveries handled at once, None when every prefetched delivery is handled
+        right away. `busy_time` is the handler time summed over the `completed` deliveries of the interval,
+        `inflight` the deliveries currently unacked and `queue_depth` the messages ready in the broker,
+        None if unknown.
+        """
+        if not completed:
+            return self.clamp(current, current)
+
+        capacity = workers or current
+        if self.target_latency is not None:
+            desired = capacity * self.target_latency / (busy_time / completed)
+            if workers:
+                # Holding fewer deliveries than there are workers only leaves workers idle
+                desired = max(desired, workers)
+        else:
+            utilization = busy_time / (self.interval * capacity)
+            waiting = inflight - capacity
+            if utilization < self.target_utilization and queue_depth != 0:
+                desired = current * 2
+            elif utilization >= self.target_utilization and waiting > 0:
+                desired = current - max(1, current // 8)
+            else:
+                desired = current
+
+        return self.clamp(round(desired), current)
+
+    def clamp(self, desired: int, current: int) -> int:
+        desired = min(max(desired, current // 2, 1), current * 2)
+        return min(max(desired, self.min_prefetch), self.max_prefetch)
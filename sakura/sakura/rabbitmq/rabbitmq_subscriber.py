@@ -1,17 +1,40 @@
 import asyncio
+import contextlib
 import logging
-from typing import Callable, Optional
+import signal
+import time
+from collections.abc import Hashable
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
 
 from aio_pika.abc import AbstractIncomingMessage
 
+from sakura.codecs import get_decoder
+from sakura.decoders.decoder import Decoder
+from sakura.decoders.json_decoder import JSONDecoder
+from sakura.decoders.schema_decoder import SchemaDecoder
+from sakura.exceptions import DecodeError, PartialBatchError, UnsupportedContentTypeError, ValidationError
+from sakura.metrics import instruments
+from sakura.metrics.registry import GaugeChild
 from sakura.pubsub import Subscriber
+from sakura.pubsub.batching import BatchCollector
 from sakura.pubsub.client import PubSubClient
-from sakura.pubsub.types import PubSubApp, PubSubRequest
+from sakura.pubsub.dedup import DedupStore, hash_message_id
+from sakura.pubsub.supervision import Backoff, SubscriberHealth, SubscriberState
+from sakura.pubsub.types import ConcurrencyMode, PubSubApp, PubSubRequest
+from sakura.pubsub.validation import get_handler_schema
+from sakura.pubsub.workers import KeyedWorkerPool, WorkerPool, offload_sync_handler
 from sakura.rabbitmq import RabbitMQClient
+from sakura.rabbitmq.qos import AdaptivePrefetch
+from sakura.rabbitmq.retry import REDELIVERED_COUNT, RetryPolicy
 from sakura.rabbitmq.types import PublishAddress, Queue
 
+if TYPE_CHECKING:
+    import concurrent.futures
+
 logger = logging.getLogger(__name__)
 
+UNDECODABLE_ERRORS = (DecodeError, ValidationError)
+
 
 class RabbitMQSubscriber(Subscriber):
     def __init__(  # noqa: PLR0913
@@ -19,83 +42,590 @@ class RabbitMQSubscriber(Subscriber):
         client_id: str,
         queue: Optional[Queue] = None,
         publish_address: Optional[PublishAddress] = None,
-        retry_interval: int = 5,
+        retry_interval: float = 5,
         declare: bool = True,
         auto_ack: bool = True,
         prefetch_count: int = 10,
+        concurrency: int = 1,
+        concurrency_mode: Union[ConcurrencyMode, str] = ConcurrencyMode.INLINE,
+        batch_size: Optional[int] = None,
+        max_wait: int = 1000,
+        max_retry_interval: float = 60,
+        schema: Optional[Any] = None,
+        drain_timeout: float = 20,
+        dedup: Optional[DedupStore] = None,
+        retry: Optional[RetryPolicy] = None,
+        ordering_key: Optional[Callable[[AbstractIncomingMessage], Hashable]] = None,
+        adaptive_prefetch: Optional[AdaptivePrefetch] = None,
+        split_results: bool = False,
     ):
         self.queue = queue
         self.publish_address = publish_address
+        # A list returned by a handler is published as is unless it's a batch handler's or this is set
+        self.split_results = split_results
         self.client_id = client_id
         self.consumer_task: Optional[asyncio.Task] = None
         self.retry_interval = retry_interval
+        self.backoff = Backoff(initial=retry_interval, maximum=max_retry_interval)
+        self.health = SubscriberHealth(client_id=client_id, queue=queue.name if queue else None)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._listening = False
         self.declare = declare
         self.auto_ack = auto_ack
         self.prefetch_count = prefetch_count
+        self.concurrency = concurrency
+        self.concurrency_mode = ConcurrencyMode(concurrency_mode)
+        if self.concurrency_mode is ConcurrencyMode.PROCESS and not auto_ack:
+            raise ValueError("Handlers running in a process get the payload only and can't approve or decline it")
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.workers: Optional[Union[WorkerPool, KeyedWorkerPool]] = None
+        self.batches: Optional[BatchCollector] = None
+        self._executor: Optional[concurrent.futures.Executor] = None
+        self.schema = schema
+        self._schema_decoder: Optional[SchemaDecoder] = None
+        self._decoders: dict[Optional[str], Decoder] = {}
+        self.drain_timeout = drain_timeout
+        self.dedup = dedup
+        self.retry = retry
+        self.ordering_key = ordering_key
+        if adaptive_prefetch is not None:
+            if batch_size:
+                raise ValueError("Adaptive prefetch can't be used with batches, which need a prefetch of batch_size")
+            self.prefetch_count = adaptive_prefetch.clamp(prefetch_count, prefetch_count)
+        self.adaptive_prefetch = adaptive_prefetch
+        self._inflight = 0
+        self._settled: Optional[asyncio.Event] = None
+        self._stop_consuming: Optional[asyncio.Event] = None
+        self._drain: Optional[asyncio.Future] = None
 
     async def startup(self, client: RabbitMQClient, app: PubSubApp, func: Callable):
         callback = self.create_callback(client, app, func)
 
         loop = asyncio.get_running_loop()
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._stop_consuming = asyncio.Event()
+        if not self._listening:
+            client.add_drain_listener(self.drain)
+            self._listening = True
+
+        self.health.set_state(SubscriberState.STARTING)
+        self.consumer_task = loop.create_task(self.run_consumer(client, callback))
+        self.consumer_task.add_done_callback(self._on_consumer_done)
 
-        self.consumer_task = loop.create_task(
-            client.consume(
+    async def run_consumer(self, client: RabbitMQClient, callback: Callable):
+        if self.retry is not None and self.declare:
+            for queue in self.retry.queues(self.queue):
+                await client.get_queue(queue, declare=True)
+
+        tuner = None
+        if self.adaptive_prefetch is not None:
+            tuner = asyncio.get_running_loop().create_task(self.tune_prefetch(client))
+        try:
+            await client.consume(
                 self.queue,
                 callback,
                 declare=self.declare,
-                prefetch_count=self.prefetch_count,
-            ),
-        )
+                # A batch can only fill up if the broker lets that many deliveries be unacked at once
+                prefetch_count=max(self.prefetch_count, self.batch_size or 0),
+                on_started=self._on_consumer_started,
+                stop=self._stop_consuming,
+                wait_settled=self.wait_settled,
+                adaptive_qos=tuner is not None,
+                on_lost=self._on_channel_lost,
+                on_restored=self._on_channel_restored,
+            )
+        finally:
+            if tuner is not None:
+                tuner.cancel()
+
+    async def tune_prefetch(self, client: RabbitMQClient):
+        """
+        Feeds the handler time recorded by the `handler_duration` histogram since the last interval to the
+        adaptive prefetch and applies its prefetch count to the running consumer.
+        """
+        policy = self.adaptive_prefetch
+        handled = instruments.handler_duration.labels(self.queue.name)
+        # Every prefetched delivery is handled right away when they aren't queued for workers
+        inline = self.concurrency_mode is ConcurrencyMode.INLINE and self.ordering_key is None
+        workers = None if inline else self.concurrency
+        busy_time, completed, _ = handled.value
+        while True:
+            await asyncio.sleep(policy.interval)
+            total, count, _ = handled.value
+            try:
+                queue_depth = await client.message_count(self.queue)
+            except Exception as e:  # noqa: BLE001
+                logger.debug(f"Couldn't get the depth of Queue: '{self.queue.name}': {e!r}")
+                queue_depth = None
+
+            prefetch_count = policy.next_prefetch(
+                self.prefetch_count, workers, total - busy_time, count - completed, self._inflight, queue_depth,
+            )
+            busy_time, completed = total, count
+            if prefetch_count != self.prefetch_count and await client.set_prefetch(self.queue, prefetch_count):
+                logger.info(f"Prefetch of Queue: '{self.queue.name}' changed from {self.prefetch_count} "
+                            f"to {prefetch_count}")
+                self.prefetch_count = prefetch_count
 
     async def main_loop(self, client: RabbitMQClient, app: PubSubApp, func: Callable):
+        # Sleeps on an event set by the consumer task's done-callback (or by handle_exit),
+        # so a healthy or idle subscriber never wakes up on its own
         while not self.should_exit:
-            if self.consumer_task.done():
-                task_exception = self.consumer_task.exception()
-                if isinstance(task_exception, Exception):
-                    logger.error(
-                        f"Error in RabbitMQ: {type(task_exception).__name__}: {task_exception}. "
-                        f"(Client: {self.client_id}, Queue: {self.queue.name})",
-                    )
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            if self.should_exit or not self.consumer_task.done():
+                continue
+
+            if not self.consumer_task.cancelled() and (task_exception := self.consumer_task.exception()):
+                self.health.last_error = f"{type(task_exception).__name__}: {task_exception}"
+                logger.error(
+                    f"Error in RabbitMQ: {self.health.last_error}. "
+                    f"(Client: {self.client_id}, Queue: {self.queue.name})",
+                )
+
+            delay = self.backoff.delay(self.health.consecutive_failures)
+            self.health.consecutive_failures += 1
+            self.health.set_state(SubscriberState.BACKOFF)
+            logger.info(f"Attempting RabbitMQ reconnect in {delay:.1f} seconds... "
+                        f"(Client: {self.client_id}, Queue: {self.queue.name})")
+
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            if self.should_exit:
+                break
+
+            self._wakeup.clear()
+            self.health.restarts += 1
+            await self.startup(client, app, func)
+
+        self.health.set_state(SubscriberState.STOPPED)
 
-                logger.info("Attempting RabbitMQ reconnect in 5 seconds...")
-                await asyncio.sleep(self.retry_interval)
-                await self.startup(client, app, func)
+    def handle_exit(self, sig: signal.Signals) -> None:
+        super().handle_exit(sig)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self.force_exit and self._drain is not None and self.consumer_task is not None:
+            # A second SIGINT gives up on draining, the broker redelivers whatever is still unacked
+            self.consumer_task.cancel()
 
-            await asyncio.sleep(0.1)
+    def get_health(self) -> dict:
+        return self.health.as_dict()
+
+    def _on_consumer_started(self):
+        self.health.consecutive_failures = 0
+        self.health.set_state(SubscriberState.RUNNING)
+
+    def _on_consumer_done(self, _task: asyncio.Task):
+        self._wakeup.set()
+
+    def _on_channel_lost(self, exc: Optional[BaseException]):
+        if exc is not None:
+            self.health.last_error = f"{type(exc).__name__}: {exc}"
+        if self.health.state == SubscriberState.RUNNING:
+            self.health.set_state(SubscriberState.RECONNECTING)
+
+    def _on_channel_restored(self):
+        if self.health.state == SubscriberState.RECONNECTING:
+            self.health.set_state(SubscriberState.RUNNING)
 
     async def shutdown(self, client: RabbitMQClient, app: PubSubApp, func: Callable):  # noqa: ARG002
         logger.info("Waiting for RabbitMQ shutdown")
+        await self.drain()
+        if self.batches:
+            await self.batches.join()
+        if self.workers:
+            await self.workers.stop()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+        if self.dedup is not None:
+            await self.dedup.close()
         await client.close()
         logger.info("Successfully shutdown RabbitMQ client")
 
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stops consuming with `basic.cancel` and waits up to `timeout` seconds (`drain_timeout` by default) for the
+        in-flight deliveries to be handled and settled before the consumer's channel is closed.
+        Returns whether they all finished in time, the broker redelivers the rest.
+        """
+        if self._drain is None:
+            timeout = self.drain_timeout if timeout is None else timeout
+            self._drain = asyncio.ensure_future(self._drain_consumer(timeout))
+        return await asyncio.shield(self._drain)
+
+    async def _drain_consumer(self, timeout: float) -> bool:
+        self.should_exit = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self.consumer_task is None or self.consumer_task.done():
+            return True
+
+        queue_name = self.queue.name
+        logger.info(f"Draining {self._inflight} in-flight messages (Client: {self.client_id}, Queue: {queue_name})")
+        self.health.set_state(SubscriberState.DRAINING)
+        self._stop_consuming.set()
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        while not self.consumer_task.done() and (remaining := start + timeout - loop.time()) > 0:
+            await asyncio.wait({self.consumer_task}, timeout=min(remaining, 1))
+            if not self.consumer_task.done():
+                logger.info(f"Still draining {self._inflight} messages (Client: {self.client_id}, Queue: {queue_name})")
+
+        instruments.drain_duration.labels(queue_name).observe(loop.time() - start)
+        self.health.set_state(SubscriberState.STOPPED)
+        if not self.consumer_task.done():
+            instruments.drain_abandoned_messages.labels(queue_name).inc(self._inflight)
+            logger.warning(f"Gave up draining after {timeout} seconds with {self._inflight} messages in flight "
+                           f"(Client: {self.client_id}, Queue: {queue_name})")
+            self.consumer_task.cancel()
+            await asyncio.wait({self.consumer_task})
+            return False
+
+        logger.info(f"Drained in {loop.time() - start:.2f} seconds (Client: {self.client_id}, Queue: {queue_name})")
+        return self._inflight == 0
+
+    async def wait_settled(self):
+        """
+        Waits until no delivery is being handled, flushing a partly filled batch right away.
+        """
+        if self.batches:
+            await self.batches.join()
+        if self._settled is not None:
+            await self._settled.wait()
+
+    def _deliveries_started(self, gauge: GaugeChild):
+        gauge.inc()
+        if self._settled is None:
+            self._settled = asyncio.Event()
+        self._inflight += 1
+        self._settled.clear()
+
+    def _deliveries_finished(self, gauge: GaugeChild, count: int = 1):
+        gauge.dec(count)
+        self._inflight -= count
+        if not self._inflight:
+            self._settled.set()
+
     def create_callback(self, client: PubSubClient, app: PubSubApp, func: Callable) -> Callable:
+        if self.schema is None:
+            self.schema = get_handler_schema(func, batch=bool(self.batch_size))
+        if self.schema is not None and self._schema_decoder is None:
+            # Compiled here, so a handler annotated with a type pydantic can't validate fails at startup
+            self._schema_decoder = SchemaDecoder(self.schema)
+        # A restarted consumer wraps the handler again but keeps the process pool
+        func, self._executor = offload_sync_handler(func, self.concurrency_mode, self.concurrency, self._executor)
+
+        if self.batch_size:
+            return self.create_batch_callback(client, app, func)
+
+        queue_name = self.queue.name
+        consumed = instruments.consumed_messages.labels(queue_name)
+        duration = instruments.handler_duration.labels(queue_name)
+        errors = instruments.handler_errors.labels(queue_name)
+        inflight = instruments.inflight_messages.labels(queue_name)
+
+        async def process(msg: AbstractIncomingMessage):
+            try:
+                req = await self.create_request_or_settle(client, msg)
+                if req is None:
+                    return
+
+                start = time.perf_counter()
+                try:
+                    res = await app(req, func)
+                except UNDECODABLE_ERRORS as e:
+                    # The body is only decoded once the handler reads `data`, so a malformed one surfaces here
+                    errors.inc()
+                    if not self.auto_ack:
+                        raise
+                    await self.reject_undecodable(msg, e)
+                    return
+                except Exception:
+                    errors.inc()
+                    if self.auto_ack:
+                        await self.retry_or_nack(client, msg)
+                    raise
+                finally:
+                    duration.observe(time.perf_counter() - start)
+                    consumed.inc()
+
+                if self.auto_ack:
+                    await msg.ack()
+                await self.remember({msg: req})
+                await self.respond(client, msg, res)
+            finally:
+                self._deliveries_finished(inflight)
+
+        if self.concurrency_mode is ConcurrencyMode.INLINE and self.ordering_key is None:
+            async def callback(msg: AbstractIncomingMessage):
+                self._deliveries_started(inflight)
+                await process(msg)
+
+            return callback
+
+        if self.workers is None:
+            self.workers = self.create_worker_pool(process)
+        self.workers.start()
+
         async def callback(msg: AbstractIncomingMessage):
-            req = PubSubRequest(
-                raw_data=msg.body,
-                _approve=msg.ack,
-                _decline=msg.nack,
-                message_headers=msg.headers_raw,
-                message_id=msg.message_id,
-                auto_ack=self.auto_ack,
-                content_encoding=msg.content_encoding,
-                content_type=msg.content_type,
-                extra={
-                    "queue": self.queue.name,
-                    "exchange": msg.exchange,
-                    "routing_key": msg.routing_key,
-                },
-            )
+            self._deliveries_started(inflight)
+            await self.workers.submit(msg)
+
+        return callback
+
+    def create_worker_pool(self, process: Callable) -> Union[WorkerPool, KeyedWorkerPool]:
+        # Deliveries beyond prefetch_count can't be outstanding, so bounding the pool by it keeps
+        # every unacked message either queued or in a worker
+        maxsize = self.adaptive_prefetch.max_prefetch if self.adaptive_prefetch else self.prefetch_count
+        if self.ordering_key is not None:
+            return KeyedWorkerPool(process, self.ordering_key, size=self.concurrency, maxsize=maxsize)
+        return WorkerPool(process, size=self.concurrency, maxsize=maxsize)
+
+    def create_batch_callback(self, client: PubSubClient, app: PubSubApp, func: Callable) -> Callable:
+        queue_name = self.queue.name
+        consumed = instruments.consumed_messages.labels(queue_name)
+        duration = instruments.handler_duration.labels(queue_name)
+        errors = instruments.handler_errors.labels(queue_name)
+        inflight = instruments.inflight_messages.labels(queue_name)
+
+        async def process_batch(messages: list[AbstractIncomingMessage]):
+            try:
+                await handle_batch(messages)
+            finally:
+                self._deliveries_finished(inflight, len(messages))
+
+        async def handle_batch(messages: list[AbstractIncomingMessage]):
+            requests: dict[AbstractIncomingMessage, PubSubRequest] = {}
+            for msg in messages:
+                if req := await self.create_request_or_settle(client, msg):
+                    requests[msg] = req
 
-            res = await app(req, func)
+            if not requests:
+                return
+
+            start = time.perf_counter()
+            try:
+                res = await app(list(requests.values()), func)
+            except PartialBatchError as e:
+                failed_requests = {id(req) for req in e.failed}
+                failed = [msg for msg, req in requests.items() if id(req) in failed_requests]
+                errors.inc(len(failed))
+                logger.error(f"{len(failed)} of {len(requests)} messages failed in batch "
+                             f"(Client: {self.client_id}, Queue: {self.queue.name})")
+                if self.auto_ack:
+                    await self.settle_batch(client, list(requests), failed)
+                await self.remember({msg: req for msg, req in requests.items() if msg not in failed})
+                return
+            except Exception as e:  # noqa: BLE001
+                errors.inc(len(requests))
+                if not self.auto_ack:
+                    raise
+                await self.settle_failed_batch(client, requests, e)
+                # Undecodable messages are dropped rather than being a handler failure
+                if not isinstance(e, UNDECODABLE_ERRORS):
+                    raise
+                return
+            finally:
+                duration.observe(time.perf_counter() - start)
+                consumed.inc(len(requests))
+
+            if self.auto_ack:
+                await self.settle_batch(client, list(requests), [])
+            await self.remember(requests)
 
             if self.publish_address and res is not None:
-                await client.produce(
-                    exchange=self.publish_address.exchange,
-                    routing_key=self.publish_address.routing_key,
-                    payload=res,
-                )
+                await self.publish_result(client, res, split=True)
 
-                logger.info(f"Published message to Exchange: '{self.publish_address.exchange.name}' "
-                            f"with routing key '{self.publish_address.routing_key}'")
+        if self.batches is None:
+            self.batches = BatchCollector(process_batch, batch_size=self.batch_size, max_wait=self.max_wait)
+
+        async def callback(msg: AbstractIncomingMessage):
+            self._deliveries_started(inflight)
+            await self.batches.add(msg)
 
         return callback
+
+    async def settle_batch(
+        self,
+        client: PubSubClient,
+        messages: list[AbstractIncomingMessage],
+        failed: list[AbstractIncomingMessage],
+    ):
+        """
+        Retries or nacks the failed messages one by one, then acks everything else up to the last successful
+        delivery tag with a single `basic.ack(multiple=True)`.
+        """
+        for msg in failed:
+            await self.retry_or_nack(client, msg)
+
+        failed_tags = {msg.delivery_tag for msg in failed}
+        succeeded = [msg for msg in messages if msg.delivery_tag not in failed_tags]
+        if succeeded:
+            await max(succeeded, key=lambda msg: msg.delivery_tag).ack(multiple=True)
+
+    async def create_request_or_settle(
+        self,
+        client: PubSubClient,
+        msg: AbstractIncomingMessage,
+    ) -> Optional[PubSubRequest]:
+        """
+        Creates the request, settling the message itself if that fails, like when the dedup store is unavailable,
+        since no handler will.
+        """
+        try:
+            return await self.create_request(client, msg)
+        except Exception:
+            instruments.handler_errors.labels(self.queue.name).inc()
+            logger.exception(f"Couldn't create a request for message {msg.message_id} from Queue: '{self.queue.name}'")
+            await self.retry_or_nack(client, msg)
+            return None
+
+    async def create_request(self, client: PubSubClient, msg: AbstractIncomingMessage) -> Optional[PubSubRequest]:
+        if self.dedup is not None and await self.is_duplicate(msg):
+            return None
+
+        try:
+            decoder = client.message_decoder(msg, self.get_decoder(msg.content_type))
+        except UnsupportedContentTypeError as e:
+            await self.reject_undecodable(msg, e)
+            return None
+
+        return PubSubRequest(msg, queue=self.queue.name, auto_ack=self.auto_ack, decoder=decoder)
+
+    async def is_duplicate(self, msg: AbstractIncomingMessage) -> bool:
+        """
+        Acks the message if it was already processed, which is checked by message id, before anything is decoded.
+        Messages without an id are never considered duplicates.
+        """
+        if msg.message_id is None or not await self.dedup.contains(hash_message_id(msg.message_id)):
+            return False
+
+        instruments.duplicate_messages.labels(self.queue.name).inc()
+        logger.debug(f"Skipping duplicate message {msg.message_id} from Queue: '{self.queue.name}'")
+        await msg.ack()
+        return True
+
+    async def remember(self, requests: dict[AbstractIncomingMessage, PubSubRequest]):
+        """
+        Records the ids of the acked messages, declined ones are redelivered and must be handled again.
+        Without auto_ack only the messages the handler approved were acked.
+        """
+        if self.dedup is None:
+            return
+
+        for msg, req in requests.items():
+            if msg.message_id is not None and (self.auto_ack or req.approved):
+                await self.dedup.add(hash_message_id(msg.message_id))
+
+    def get_decoder(self, content_type: Optional[str]) -> Decoder:
+        if self.schema is None:
+            return get_decoder(content_type)
+
+        if self._schema_decoder is None:
+            self._schema_decoder = SchemaDecoder(self.schema)
+        if (decoder := self._decoders.get(content_type)) is None:
+            content_decoder = get_decoder(content_type)
+            # JSON is validated straight from the body, other content types are decoded first
+            decoder = self._decoders[content_type] = self._schema_decoder.with_decoder(
+                None if isinstance(content_decoder, JSONDecoder) else content_decoder,
+            )
+        return decoder
+
+    async def reject_undecodable(self, msg: AbstractIncomingMessage, error: Exception):
+        logger.error(f"Rejecting undecodable message {msg.message_id} from Queue: '{self.queue.name}': {error}")
+        await msg.reject(requeue=False)
+
+    async def settle_failed_batch(
+        self,
+        client: PubSubClient,
+        requests: dict[AbstractIncomingMessage, PubSubRequest],
+        error: Exception,
+    ):
+        """
+        Retries or nacks a batch whose handler raised. If it raised on a malformed body, only the undecodable
+        messages are rejected and the others are nacked so they're redelivered.
+        """
+        undecodable = []
+        if isinstance(error, UNDECODABLE_ERRORS):
+            undecodable = [msg for msg, req in requests.items() if not self.is_decodable(req)]
+            for msg in undecodable:
+                await self.reject_undecodable(msg, error)
+
+        rest = [msg for msg in requests if msg not in undecodable]
+        await self.settle_batch(client, rest, rest)
+
+    async def retry_or_nack(self, client: PubSubClient, msg: AbstractIncomingMessage):
+        """
+        Settles a message whose handler failed. Without a retry policy it's nacked back onto the queue, otherwise
+        it's republished to the delay queue of its next retry, or to the dead-letter queue once it ran out of
+        retries, and then acked.
+        """
+        if self.retry is None:
+            await msg.nack()
+            return
+
+        headers = dict(msg.headers or {})
+        retries = int(headers.get(REDELIVERED_COUNT, 0))
+        try:
+            if retries < self.retry.max_retries:
+                headers[REDELIVERED_COUNT] = retries + 1
+                await client.republish(msg, self.retry.delay_queue(self.queue, retries + 1).name, headers)
+                instruments.retried_messages.labels(self.queue.name).inc()
+            elif self.retry.dead_letter:
+                logger.error(f"Dead-lettering message {msg.message_id} from Queue: '{self.queue.name}' "
+                             f"after {retries} retries")
+                await client.republish(msg, self.retry.dead_letter_queue(self.queue).name, headers)
+                instruments.dead_lettered_messages.labels(self.queue.name).inc()
+            else:
+                logger.error(f"Rejecting message {msg.message_id} from Queue: '{self.queue.name}' "
+                             f"after {retries} retries")
+                await msg.reject(requeue=False)
+                return
+        except Exception:
+            logger.exception(f"Couldn't republish failed message {msg.message_id} from Queue: '{self.queue.name}'")
+            await msg.nack()
+            return
+
+        await msg.ack()
+
+    @staticmethod
+    def is_decodable(request: PubSubRequest) -> bool:
+        try:
+            request.data
+        except UNDECODABLE_ERRORS:
+            return False
+        return True
+
+    async def respond(self, client: PubSubClient, msg: AbstractIncomingMessage, res: Any):
+        """
+        Replies to RPC requests, which carry `reply_to`, and publishes other results to `publish_address`.
+        """
+        if msg.reply_to:
+            # The caller waits for the result even when it's None
+            await client.reply(msg, res)
+        elif self.publish_address and res is not None:
+            await self.publish_result(client, res, split=self.split_results)
+
+    async def publish_result(self, client: PubSubClient, res: Any, split: bool = False):
+        """
+        Publishes the result to `publish_address`, a list is published as one message per item with `split`.
+        """
+        if split and isinstance(res, list):
+            await client.produce_many(
+                exchange=self.publish_address.exchange,
+                routing_key=self.publish_address.routing_key,
+                payloads=res,
+            )
+        else:
+            await client.produce(
+                exchange=self.publish_address.exchange,
+                routing_key=self.publish_address.routing_key,
+                payload=res,
+            )
+
+        logger.info(f"Published message to Exchange: '{self.publish_address.exchange.name}' "
+                    f"with routing key '{self.publish_address.routing_key}'")
@@ -0,0 +1,50 @@
+import dataclasses
+
+from sakura.rabbitmq.types import Headers, Queue
+
+REDELIVERED_COUNT = Headers.REDELIVERED_COUNT.value
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retries failed deliveries after a delay instead of nacking them back to the head of their queue.
+    A failed message is republished to the delay queue of its retry, a queue without consumers whose
+    `x-message-ttl` dead-letters it back to the original queue once it expired. Every delay gets its own queue,
+    so messages in one never wait behind longer-lived ones. The retries so far travel in the `x-redelivered-count`
+    header and after `max_retries` the message goes to the `<queue>.dlq` queue, or is rejected without
+    `dead_letter`.
+    """
+    delays: tuple[float, ...] = (1, 10, 60)
+    max_retries: int = 3
+    dead_letter: bool = True
+
+    def __post_init__(self):
+        if not self.delays:
+            raise ValueError("A retry policy needs at least one delay")
+
+    def delay_queue(self, queue: Queue, retry: int) -> Queue:
+        """
+        Returns the delay queue of the `retry`th retry, the last delay is used for all retries beyond the tiers.
+        """
+        delay_ms = int(self.delays[min(retry, len(self.delays)) - 1] * 1000)
+        return Queue(
+            f"{queue.name}.retry.{delay_ms}",
+            arguments={
+                "x-message-ttl": delay_ms,
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": queue.name,
+            },
+        )
+
+    def dead_letter_queue(self, queue: Queue) -> Queue:
+        return Queue(f"{queue.name}.dlq")
+
+    def queues(self, queue: Queue) -> list[Queue]:
+        queues = {}
+        for retry in range(1, min(self.max_retries, len(self.delays)) + 1):
+            delay_queue = self.delay_queue(queue, retry)
+            queues[delay_queue.name] = delay_queue
+        if self.dead_letter:
+            queues[f"{queue.name}.dlq"] = self.dead_letter_queue(queue)
+        return list(queues.values())
@@ -0,0 +1,69 @@
+import asyncio
+import itertools
+import os
+from logging import getLogger
+from typing import Optional
+
+import aio_pika
+from aio_pika.abc import AbstractExchange, AbstractIncomingMessage, AbstractRobustChannel, AbstractRobustConnection
+
+from sakura.rabbitmq.types import DIRECT_REPLY_TO
+
+logger = getLogger(__name__)
+
+
+class ReplyConsumer:
+    """
+    Consumes RPC replies through direct reply-to on a channel of its own and hands each one to the call waiting
+    for its correlation id, so calls need neither a reply queue nor a consumer of their own.
+    RabbitMQ only delivers replies to the channel that published the request, which is why requests are
+    published through `channel` as well.
+    """
+
+    def __init__(self, connection: AbstractRobustConnection):
+        self.connection = connection
+        self.channel: Optional[AbstractRobustChannel] = None
+        self.pending: dict[str, asyncio.Future] = {}
+        self._prefix = os.urandom(6).hex()
+        self._ids = itertools.count()
+
+    async def start(self):
+        self.channel = await self.connection.channel()
+        queue = await self.channel.get_queue(DIRECT_REPLY_TO, ensure=False)
+        await queue.consume(self.on_reply, no_ack=True)
+
+    async def on_reply(self, message: AbstractIncomingMessage):
+        future = self.pending.pop(message.correlation_id, None)
+        if future is None or future.done():
+            logger.debug(f"Dropping reply to a call that's no longer waiting (correlation id {message.correlation_id})")
+            return
+
+        future.set_result(message)
+
+    async def call(
+        self,
+        exchange: AbstractExchange,
+        routing_key: str,
+        message: aio_pika.Message,
+        timeout: float,
+    ) -> AbstractIncomingMessage:
+        correlation_id = f"{self._prefix}.{next(self._ids)}"
+        message.reply_to = DIRECT_REPLY_TO
+        message.correlation_id = correlation_id
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[correlation_id] = future
+        try:
+            await exchange.publish(message, routing_key)
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            # Also forgets calls that timed out or were cancelled, their replies are dropped when they arrive
+            self.pending.pop(correlation_id, None)
+
+    async def close(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+        if self.channel is not None and not self.channel.is_closed:
+            await self.channel.close()
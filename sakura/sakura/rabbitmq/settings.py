@@ -0,0 +1,35 @@
+from typing import Optional
+
+import pydantic
+
+from sakura.settings import SakuraBaseSettings
+
+
+class PublisherSettings(SakuraBaseSettings):
+    batch_size: int = 100
+    linger_ms: float = 5
+    max_inflight_confirms: int = 1000
+
+
+class OutboundSettings(SakuraBaseSettings):
+    enabled: bool = False
+    max_bytes: int = 16 * 1024 * 1024
+    spill_path: Optional[str] = None
+    spill_bytes: int = 256 * 1024 * 1024
+    replay_batch_size: int = 100
+    retry_interval: float = 1
+    max_retry_interval: float = 30
+
+
+class CompressionSettings(SakuraBaseSettings):
+    algorithm: Optional[str] = None
+    level: Optional[int] = None
+    threshold: int = 1024
+    # Exchange name to the path of a trained zstd dictionary used for its messages
+    dictionaries: dict[str, str] = pydantic.Field(default_factory=dict)
+
+
+class ConnectionSettings(SakuraBaseSettings):
+    publisher_connections: int = 1
+    consumer_connections: int = 1
+    channel_pool_size: int = 10
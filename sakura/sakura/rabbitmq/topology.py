@@ -0,0 +1,79 @@
+import asyncio
+import weakref
+from collections.abc import Awaitable, Hashable
+from typing import Any, Callable, Optional
+
+from aio_pika.abc import AbstractExchange, AbstractRobustChannel, AbstractRobustQueue
+
+
+class TopologyRegistry:
+    """
+    Remembers which exchanges, queues and bindings were declared on the current connection.
+    Each declaration runs once and concurrent callers share the pending declaration, but only the fact that it was
+    declared is shared: handles are bound to the channel they were made on, so they're cached per channel and the
+    publish and consume paths skip the extra AMQP round trips.
+    """
+
+    def __init__(self):
+        self.exchanges: set[str] = set()
+        self.queues: set[str] = set()
+        self.bindings: set[tuple[str, str, str]] = set()
+        self._queue_handles: weakref.WeakKeyDictionary[
+            AbstractRobustChannel, dict[str, AbstractRobustQueue],
+        ] = weakref.WeakKeyDictionary()
+        self._exchange_handles: weakref.WeakKeyDictionary[
+            AbstractRobustChannel, dict[str, AbstractExchange],
+        ] = weakref.WeakKeyDictionary()
+        self._pending: dict[Hashable, asyncio.Future] = {}
+
+    async def declare_once(self, key: Hashable, declare: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `declare` unless the same declaration is already pending, in which case it waits for that one.
+        Only the caller that ran it gets its result, the others get None.
+        """
+        if pending := self._pending.get(key):
+            await asyncio.shield(pending)
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            result = await declare()
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieve the exception so waiting-less futures don't log "exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._pending.pop(key, None)
+
+    def get_exchange(self, channel: AbstractRobustChannel, name: str) -> Optional[AbstractExchange]:
+        return self._exchange_handles.get(channel, {}).get(name)
+
+    def add_exchange(self, channel: AbstractRobustChannel, exchange: AbstractExchange, declared: bool = False):
+        self._exchange_handles.setdefault(channel, {})[exchange.name] = exchange
+        if declared:
+            self.exchanges.add(exchange.name)
+
+    def get_queue(self, channel: AbstractRobustChannel, name: str) -> Optional[AbstractRobustQueue]:
+        return self._queue_handles.get(channel, {}).get(name)
+
+    def add_queue(self, channel: AbstractRobustChannel, queue: AbstractRobustQueue, declared: bool = False):
+        self._queue_handles.setdefault(channel, {})[queue.name] = queue
+        if declared:
+            self.queues.add(queue.name)
+
+    def forget_channel(self, channel: AbstractRobustChannel):
+        # Handles refer to their channel, so they'd keep the weak keys of a closed one alive
+        self._queue_handles.pop(channel, None)
+        self._exchange_handles.pop(channel, None)
+
+    def invalidate(self, *_: Any):
+        self.exchanges.clear()
+        self.queues.clear()
+        self.bindings.clear()
+        self._queue_handles.clear()
+        self._exchange_handles.clear()
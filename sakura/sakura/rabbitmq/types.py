@@ -2,9 +2,13 @@ import dataclasses
 from enum import Enum
 from typing import Callable, Optional
 
+# Pseudo-queue for RPC replies that RabbitMQ delivers straight to the consumer of the requesting channel
+DIRECT_REPLY_TO = "amq.rabbitmq.reply-to"
+
 
 class Headers(Enum):
     REDELIVERED_COUNT = "x-redelivered-count"
+    PARTITION_KEY = "x-partition-key"
 
 
 class DeliveryMode(Enum):
@@ -3,11 +3,12 @@ import functools
 import logging
 import signal
 import threading
-import typing
+from collections.abc import Iterable
 from typing import Callable, Optional
 
 from asyncer import asyncify
 
+from sakura.lifecycle import Lifecycle
 from sakura.logging import Logger
 from sakura.providers import Provider
 from sakura.utils import merge_dicts
@@ -18,15 +19,18 @@ class Sakura:
     __providers: dict[str, Provider]
     _once_functions: list[Callable]
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         providers: Optional[dict[str, Provider]],
         loggers: Optional[list[Logger]] = None,
+        dependencies: Optional[dict[str, Iterable[str]]] = None,
+        startup_timeout: float = 60,
+        shutdown_timeout: float = 30,
     ):
         self._once_functions = []
         self.__providers = providers
         self.__loggers = loggers
-        self.__tasks: list[typing.Coroutine] = []
+        self._lifecycle = Lifecycle(providers, dependencies, startup_timeout, shutdown_timeout)
         self.__should_exit = False
         self.__force_exit = False
         self.init_logging()
@@ -40,21 +44,48 @@ class Sakura:
 
     def setup_providers(self):
         for name, provider in self.__providers.items():
-            self.__tasks.append(provider.setup())
             setattr(self, name, provider.get_dependency())
 
     def setup(self):
         self.setup_providers()
 
     async def start(self):
-        for func in self._once_functions:
-            await DynamicSelfFunc(func)()()
-
         self.install_signal_handlers()
-        await asyncio.gather(*[asyncio.create_task(task) for task in self.__tasks])
+        # The setup coroutines are only created here, in the process that runs them: in worker mode the service
+        # is declared before the workers are forked, and each one starts its providers on its own loop
+        setups = {name: provider.setup() for name, provider in self.__providers.items()}
+        running = asyncio.create_task(self._lifecycle.run(setups))
+
+        try:
+            if self._once_functions:
+                await self.run_once_functions(running)
+            await running
+        except BaseException:
+            running.cancel()
+            raise
+        finally:
+            await self._lifecycle.teardown()
+
+    async def run_once_functions(self, running: asyncio.Task):
+        # Once functions run one after another when every provider is ready, unless starting a provider failed first
+        ready = asyncio.create_task(self._lifecycle.wait_ready())
+        await asyncio.wait(
+            {running, ready}, timeout=self._lifecycle.startup_timeout, return_when=asyncio.FIRST_COMPLETED,
+        )
+        if not ready.done():
+            ready.cancel()
+            if running.done():
+                return
+
+            pending = [name for name in self.__providers if not self._lifecycle.is_ready(name)]
+            raise TimeoutError(
+                f"Providers {pending} weren't ready within {self._lifecycle.startup_timeout} seconds, so the once "
+                f"functions couldn't run. Consumers a provider waits for, like RabbitMQ's ready_consumers, can't be "
+                f"started by a once function",
+            )
 
-        for provider in self.__providers.values():
-            await provider.teardown()
+        for func in self._once_functions:
+            await DynamicSelfFunc(func)()()
 
     def once(self, orig_func: Callable):
         func = orig_func
@@ -77,7 +108,7 @@ class Sakura:
         loop: asyncio.AbstractEventLoop = asyncio.get_event_loop()
 
         for sig in [signal.SIGINT, signal.SIGTERM]:
-            loop.add_signal_handler(sig, lambda: asyncio.create_task(self.teardown(sig)))
+            loop.add_signal_handler(sig, lambda sig=sig: asyncio.create_task(self.teardown(sig)))
 
     async def teardown(self, sig: signal.Signals) -> None:
         if self.__should_exit and sig == signal.SIGINT:
@@ -85,5 +116,4 @@ class Sakura:
         else:
             self.__should_exit = True
 
-        for provider in self.__providers.values():
-            await provider.teardown()
+        await self._lifecycle.teardown()
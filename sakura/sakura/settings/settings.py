@@ -24,3 +24,7 @@ class Settings(SakuraBaseSettings):
     loggers: DynaBox
     providers: DynaBox = pydantic.fields.Field(default_factory=DynaBox)
     config: DynaBox = pydantic.fields.Field(default_factory=DynaBox)
+    workers: int = 1
+    worker_shutdown_timeout: float = 30
+    startup_timeout: float = 60
+    shutdown_timeout: float = 30
@@ -0,0 +1,195 @@
+import contextlib
+import dataclasses
+import logging
+import os
+import select
+import signal
+import sys
+import time
+from typing import Any, Callable, Optional
+
+from sakura.pubsub.supervision import Backoff
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class WorkerInfo:
+    index: int
+    count: int
+
+
+_current_worker: Optional[WorkerInfo] = None
+
+
+def current_worker() -> Optional[WorkerInfo]:
+    """
+    Returns which worker of the pool this process is, or None when the service isn't running in worker mode.
+    """
+    return _current_worker
+
+
+class WorkerSupervisor:
+    """
+    Forks `count` worker processes that each run `target` and keeps them running.
+    Workers share nothing but the inherited, not yet started service, so each one gets its own event loop,
+    providers and broker connections. SIGINT/SIGTERM are fanned out to the workers, which get
+    `shutdown_timeout` seconds to exit before being killed, and crashed workers are restarted with backoff.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[], Any],
+        count: int,
+        shutdown_timeout: float = 30,
+        backoff: Optional[Backoff] = None,
+    ):
+        self.target = target
+        self.count = count
+        self.shutdown_timeout = shutdown_timeout
+        self.backoff = backoff or Backoff(initial=1, maximum=30)
+        self.workers: dict[int, int] = {}
+        self.should_exit = False
+        self.force_exit = False
+        self._started_at: dict[int, float] = {}
+        self._crashes: dict[int, int] = {}
+        self._restarts: dict[int, float] = {}
+        self._stop_deadline: Optional[float] = None
+        self._wakeup: tuple[int, int] = (-1, -1)
+
+    def run(self):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Worker mode needs os.fork(), which isn't available on this platform")
+
+        self._wakeup = os.pipe()
+        for fd in self._wakeup:
+            os.set_blocking(fd, False)
+
+        # Signals only write to the wakeup pipe, the loop below sleeps on it instead of polling the workers
+        previous_wakeup_fd = signal.set_wakeup_fd(self._wakeup[1])
+        previous_handlers = {sig: signal.signal(sig, self.handle_exit) for sig in (signal.SIGINT, signal.SIGTERM)}
+        previous_handlers[signal.SIGCHLD] = signal.signal(signal.SIGCHLD, lambda *_: None)
+
+        try:
+            for index in range(self.count):
+                self.spawn(index)
+
+            while self.workers or (self._restarts and not self.should_exit):
+                select.select([self._wakeup[0]], [], [], self._timeout())
+                self._drain_wakeup()
+                self.reap()
+                if self.should_exit:
+                    self.stop()
+                else:
+                    self.restart_due()
+        finally:
+            signal.set_wakeup_fd(previous_wakeup_fd)
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            for fd in self._wakeup:
+                os.close(fd)
+
+    def handle_exit(self, sig: int, _frame: Any = None):
+        if self.should_exit and sig == signal.SIGINT:
+            self.force_exit = True
+        self.should_exit = True
+
+    def spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker(index)
+
+        self.workers[pid] = index
+        self._started_at[index] = time.monotonic()
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            index = self.workers.pop(pid, None)
+            if index is None:
+                continue
+
+            exit_code = os.waitstatus_to_exitcode(status)
+            if self.should_exit or exit_code == 0:
+                logger.info(f"Worker {index} (pid {pid}) exited with code {exit_code}")
+                continue
+
+            # A worker that stayed up for a while before crashing starts over from the shortest delay
+            if time.monotonic() - self._started_at[index] > self.backoff.maximum:
+                self._crashes[index] = 0
+            delay = self.backoff.delay(self._crashes.get(index, 0))
+            self._crashes[index] = self._crashes.get(index, 0) + 1
+            self._restarts[index] = time.monotonic() + delay
+            logger.error(f"Worker {index} (pid {pid}) crashed with code {exit_code}, restarting in {delay:.1f} seconds")
+
+    def restart_due(self):
+        now = time.monotonic()
+        for index, due in list(self._restarts.items()):
+            if due <= now:
+                del self._restarts[index]
+                self.spawn(index)
+
+    def stop(self):
+        self._restarts.clear()
+        if self._stop_deadline is None:
+            logger.info(f"Stopping {len(self.workers)} workers")
+            self._stop_deadline = time.monotonic() + self.shutdown_timeout
+            self._signal_workers(signal.SIGTERM)
+        elif self.force_exit or time.monotonic() >= self._stop_deadline:
+            self._signal_workers(signal.SIGKILL)
+
+    def _signal_workers(self, sig: int):
+        for pid in self.workers:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, sig)
+
+    def _timeout(self) -> Optional[float]:
+        if self._stop_deadline is not None:
+            # Past the deadline the workers were killed, so only their SIGCHLD is left to wait for
+            remaining = self._stop_deadline - time.monotonic()
+            return remaining if remaining > 0 else None
+        if self._restarts:
+            return max(0.0, min(self._restarts.values()) - time.monotonic())
+        return None
+
+    def _drain_wakeup(self):
+        with contextlib.suppress(BlockingIOError):
+            while os.read(self._wakeup[0], 512):
+                pass
+
+    def _run_worker(self, index: int):
+        global _current_worker  # noqa: PLW0603
+
+        exit_code = 0
+        try:
+            signal.set_wakeup_fd(-1)
+            for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGCHLD):
+                signal.signal(sig, signal.SIG_DFL)
+            for fd in self._wakeup:
+                os.close(fd)
+
+            _current_worker = WorkerInfo(index=index, count=self.count)
+            self.target()
+        except SystemExit as e:
+            # Like the interpreter: no code is success, and any other object is printed and exits with 1
+            if e.code is None:
+                exit_code = 0
+            elif isinstance(e.code, int):
+                exit_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException:
+            logger.exception(f"Worker {index} failed")
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
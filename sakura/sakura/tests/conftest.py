@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture()
+def anyio_backend():
+    # Coroutine tests marked with `pytest.mark.anyio` run on a fresh asyncio loop each
+    return "asyncio"
@@ -0,0 +1,328 @@
+"""
+In-process stand-in for the parts of aio_pika that RabbitMQClient uses.
+It routes messages through direct/fanout/topic exchanges, honours prefetch and acks,
+and never touches the network, so benchmarks and tests can run without a broker.
+"""
+import asyncio
+import collections
+import itertools
+import re
+import types
+from typing import Any, Callable, Optional
+
+import aio_pika
+from aio_pika.exceptions import AMQPConnectionError, ChannelInvalidStateError
+
+from sakura.rabbitmq import RabbitMQClient
+from sakura.rabbitmq.types import DIRECT_REPLY_TO
+
+
+class _Callbacks(list):
+    def add(self, callback: Callable):
+        self.append(callback)
+
+    def discard(self, callback: Callable):
+        if callback in self:
+            self.remove(callback)
+
+
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    regex = re.escape(pattern).replace(r"\*", r"[^.]+").replace(r"\#", r".*")
+    return re.fullmatch(regex, routing_key) is not None
+
+
+class FakeBroker:
+    def __init__(self):
+        self.exchanges: dict[str, str] = {"": "direct", "amq.direct": "direct"}
+        self.bindings: dict[str, list[tuple[str, str]]] = collections.defaultdict(list)
+        self.queues: dict[str, collections.deque] = {}
+        self.queue_arguments: dict[str, dict] = {}
+        self.consumers: dict[str, list[_Consumer]] = collections.defaultdict(list)
+        self.declarations = collections.Counter()
+        self.published = 0
+        self.reachable = True
+
+    def declare_exchange(self, name: str, type_: str):
+        self.declarations["exchange"] += 1
+        self.exchanges.setdefault(name, type_)
+
+    def declare_queue(self, name: str, arguments: Optional[dict] = None):
+        self.declarations["queue"] += 1
+        self.queues.setdefault(name, collections.deque())
+        self.queue_arguments.setdefault(name, arguments or {})
+
+    def bind(self, queue: str, exchange: str, routing_key: str):
+        self.declarations["binding"] += 1
+        if (queue, routing_key) not in self.bindings[exchange]:
+            self.bindings[exchange].append((queue, routing_key))
+
+    def route(self, exchange: str, routing_key: str) -> list[str]:
+        if exchange == "":
+            return [routing_key] if routing_key in self.queues else []
+
+        exchange_type = self.exchanges.get(exchange, "direct")
+        bindings = self.bindings.get(exchange, [])
+        if exchange_type == "fanout":
+            return [queue for queue, _ in bindings]
+        if exchange_type == "topic":
+            return [queue for queue, key in bindings if topic_matches(key, routing_key)]
+        return [queue for queue, key in bindings if key == routing_key]
+
+    def publish(self, exchange: str, routing_key: str, message: aio_pika.Message):
+        self.published += 1
+        for queue in self.route(exchange, routing_key):
+            self.queues[queue].append((exchange, routing_key, message, False))
+            self.dispatch(queue)
+
+    def requeue(self, queue: str, message: "FakeIncomingMessage"):
+        self.queues[queue].appendleft((message.exchange, message.routing_key, message.source, True))
+        self.dispatch(queue)
+
+    def dispatch(self, queue: str):
+        pending = self.queues[queue]
+        consumers = itertools.cycle(self.consumers[queue]) if self.consumers[queue] else None
+        attempts = 0
+        while pending and consumers and attempts < len(self.consumers[queue]):
+            consumer = next(consumers)
+            if not consumer.has_capacity():
+                attempts += 1
+                continue
+
+            attempts = 0
+            exchange, routing_key, message, redelivered = pending.popleft()
+            consumer.deliver(exchange, routing_key, message, redelivered)
+
+
+class FakeIncomingMessage:
+    def __init__(  # noqa: PLR0913
+        self,
+        consumer: Optional["_Consumer"],
+        source: aio_pika.Message,
+        exchange: str,
+        routing_key: str,
+        delivery_tag: int,
+        redelivered: bool = False,
+    ):
+        self.source = source
+        self.body = source.body
+        self.content_type = source.content_type
+        self.content_encoding = source.content_encoding
+        self.headers = dict(source.headers or {})
+        self.message_id = source.message_id
+        self.correlation_id = source.correlation_id
+        self.reply_to = source.reply_to
+        self.priority = source.priority
+        self.timestamp = source.timestamp
+        self.type = source.type
+        self.app_id = source.app_id
+        self.exchange = exchange
+        self.routing_key = routing_key
+        self.delivery_tag = delivery_tag
+        self.redelivered = redelivered
+        self.processed = False
+        self._consumer = consumer
+
+    @property
+    def headers_raw(self) -> dict:
+        return self.headers
+
+    async def ack(self, multiple: bool = False):
+        self._consumer.settle(self, multiple=multiple)
+
+    async def nack(self, multiple: bool = False, requeue: bool = True):
+        self._consumer.settle(self, multiple=multiple, requeue=requeue)
+
+    async def reject(self, requeue: bool = False):
+        self._consumer.settle(self, requeue=requeue)
+
+
+class _Consumer:
+    def __init__(self, channel: "FakeChannel", queue: str, callback: Callable, no_ack: bool):
+        self.channel = channel
+        self.queue = queue
+        self.callback = callback
+        self.no_ack = no_ack
+        self.tag = f"ctag-{next(channel.connection.broker_tags)}"
+
+    def has_capacity(self) -> bool:
+        prefetch = self.channel.prefetch_count
+        return self.no_ack or not prefetch or len(self.channel.unacked) < prefetch
+
+    def deliver(self, exchange: str, routing_key: str, message: aio_pika.Message, redelivered: bool):
+        tag = next(self.channel.delivery_tags)
+        incoming = FakeIncomingMessage(self, message, exchange, routing_key, tag, redelivered)
+        if not self.no_ack:
+            self.channel.unacked[tag] = incoming
+
+        # aiormq spawns a task per delivery as well
+        task = asyncio.get_running_loop().create_task(self.callback(incoming))
+        self.channel.tasks.add(task)
+        task.add_done_callback(self.channel.tasks.discard)
+
+    def settle(self, message: FakeIncomingMessage, multiple: bool = False, requeue: Optional[bool] = None):
+        unacked = self.channel.unacked
+        tags = [tag for tag in unacked if tag <= message.delivery_tag] if multiple else [message.delivery_tag]
+        for tag in tags:
+            settled = unacked.pop(tag, None)
+            if settled is not None and requeue:
+                self.channel.broker.requeue(settled._consumer.queue, settled)
+
+        self.channel.broker.dispatch(self.queue)
+
+
+class FakeExchange:
+    def __init__(self, channel: "FakeChannel", name: str):
+        self.channel = channel
+        self.name = name
+
+    async def publish(self, message: aio_pika.Message, routing_key: str, **_: Any):
+        await asyncio.sleep(0)
+        if not self.channel.broker.reachable:
+            raise AMQPConnectionError("broker unreachable")
+        if message.reply_to == DIRECT_REPLY_TO:
+            # The broker routes replies back to the channel that published the request
+            message.reply_to = self.channel.reply_queue
+        self.channel.broker.publish(self.name, routing_key, message)
+
+
+class FakeQueue:
+    def __init__(self, channel: "FakeChannel", name: str):
+        self.channel = channel
+        self.name = name
+
+    async def declare(self, **_: Any) -> Any:
+        if self.channel.is_closed:
+            raise ChannelInvalidStateError("channel closed")
+        return types.SimpleNamespace(message_count=len(self.channel.broker.queues[self.name]))
+
+    async def bind(self, exchange: Any, routing_key: Optional[str] = None, **_: Any):
+        self.channel.broker.bind(self.name, getattr(exchange, "name", exchange), routing_key or self.name)
+
+    async def consume(self, callback: Callable, no_ack: bool = False, **_: Any) -> str:
+        if self.name == DIRECT_REPLY_TO:
+            self.name = self.channel.reply_queue
+            self.channel.broker.queues.setdefault(self.name, collections.deque())
+
+        consumer = _Consumer(self.channel, self.name, callback, no_ack)
+        self.channel.broker.consumers[self.name].append(consumer)
+        self.channel.consumers[consumer.tag] = consumer
+        self.channel.broker.dispatch(self.name)
+        return consumer.tag
+
+    async def cancel(self, consumer_tag: str, **_: Any):
+        consumer = self.channel.consumers.pop(consumer_tag, None)
+        if consumer is not None:
+            self.channel.broker.consumers[self.name].remove(consumer)
+
+
+class FakeChannel:
+    def __init__(self, connection: "FakeConnection", publisher_confirms: bool = True):
+        self.connection = connection
+        self.broker = connection.broker
+        self.publisher_confirms = publisher_confirms
+        self.prefetch_count = 0
+        self.unacked: dict[int, FakeIncomingMessage] = {}
+        self.consumers: dict[str, _Consumer] = {}
+        self.delivery_tags = itertools.count(1)
+        self.tasks: set[asyncio.Task] = set()
+        self.reply_queue = f"{DIRECT_REPLY_TO}.{next(connection.broker_tags)}"
+        self.is_closed = False
+        self.close_callbacks = _Callbacks()
+        self.reopen_callbacks = _Callbacks()
+
+    @property
+    def default_exchange(self) -> FakeExchange:
+        return FakeExchange(self, "")
+
+    async def set_qos(self, prefetch_count: int = 0, **_: Any):
+        self.prefetch_count = prefetch_count
+        for consumer in self.consumers.values():
+            self.broker.dispatch(consumer.queue)
+
+    async def declare_exchange(self, name: str, type: str = "direct", **_: Any) -> FakeExchange:  # noqa: A002
+        self.broker.declare_exchange(name, type)
+        return FakeExchange(self, name)
+
+    async def get_exchange(self, name: str, ensure: bool = True) -> FakeExchange:  # noqa: ARG002
+        return FakeExchange(self, name)
+
+    async def declare_queue(self, name: str, arguments: Optional[dict] = None, **_: Any) -> FakeQueue:
+        self.broker.declare_queue(name, arguments)
+        return FakeQueue(self, name)
+
+    async def get_queue(self, name: str, ensure: bool = True) -> FakeQueue:
+        if ensure and name not in self.broker.queues:
+            raise LookupError(f"Queue '{name}' doesn't exist")
+        return FakeQueue(self, name)
+
+    async def close(self):
+        if self.is_closed:
+            return
+
+        self.is_closed = True
+        for tag in list(self.consumers):
+            await FakeQueue(self, self.consumers[tag].queue).cancel(tag)
+
+        # Like a real broker, unacked deliveries go back to their queue once the channel is gone
+        for message in sorted(self.unacked.values(), key=lambda m: m.delivery_tag, reverse=True):
+            self.broker.requeue(message._consumer.queue, message)
+        self.unacked.clear()
+
+
+class FakeConnection:
+    def __init__(self, broker: FakeBroker):
+        self.broker = broker
+        self.broker_tags = itertools.count(1)
+        self.channels: list[FakeChannel] = []
+        self.is_closed = False
+        self.close_callbacks = _Callbacks()
+        self.reconnect_callbacks = _Callbacks()
+
+    async def channel(self, publisher_confirms: bool = True, **_: Any) -> FakeChannel:
+        channel = FakeChannel(self, publisher_confirms)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self):
+        self.is_closed = True
+        for channel in self.channels:
+            await channel.close()
+
+    async def simulate_reconnect(self):
+        self.simulate_disconnect()
+        self.simulate_restore()
+
+    def simulate_disconnect(self):
+        # Like a robust connection, the channels on it are lost and reopened along with it
+        error = ConnectionError("connection lost")
+        for callback in list(self.close_callbacks):
+            callback(self, error)
+        for channel in self.channels:
+            for callback in list(channel.close_callbacks):
+                callback(channel, error)
+
+    def simulate_restore(self):
+        for callback in list(self.reconnect_callbacks):
+            callback(self)
+        for channel in self.channels:
+            for callback in list(channel.reopen_callbacks):
+                callback(channel)
+
+
+class FakeRabbitMQClient(RabbitMQClient):
+    """
+    RabbitMQClient whose connections go to a `FakeBroker` instead of the network.
+    """
+
+    def __init__(self, broker: Optional[FakeBroker] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.broker = broker or FakeBroker()
+        self.connections: list[FakeConnection] = []
+
+    async def get_connection(self) -> FakeConnection:
+        connection = FakeConnection(self.broker)
+        connection.reconnect_callbacks.add(self._topology.invalidate)
+        connection.close_callbacks.add(self._on_connection_lost)
+        connection.reconnect_callbacks.add(self._on_connection_restored)
+        self.connections.append(connection)
+        return connection
@@ -1,6 +1,7 @@
 from dynaconf import Dynaconf
 
 import sakura
+from sakura.pubsub.types import PubSubApp, PubSubRequest
 from sakura.settings import Settings
 
 
@@ -17,6 +18,15 @@ class MockTransporter:
         return dummy_deco
 
 
+class PassthroughApp(PubSubApp):
+    """
+    Calls the handler with the request as is, without the middleware of a real app.
+    """
+
+    async def __call__(self, request: PubSubRequest, handler):
+        return await handler(request)
+
+
 class MockMicroservice(sakura.Microservice):
     settings: Settings
     settings_file_name = "settings.yaml"
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from sakura.inmemory import InMemoryClient
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Exchange, PublishAddress, Queue
+from sakura.tests.mocks import PassthroughApp
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingMessage:
+    def __init__(self, delivery_tag: int):
+        self.delivery_tag = delivery_tag
+        self.acks = []
+        self.nacks = 0
+
+    async def ack(self, multiple: bool = False):
+        self.acks.append(multiple)
+
+    async def nack(self, multiple: bool = False, requeue: bool = True):  # noqa: ARG002
+        self.nacks += 1
+
+
+async def test_batch_results_are_published_one_message_per_item():
+    batches = []
+
+    async def handler(requests: list[PubSubRequest]):
+        batches.append([request.data for request in requests])
+        return [request.data * 10 for request in requests]
+
+    client = InMemoryClient(broker="batch-results")
+    await client.setup()
+    source = Queue("source")
+    sink = Queue("sink", exchange=Exchange("out"), routing_key="done")
+    client.broker.declare_queue(sink)
+    subscriber = RabbitMQSubscriber(
+        "test", source, publish_address=PublishAddress(sink.exchange, "done"), batch_size=3, max_wait=50,
+    )
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0)
+
+    for i in range(3):
+        await client.produce(Exchange(""), "source", i)
+    published = await client.get_messages(sink, count=3, timeout_ms=1000)
+    await client.ack_messages(published)
+    await client.drain(timeout=1)
+    await client.close()
+
+    assert batches == [[0, 1, 2]]
+    assert [message.payload for message in published] == [0, 10, 20]
+    assert client.broker.queues["source"].empty()
+
+
+async def test_settle_batch_acks_successes_with_one_multiple_ack():
+    subscriber = RabbitMQSubscriber("test", Queue("work"))
+    messages = [RecordingMessage(tag) for tag in (1, 2, 3, 4)]
+
+    await subscriber.settle_batch(None, messages, [messages[3]])
+
+    # Only the last successful delivery is acked, with multiple=True covering the ones before it
+    assert [message.acks for message in messages] == [[], [], [True], []]
+    assert messages[3].nacks == 1
@@ -0,0 +1,89 @@
+import datetime
+
+import pydantic
+import pytest
+
+from sakura.codecs import compression, get_decoder, get_encoder
+from sakura.exceptions import DecodeError, EncodeError, UnsupportedContentTypeError
+from sakura.pubsub.types import PubSubRequest
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+
+
+class Event(pydantic.BaseModel):
+    name: str
+    created_at: datetime.datetime
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "application/msgpack"])
+def test_round_trip(content_type):
+    payload = {"id": 1, "tags": ["a", "b"], "nested": {"ok": True, "value": None}}
+
+    body = get_encoder(content_type).encode(payload)
+
+    assert get_decoder(content_type).decode(body) == payload
+
+
+def test_json_encodes_pydantic_models():
+    event = Event(name="created", created_at=datetime.datetime(2023, 1, 1, 12, 0, tzinfo=datetime.timezone.utc))
+
+    data = get_decoder("application/json").decode(get_encoder("application/json").encode(event))
+
+    assert data["name"] == "created"
+    assert data["created_at"].startswith("2023-01-01T12:00:00")
+
+
+def test_decoder_ignores_content_type_parameters():
+    assert get_decoder("application/json; charset=utf-8").decode(b'{"a": 1}') == {"a": 1}
+
+
+def test_missing_content_type_defaults_to_json():
+    assert get_decoder(None).decode(b"[1, 2]") == [1, 2]
+
+
+def test_raw_passthrough():
+    assert get_encoder("application/octet-stream").encode(b"\x00\x01") == b"\x00\x01"
+    assert get_decoder("application/octet-stream").decode(memoryview(b"\x00\x01")) == b"\x00\x01"
+
+    with pytest.raises(EncodeError):
+        get_encoder("application/octet-stream").encode({"a": 1})
+
+
+def test_invalid_body_raises_decode_error():
+    with pytest.raises(DecodeError):
+        get_decoder("application/json").decode(b"{not json")
+
+
+def test_unknown_content_type():
+    with pytest.raises(UnsupportedContentTypeError):
+        get_encoder("text/x-unknown")
+
+
+@pytest.mark.anyio()
+async def test_large_messages_are_compressed_and_decompressed_by_content_encoding():
+    client = FakeRabbitMQClient(compression={"algorithm": "gzip", "threshold": 100})
+    small = {"id": 1}
+    large = {"id": 2, "samples": [0.5] * 200}
+
+    messages = [await client.create_message_from_payload(payload) for payload in (small, large)]
+
+    assert [message.content_encoding for message in messages] == ["utf-8", "gzip"]
+    assert len(messages[1].body) < len(get_encoder("application/json").encode(large))
+    decoder = get_decoder("application/json")
+    assert [PubSubRequest(message, decoder=decoder).data for message in messages] == [small, large]
+
+
+def test_bodies_are_always_utf8():
+    assert FakeRabbitMQClient(encoding="UTF8").encoding == "utf-8"
+
+    with pytest.raises(ValueError, match="latin-1"):
+        FakeRabbitMQClient(encoding="latin-1")
+
+
+def test_missing_compression_extra_raises_decode_error(monkeypatch):
+    def missing_extra(*_):
+        raise ImportError("No module named 'zstandard'")
+
+    monkeypatch.setitem(compression._compressor_factories, "missing", missing_extra)
+
+    with pytest.raises(DecodeError, match="zstandard"):
+        compression.decompress(b"body", "missing")
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from sakura.metrics import instruments
+from sakura.rabbitmq.types import Exchange, Queue
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_consumers_get_dedicated_channels_apart_from_the_publishing_pool():
+    client = FakeRabbitMQClient(
+        connections={"publisher_connections": 2, "consumer_connections": 1, "channel_pool_size": 2},
+    )
+    await client.setup()
+    client.broker.declare_queue("work")
+
+    async def callback(message):
+        await message.ack()
+
+    stop = asyncio.Event()
+    consumers = [
+        asyncio.ensure_future(client.consume(Queue(name), callback, stop=stop)) for name in ("orders", "payments")
+    ]
+    await client.wait_consuming(len(consumers))
+    published = 10
+    await asyncio.gather(*(client.produce(Exchange(""), "work", {"n": n}, declare=False) for n in range(published)))
+    stats = client.pool_stats()
+    exported = {
+        "publisher_connections": instruments.open_connections.labels("publisher").value,
+        "consumer_connections": instruments.open_connections.labels("consumer").value,
+        "channel_pool_size": instruments.channel_pool_size.labels().value,
+        "channel_pool_created": instruments.channel_pool_created.labels().value,
+        "channel_pool_in_use": instruments.channel_pool_in_use.labels().value,
+        "consumer_channels": instruments.dedicated_channels.labels("consumer").value,
+        "puller_channels": instruments.dedicated_channels.labels("puller").value,
+    }
+    consumer_connection = client._consumer_connections._connections[0]
+    consumer_channels = set(client._consumer_channels)
+
+    stop.set()
+    await asyncio.gather(*consumers)
+    await client.close()
+
+    assert stats == {
+        "publisher_connections": 2,
+        "consumer_connections": 1,
+        "channel_pool_size": 2,
+        "channel_pool_created": 2,
+        "channel_pool_in_use": 0,
+        "consumer_channels": 2,
+        "puller_channels": 0,
+    }
+    assert exported == stats
+    # Publishing never waits behind a consumer's channel, they live on a connection of their own
+    assert {channel.connection for channel in consumer_channels} == {consumer_connection}
+    assert len(client.broker.queues["work"]) == published
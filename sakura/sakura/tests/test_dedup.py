@@ -0,0 +1,136 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from sakura.inmemory import InMemoryClient
+from sakura.pubsub.dedup import MemoryDedupStore, SQLiteDedupStore, hash_message_id
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Queue
+from sakura.tests.mocks import PassthroughApp
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_memory_store_evicts_oldest_and_expired_keys():
+    store = MemoryDedupStore(capacity=2)
+    for key in (1, 2, 3):
+        await store.add(key)
+
+    expiring = MemoryDedupStore(capacity=2, ttl=0)
+    await expiring.add(1)
+
+    assert [await store.contains(key) for key in (1, 2, 3)] == [False, True, True]
+    assert not await expiring.contains(1)
+    assert not len(expiring)
+
+
+async def test_sqlite_store_survives_reopening(tmp_path):
+    store = SQLiteDedupStore(tmp_path / "dedup.db", capacity=2, prune_interval=1)
+    for key in (1, 2, 3):
+        await store.add(key)
+    await store.close()
+
+    reopened = SQLiteDedupStore(tmp_path / "dedup.db")
+
+    assert [await reopened.contains(key) for key in (1, 2, 3)] == [False, True, True]
+
+
+async def test_subscriber_closes_its_store_on_shutdown(tmp_path):
+    client = InMemoryClient(broker="dedup-shutdown")
+    await client.setup()
+    store = SQLiteDedupStore(tmp_path / "dedup.db")
+    subscriber = RabbitMQSubscriber("test", Queue("work"), dedup=store)
+
+    await subscriber.shutdown(client, PassthroughApp(), None)
+    await store.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        store._db.execute("SELECT 1")
+
+
+async def test_subscriber_acks_and_skips_redeliveries():
+    handled = []
+
+    async def handler(request: PubSubRequest):
+        handled.append(request.data)
+
+    client = InMemoryClient(broker="dedup")
+    await client.setup()
+    queue = Queue("work")
+    store = MemoryDedupStore()
+    subscriber = RabbitMQSubscriber("test", queue, dedup=store)
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0)
+
+    for payload, message_id in [("a", "1"), ("b", "2"), ("a again", "1"), ("no id", None)]:
+        client.broker.publish("", "work", payload, message_id=message_id)
+    await asyncio.sleep(0.01)
+
+    await client.drain(timeout=1)
+    await client.close()
+
+    assert await store.contains(hash_message_id("2"))
+    assert client.broker.queues["work"].empty()
+    assert handled == ["a", "b", "no id"]
+
+
+async def test_declined_message_is_handled_again_when_redelivered():
+    handled = []
+
+    async def handler(request: PubSubRequest):
+        handled.append(request.message.redelivered)
+        if request.message.redelivered:
+            await request.approve()
+        else:
+            await request.decline()
+
+    client = InMemoryClient(broker="dedup-decline")
+    await client.setup()
+    queue = Queue("work")
+    store = MemoryDedupStore()
+    subscriber = RabbitMQSubscriber("test", queue, dedup=store, auto_ack=False)
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0)
+
+    client.broker.publish("", "work", "a", message_id="1")
+    await asyncio.sleep(0.01)
+
+    await client.drain(timeout=1)
+    await client.close()
+
+    assert handled == [False, True]
+    assert await store.contains(hash_message_id("1"))
+    assert client.broker.queues["work"].empty()
+
+
+async def test_message_is_requeued_when_the_store_fails():
+    handled = []
+
+    class FlakyStore(MemoryDedupStore):
+        failures = 1
+
+        async def contains(self, key) -> bool:
+            if self.failures:
+                self.failures -= 1
+                raise sqlite3.OperationalError("database is locked")
+            return await super().contains(key)
+
+    async def handler(request: PubSubRequest):
+        handled.append((request.data, request.message.redelivered))
+
+    client = InMemoryClient(broker="dedup-flaky")
+    await client.setup()
+    subscriber = RabbitMQSubscriber("test", Queue("work"), dedup=FlakyStore())
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0)
+
+    client.broker.publish("", "work", "a", message_id="1")
+    await asyncio.sleep(0.01)
+
+    await client.drain(timeout=1)
+    await client.close()
+
+    assert handled == [("a", True)]
+    assert client.broker.queues["work"].empty()
@@ -0,0 +1,38 @@
+import pytest
+
+from sakura.logging import Logger
+from sakura.providers import Provider
+from sakura.utils.factory import TypeRegistry, dict_factory, list_factory
+
+
+class Base:
+    pass
+
+
+class Registered(Base):
+    pass
+
+
+def test_registry_imports_registered_paths_and_caches():
+    registry = TypeRegistry(Base, "sakura.tests")
+    registry.register("Path", "sakura.tests.test_factory:Registered")
+
+    assert registry.resolve("Path") is Registered
+    assert registry.resolve("Registered") is Registered
+    assert registry.resolve("Missing") is None
+    assert registry._types["Path"] is Registered
+
+
+def test_registered_paths_of_missing_modules_are_unsupported():
+    registry = TypeRegistry(Base, "sakura.tests")
+    registry.register("Broken", "sakura.does_not_exist:Broken")
+
+    assert registry.resolve("Broken") is None
+
+
+def test_factories_resolve_lazily_registered_types():
+    loggers = list_factory({"Loguru": {"handlers": []}}, Logger)
+
+    assert type(loggers[0]).__name__ == "Loguru"
+    with pytest.raises(ValueError, match="NoSuchProvider"):
+        dict_factory({"http": {"type": "NoSuchProvider", "params": {}}}, Provider)
@@ -0,0 +1,233 @@
+import asyncio
+import inspect
+import json
+
+import pydantic
+import pytest
+from aio_pika.abc import DeliveryMode
+
+from sakura.inmemory import InMemoryClient
+from sakura.inmemory.types import InMemoryMessage
+from sakura.pubsub.client import PubSubClient
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq import RabbitMQClient
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Exchange, PublishAddress, Queue
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+from sakura.tests.mocks import PassthroughApp
+from sakura.utils.factory import client_factory
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    ("binding_key", "routing_key", "routed"),
+    [
+        ("orders.*", "orders.created", True),
+        ("orders.*", "orders.created.eu", False),
+        ("orders.#", "orders", True),
+        ("orders.#.eu", "orders.created.eu", True),
+        ("#.eu", "eu", True),
+        ("orders.#", "ordersx", False),
+    ],
+)
+async def test_topic_routing(binding_key, routing_key, routed):
+    client = InMemoryClient(broker=f"topic-{binding_key}-{routing_key}")
+    queue = Queue("orders", exchange=Exchange("events", type="topic"), routing_key=binding_key)
+    client.broker.declare_queue(queue)
+
+    await client.produce(queue.exchange, routing_key, {"id": 1})
+
+    assert bool(await client.get_messages(queue, count=1, timeout_ms=0)) is routed
+
+
+@pytest.mark.parametrize(("split_results", "published"), [(False, 1), (True, 2)])
+async def test_subscriber_round_trip_passes_payload_objects(split_results, published):
+    payload = {"id": 1}
+    results = []
+
+    async def handler(request: PubSubRequest):
+        results.append(request.data)
+        return [request.data, request.data]
+
+    client = InMemoryClient(broker=f"round-trip-{split_results}")
+    await client.setup()
+    source = Queue("source", exchange=Exchange("in", type="fanout"))
+    sink = Queue("sink", exchange=Exchange("out"), routing_key="done")
+    client.broker.declare_queue(sink)
+
+    subscriber = RabbitMQSubscriber(
+        "test", source, publish_address=PublishAddress(sink.exchange, "done"), split_results=split_results,
+    )
+    consumer = asyncio.create_task(
+        client.consume(source, subscriber.create_callback(client, PassthroughApp(), handler)),
+    )
+    await asyncio.sleep(0)
+    await client.produce(source.exchange, "anything", payload)
+
+    messages = await client.get_messages(sink, count=2, timeout_ms=100)
+    await client.ack_messages(messages)
+    consumer.cancel()
+    await client.close()
+
+    assert results == [payload]
+    # A list result is one message unless splitting was asked for
+    expected = [payload, payload] if split_results else [[payload, payload]]
+    assert [message.payload for message in messages] == expected
+    assert len(messages) == published
+    assert (messages[0].payload if split_results else messages[0].payload[0]) is payload
+
+
+class Item(pydantic.BaseModel):
+    sku: str
+    quantity: int
+
+
+async def test_subscriber_validates_payload_objects_against_the_schema():
+    results = []
+
+    async def handler(request: PubSubRequest):
+        results.append(request.data)
+
+    client = InMemoryClient(broker="schema")
+    await client.setup()
+    queue = Queue("items")
+    client.broker.declare_queue(queue)
+
+    subscriber = RabbitMQSubscriber("test", queue, schema=Item)
+    consumer = asyncio.create_task(client.consume(queue, subscriber.create_callback(client, PassthroughApp(), handler)))
+    await asyncio.sleep(0)
+    await client.produce(Exchange(""), "items", {"sku": "a", "quantity": "2"})
+    await client.produce(Exchange(""), "items", {"sku": "b"})
+    await asyncio.sleep(0.01)
+
+    remaining = await client.get_messages(queue, count=1, timeout_ms=0)
+    consumer.cancel()
+    await client.close()
+
+    assert results == [Item(sku="a", quantity=2)]
+    assert type(results[0]) is Item
+    assert not remaining
+
+
+async def test_prefetch_and_requeue():
+    client = InMemoryClient(broker="prefetch")
+    await client.setup()
+    queue = Queue("work")
+    client.broker.declare_queue(queue)
+    for i in range(3):
+        await client.produce(Exchange(""), "work", i)
+
+    received = []
+
+    async def callback(msg):
+        received.append(msg)
+
+    consumer = asyncio.create_task(client.consume(queue, callback, prefetch_count=2))
+    await asyncio.sleep(0.01)
+    held = list(received)
+
+    await held[0].nack(requeue=True)
+    await held[1].ack()
+    await asyncio.sleep(0.01)
+
+    consumer.cancel()
+    await client.close()
+
+    assert [message.payload for message in held] == [0, 1]
+    assert [message.payload for message in received[2:]] == [2, 0]
+    assert received[3].redelivered
+
+
+async def test_drain_finishes_in_flight_deliveries_before_closing():
+    handled = []
+
+    async def handler(request: PubSubRequest):
+        await asyncio.sleep(0.05)
+        handled.append(request.data)
+
+    client = InMemoryClient(broker="drain")
+    await client.setup()
+    queue = Queue("work")
+    subscriber = RabbitMQSubscriber("test", queue, prefetch_count=2)
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0)
+    for i in range(3):
+        await client.produce(Exchange(""), "work", i)
+    await asyncio.sleep(0.01)
+
+    drained = await client.drain(timeout=1)
+    await client.produce(Exchange(""), "work", 3)
+    await asyncio.sleep(0.1)
+    left = await client.get_messages(queue, count=10, timeout_ms=0)
+    await client.close()
+
+    assert drained
+    # Two deliveries were in flight and got handled, the unprefetched ones stay queued for the next consumer
+    assert handled == [0, 1]
+    assert [message.payload for message in left] == [2, 3]
+    assert subscriber.consumer_task.done()
+
+
+def payload_of(message) -> object:
+    return message.payload if isinstance(message, InMemoryMessage) else json.loads(message.body)
+
+
+@pytest.mark.parametrize("client_type", [FakeRabbitMQClient, InMemoryClient])
+async def test_clients_take_the_same_calls(client_type):
+    client = client_type()
+    await client.setup()
+    events = Exchange("parity-events", type="fanout")
+    queue = Queue("parity-work", exchange=events)
+    retries = Queue("parity-retries")
+    await client.get_queue(queue, declare=True)
+    await client.get_queue(retries, declare=True)
+    await client.get_exchange(events)
+
+    await client.produce(events, "created", {"n": 0}, DeliveryMode.NOT_PERSISTENT, True, {"source": "parity"})
+    await client.produce_many(events, "created", [{"n": 1}, {"n": 2}], DeliveryMode.PERSISTENT, False)
+    confirmed = await client.produce_buffered(events, "created", {"n": 3}, DeliveryMode.PERSISTENT, True)
+    await client.flush()
+    await confirmed
+
+    first = await client.get_message(queue, timeout_ms=100)
+    with pytest.warns(DeprecationWarning, match="use timeout_ms"):
+        rest = await client.get_messages(queue, 3, 0.1)
+    await client.ack_messages([first, *rest])
+
+    call = asyncio.create_task(client.call(Exchange(""), queue.name, {"n": 4}, timeout=1))
+    request = await client.get_message(queue, timeout_ms=1000)
+    await client.republish(request, retries.name, {"retried": 1})
+    await request.ack()
+    retried = [message async for message in client.stream_get_messages(retries, 1, max_time_between_messages_ms=10)]
+    await client.reply(retried[0], {"n": 8})
+    await retried[0].ack()
+    reply = await call
+    await client.close()
+
+    assert first.headers == {"source": "parity"}
+    assert [payload_of(message) for message in [first, *rest]] == [{"n": n} for n in range(4)]
+    assert retried[0].headers == {"retried": 1}
+    assert (retried[0].reply_to, retried[0].correlation_id) == (request.reply_to, request.correlation_id)
+    assert reply == {"n": 8}
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        "consume", "set_prefetch", "message_count", "get_queue", "get_exchange", "get_puller", "get_message",
+        "get_messages", "stream_get_messages", "produce", "produce_many", "produce_buffered", "republish", "call",
+        "reply",
+    ],
+)
+def test_in_memory_client_has_the_signatures_of_the_rabbitmq_client(name):
+    def parameters(method) -> list:
+        return [(p.name, p.kind, p.default) for p in inspect.signature(method).parameters.values()]
+
+    assert parameters(getattr(InMemoryClient, name)) == parameters(getattr(RabbitMQClient, name))
+
+
+def test_client_factory_resolves_in_memory_client():
+    client = client_factory({"broker": "factory"}, "InMemoryClient", PubSubClient)
+
+    assert isinstance(client, InMemoryClient)
@@ -0,0 +1,168 @@
+import asyncio
+import inspect
+
+import pytest
+
+from sakura.lifecycle import Lifecycle
+from sakura.logging import Logger
+from sakura.providers import Provider
+from sakura.providers.rabbitmq_provider.provider import RabbitMQProvider
+from sakura.rabbitmq.types import Queue
+from sakura.sakura import Sakura
+
+
+class RecordingProvider(Provider):
+    def __init__(self, name: str, events: list, serves: bool = False, teardown_delay: float = 0):
+        self.name = name
+        self.events = events
+        self.serves = serves
+        self.teardown_delay = teardown_delay
+        self.stopped = asyncio.Event()
+
+    async def setup(self):
+        self.events.append(("start", self.name))
+        if self.serves:
+            self.notify_ready()
+            await self.stopped.wait()
+
+    async def teardown(self):
+        await asyncio.sleep(self.teardown_delay)
+        self.events.append(("stop", self.name))
+        self.stopped.set()
+
+    def get_dependency(self):
+        return None
+
+
+class SilentLogger(Logger):
+    def get_basic_config(self):
+        return {}
+
+    def setup(self):
+        pass
+
+
+def run(lifecycle: Lifecycle):
+    return lifecycle.run({name: provider.setup() for name, provider in lifecycle.providers.items()})
+
+
+@pytest.mark.anyio()
+async def test_providers_start_after_their_dependencies_and_stop_before_them():
+    events = []
+    lifecycle = Lifecycle(
+        {"http": RecordingProvider("http", events, serves=True), "rabbit": RecordingProvider("rabbit", events)},
+        dependencies={"http": ["rabbit"]},
+    )
+
+    running = asyncio.ensure_future(run(lifecycle))
+    await lifecycle.wait_ready()
+    await lifecycle.teardown()
+    await running
+
+    assert events == [("start", "rabbit"), ("start", "http"), ("stop", "http"), ("stop", "rabbit")]
+    assert set(lifecycle.timings["http"]) == {"startup", "teardown"}
+
+
+@pytest.mark.anyio()
+async def test_teardown_is_bounded_by_the_shutdown_timeout():
+    events = []
+    lifecycle = Lifecycle({"slow": RecordingProvider("slow", events, teardown_delay=1)}, shutdown_timeout=0.01)
+
+    await run(lifecycle)
+    await lifecycle.teardown()
+    await lifecycle.teardown()
+
+    assert events == [("start", "slow")]
+    assert lifecycle.timings["slow"]["teardown"] < 1
+
+
+def test_dependency_cycles_are_rejected():
+    providers = {"a": RecordingProvider("a", []), "b": RecordingProvider("b", [])}
+
+    with pytest.raises(ValueError, match="a -> b -> a"):
+        Lifecycle(providers, dependencies={"a": ["b"], "b": ["a"]})
+
+
+@pytest.mark.anyio()
+async def test_once_functions_run_one_after_another_when_providers_are_ready():
+    events = []
+    service = Sakura({"rabbit": RecordingProvider("rabbit", events)}, loggers=[SilentLogger()])
+    service.setup()
+
+    async def migrate():
+        events.append("migrate")
+        await asyncio.sleep(0.01)
+        events.append("migrated")
+
+    service.once(migrate)
+    service.once(lambda: events.append("seed"))
+    await service.start()
+
+    assert events == [("start", "rabbit"), "migrate", "migrated", "seed", ("stop", "rabbit")]
+
+
+@pytest.mark.anyio()
+async def test_failing_once_function_tears_the_providers_down():
+    events = []
+    http = RecordingProvider("http", events, serves=True)
+    service = Sakura({"http": http}, loggers=[SilentLogger()])
+    service.setup()
+
+    def migrate():
+        raise RuntimeError("migration failed")
+
+    service.once(migrate)
+    service.once(lambda: events.append("seed"))
+
+    with pytest.raises(RuntimeError, match="migration failed"):
+        await asyncio.wait_for(service.start(), 1)
+
+    assert events == [("start", "http"), ("stop", "http")]
+
+
+@pytest.mark.anyio()
+async def test_once_functions_give_up_when_a_provider_never_gets_ready():
+    provider = RabbitMQProvider(RabbitMQProvider.Settings(
+        client={"type": "InMemoryClient", "params": {"broker": "never-ready"}}, ready_consumers=1,
+    ))
+    service = Sakura({"rabbit": provider}, loggers=[SilentLogger()], startup_timeout=0.05)
+    service.setup()
+    service.once(lambda: None)
+
+    with pytest.raises(TimeoutError, match="'rabbit'"):
+        await asyncio.wait_for(service.start(), 1)
+
+
+@pytest.mark.anyio()
+async def test_rabbitmq_provider_is_ready_once_its_consumers_attached():
+    provider = RabbitMQProvider(RabbitMQProvider.Settings(
+        client={"type": "InMemoryClient", "params": {"broker": "ready"}}, ready_consumers=1,
+    ))
+    client = provider.get_dependency()
+
+    setup = asyncio.ensure_future(provider.setup())
+    await asyncio.sleep(0.01)
+    waiting = not setup.done()
+
+    async def callback(_message):
+        pass
+
+    consumer = asyncio.ensure_future(client.consume(Queue("work"), callback))
+    await asyncio.wait_for(setup, 1)
+    consumer.cancel()
+    await provider.teardown()
+
+    assert waiting
+
+
+def test_service_classes_only_get_the_providers_and_loggers():
+    service = Sakura({"rabbit": RecordingProvider("rabbit", [])}, loggers=[SilentLogger()])
+    service.setup()
+
+    # The members Microservice.__prepare__ copies into the namespace of service classes
+    exposed = [
+        name for name, member in inspect.getmembers(service)
+        if not inspect.ismethod(member) and not name.startswith("_")
+    ]
+
+    assert exposed == ["loggers", "rabbit"]
@@ -0,0 +1,61 @@
+import threading
+
+from sakura.metrics import MetricsRegistry, PrometheusExporter
+
+THREADS = 4
+INCREMENTS = 1000
+
+
+def test_counter_aggregates_per_thread_shards():
+    counter = MetricsRegistry().counter("events_total", "Events.", ("queue",))
+
+    def work():
+        for _ in range(INCREMENTS):
+            counter.labels("q").inc()
+
+    threads = [threading.Thread(target=work) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels("q").value == THREADS * INCREMENTS
+
+
+def test_histogram_buckets():
+    histogram = MetricsRegistry().histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+
+    values = (0.05, 0.1, 0.5, 5)
+    for value in values:
+        histogram.observe(value)
+
+    total, count, buckets = histogram.labels().value
+    assert count == len(values)
+    assert total == sum(values)
+    assert buckets == [2, 1, 1]
+
+
+def test_prometheus_export():
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events.", ("queue",)).labels('a"b').inc(3)
+    registry.histogram("latency_seconds", "Latency.", buckets=(0.1,)).observe(0.05)
+
+    output = PrometheusExporter().export(registry)
+
+    assert "# TYPE events_total counter" in output
+    assert 'events_total{queue="a\\"b"} 3' in output
+    assert 'latency_seconds_bucket{le="0.1"} 1' in output
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in output
+    assert "latency_seconds_count 1" in output
+
+
+def test_exporter_adds_const_labels_to_every_series():
+    registry = MetricsRegistry()
+    registry.counter("events_total", "Events.", ("queue",)).labels("a").inc()
+    registry.histogram("latency_seconds", "Latency.", buckets=(0.1,)).observe(0.05)
+
+    output = PrometheusExporter(const_labels={"worker": "1"}).export(registry)
+
+    assert 'events_total{worker="1",queue="a"} 1' in output
+    assert 'latency_seconds_bucket{worker="1",le="0.1"} 1' in output
+    assert 'latency_seconds_count{worker="1"} 1' in output
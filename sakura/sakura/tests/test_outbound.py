@@ -0,0 +1,111 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import aio_pika
+import pytest
+
+from sakura.rabbitmq.outbound import OutboundBuffer, SpillSegment, decode_record, encode_record
+from sakura.rabbitmq.settings import OutboundSettings
+from sakura.rabbitmq.types import Exchange
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_publishes_are_buffered_while_the_broker_is_unreachable(tmp_path):
+    client = FakeRabbitMQClient(outbound={
+        "enabled": True,
+        "max_bytes": 1024,
+        "spill_path": str(tmp_path / "outbound.seg"),
+        "retry_interval": 0.01,
+    })
+    await client.setup()
+    client.broker.declare_queue("events")
+    client.broker.bind("events", "events", "created")
+
+    client.broker.reachable = False
+    for n in range(50):
+        await client.produce(Exchange("events"), "created", {"n": n})
+    buffered = len(client._outbound)
+    spilled = client._outbound._spill.records
+
+    client.broker.reachable = True
+    await client.connections[0].simulate_reconnect()
+    await asyncio.wait_for(client.flush(), 1)
+    await client.produce(Exchange("events"), "created", {"n": 50})
+
+    delivered = [json.loads(message.body)["n"] for *_, message, _ in client.broker.queues["events"]]
+    await client.close()
+
+    assert buffered == len(delivered) - 1
+    assert spilled
+    assert delivered == list(range(51))
+    assert not (tmp_path / "outbound.seg").exists()
+
+
+async def test_replay_drops_messages_failing_for_other_reasons():
+    published = []
+
+    async def publish(exchange, routing_key, messages, declare):  # noqa: ARG001
+        if routing_key == "invalid":
+            raise ValueError("message rejected")
+        published.extend(message.body for message in messages)
+
+    buffer = OutboundBuffer(publish, OutboundSettings(enabled=True, retry_interval=0.01))
+    for routing_key, body in [("created", b"1"), ("invalid", b"2"), ("created", b"3")]:
+        await buffer.put(Exchange("events"), routing_key, aio_pika.Message(body))
+
+    flushed = await buffer.flush(timeout=1)
+    await buffer.close()
+
+    assert flushed
+    assert published == [b"1", b"3"]
+
+
+def test_records_keep_every_message_property():
+    message = aio_pika.Message(
+        b"{}",
+        headers={"x-attempt": 2, "sent": datetime(2023, 1, 1, tzinfo=timezone.utc), "tags": ["a", "b"]},
+        content_type="application/json",
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        priority=5,
+        correlation_id="correlation",
+        reply_to="amq.rabbitmq.reply-to",
+        expiration=1.5,
+        message_id="id",
+        timestamp=datetime(2023, 1, 1, tzinfo=timezone.utc),
+        type="created",
+        app_id="sakura",
+    )
+
+    record = encode_record(Exchange("events"), "created", message, True)
+    exchange, routing_key, replayed, declare = decode_record(record)
+
+    assert (exchange, routing_key, declare) == ("events", "created", True)
+    assert replayed.body == message.body
+    assert replayed.properties.marshal() == message.properties.marshal()
+
+
+def test_records_reject_headers_amqp_cant_carry():
+    with pytest.raises(TypeError):
+        encode_record(Exchange("events"), "created", aio_pika.Message(b"{}", headers={"set": {1}}), True)
+
+
+def test_spill_segment_gives_space_back_while_it_is_replayed(tmp_path):
+    segment = SpillSegment(str(tmp_path / "outbound.seg"), 64 * 1024)
+    record = b"x" * 1020
+    while segment.append(record):
+        pass
+    full = segment.path.stat().st_blocks
+
+    for _ in range(segment.records - 4):
+        segment.pop()
+    compacted = segment.path.stat().st_blocks
+    appended = segment.append(record)
+    records = list(segment)
+    segment.close()
+
+    assert compacted < full
+    assert appended
+    assert records == [record] * 5
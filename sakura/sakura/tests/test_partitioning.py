@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from sakura.inmemory import InMemoryClient
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq.partitioned_subscriber import PartitionedSubscriber
+from sakura.rabbitmq.partitioning import Partitions, partition_of
+from sakura.rabbitmq.types import Exchange, Queue
+from sakura.supervisor import WorkerInfo
+from sakura.tests.mocks import PassthroughApp
+
+
+def test_partitions_are_dealt_out_to_workers():
+    partitions = Partitions(Queue("orders", exchange=Exchange("orders")), count=5)
+
+    assert partition_of("customer-1", 5) == partition_of("customer-1", 5)
+    assert partitions.partition(2).routing_key == "orders.2"
+    assert [queue.name for queue in partitions.assigned(WorkerInfo(index=1, count=2))] == ["orders.1", "orders.3"]
+
+
+@pytest.mark.anyio()
+async def test_messages_of_a_key_are_handled_in_order():
+    handled = []
+
+    async def handler(request: PubSubRequest):
+        # Later messages finish sooner, so only the ordering keeps a key's messages in sequence
+        await asyncio.sleep(0.01 / (request.data["seq"] + 1))
+        handled.append((request.data["key"], request.data["seq"]))
+
+    client = InMemoryClient(broker="partitioning")
+    await client.setup()
+    partitions = Partitions(Queue("orders", exchange=Exchange("orders")), count=2)
+    subscriber = PartitionedSubscriber("test", partitions, concurrency=4)
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0)
+
+    for seq in range(3):
+        for key in ("a", "b", "c"):
+            await partitions.produce(client, key, {"key": key, "seq": seq})
+    await asyncio.sleep(0.1)
+
+    await subscriber.shutdown(client, PassthroughApp(), handler)
+
+    for key in ("a", "b", "c"):
+        assert [seq for handled_key, seq in handled if handled_key == key] == [0, 1, 2]
+
+
+@pytest.mark.anyio()
+async def test_callback_hands_deliveries_to_their_partition():
+    handled = []
+
+    async def handler(request: PubSubRequest):
+        handled.append((request.queue, request.data["key"]))
+
+    client = InMemoryClient(broker="partition-callback")
+    await client.setup()
+    partitions = Partitions(Queue("orders", exchange=Exchange("orders")), count=2)
+    subscriber = PartitionedSubscriber("test", partitions)
+    callback = subscriber.create_callback(client, PassthroughApp(), handler)
+    consumers = [asyncio.create_task(client.consume(queue, callback)) for queue in partitions.queues()]
+    await asyncio.sleep(0)
+
+    for key in ("a", "b", "c"):
+        await partitions.produce(client, key, {"key": key})
+    await asyncio.sleep(0.01)
+    for consumer in consumers:
+        consumer.cancel()
+    await client.close()
+
+    assert sorted(handled) == sorted((f"orders.{partition_of(key, 2)}", key) for key in ("a", "b", "c"))
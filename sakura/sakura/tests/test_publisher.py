@@ -0,0 +1,62 @@
+import asyncio
+import json
+
+import pytest
+from aio_pika.exceptions import AMQPConnectionError
+
+from sakura.rabbitmq.types import Exchange
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+
+pytestmark = pytest.mark.anyio
+
+
+async def setup_client(**kwargs) -> FakeRabbitMQClient:
+    client = FakeRabbitMQClient(**kwargs)
+    await client.setup()
+    client.broker.declare_queue("events")
+    client.broker.bind("events", "events", "created")
+    return client
+
+
+def delivered(client: FakeRabbitMQClient) -> list:
+    return [json.loads(message.body)["n"] for *_, message, _ in client.broker.queues["events"]]
+
+
+async def test_produce_many_publishes_in_order_and_raises_failures():
+    client = await setup_client()
+
+    await client.produce_many(Exchange("events"), "created", [{"n": n} for n in range(5)])
+    client.broker.reachable = False
+    with pytest.raises(AMQPConnectionError):
+        await client.produce_many(Exchange("events"), "created", [{"n": 5}])
+    await client.close()
+
+    assert delivered(client) == list(range(5))
+
+
+async def test_buffered_publishes_are_coalesced_and_confirmed():
+    batch_size = 3
+    client = await setup_client(publisher={"batch_size": batch_size, "linger_ms": 1000})
+
+    futures = [await client.produce_buffered(Exchange("events"), "created", {"n": n}) for n in range(5)]
+    await asyncio.sleep(0.01)
+    # A full batch goes out right away, the rest waits for the linger time or a flush
+    published_before_flush = client.broker.published
+    await client.flush()
+    await asyncio.gather(*futures)
+    await client.close()
+
+    assert published_before_flush == batch_size
+    assert delivered(client) == list(range(5))
+
+
+async def test_buffered_publish_failures_resolve_their_futures():
+    client = await setup_client(publisher={"linger_ms": 1})
+    client.broker.reachable = False
+
+    future = await client.produce_buffered(Exchange("events"), "created", {"n": 0})
+    await client.flush()
+    await client.close()
+
+    with pytest.raises(AMQPConnectionError):
+        future.result()
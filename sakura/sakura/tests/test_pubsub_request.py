@@ -0,0 +1,59 @@
+import asyncio
+
+import aio_pika
+import pytest
+
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Queue
+from sakura.tests.fake_amqp import FakeBroker, FakeIncomingMessage, FakeRabbitMQClient
+from sakura.tests.mocks import PassthroughApp
+
+
+class CountingDecoder:
+    def __init__(self):
+        self.calls = 0
+
+    def decode(self, body: bytes) -> dict:
+        self.calls += 1
+        return {"size": len(body)}
+
+
+def _message(body: bytes, headers: dict) -> FakeIncomingMessage:
+    source = aio_pika.Message(body, content_type="application/json", headers=headers, message_id="1")
+    return FakeIncomingMessage(None, source, "events", "created", 1)
+
+
+def test_data_is_decoded_lazily_once():
+    decoder = CountingDecoder()
+    request = PubSubRequest(_message(b"{}", {"kind": "created"}), queue="events", decoder=decoder)
+
+    assert request.message_headers == {"kind": "created"}
+    assert request.extra == {"queue": "events", "exchange": "events", "routing_key": "created"}
+    assert bytes(request.raw_data) == b"{}"
+    assert decoder.calls == 0
+
+    assert request.data == request.data
+    assert decoder.calls == 1
+
+
+@pytest.mark.anyio()
+async def test_undecodable_message_is_rejected_when_handler_reads_data():
+    async def handler(request: PubSubRequest):
+        return request.data
+
+    broker = FakeBroker()
+    client = FakeRabbitMQClient(broker)
+    await client.setup()
+    queue = Queue("events")
+    broker.declare_queue(queue.name)
+
+    callback = RabbitMQSubscriber("test", queue).create_callback(client, PassthroughApp(), handler)
+    consumer = asyncio.create_task(client.consume(queue, callback, declare=False))
+    broker.publish("", queue.name, aio_pika.Message(b"{not json", content_type="application/json"))
+    await asyncio.sleep(0.01)
+
+    consumer.cancel()
+    await client.close()
+
+    assert not broker.queues[queue.name]
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from sakura.rabbitmq.types import Exchange, Queue
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+
+pytestmark = pytest.mark.anyio
+
+
+async def setup_client(published: int) -> FakeRabbitMQClient:
+    client = FakeRabbitMQClient()
+    await client.setup()
+    client.broker.declare_queue("work")
+    for n in range(published):
+        await client.produce(Exchange(""), "work", {"n": n}, declare=False)
+    return client
+
+
+def payloads(messages: list) -> list:
+    return [json.loads(message.body)["n"] for message in messages]
+
+
+async def test_get_messages_returns_what_arrived_before_the_deadline():
+    client = await setup_client(published=3)
+    queue = Queue("work")
+
+    first = await client.get_messages(queue, count=2, timeout_ms=10)
+    rest = await client.get_messages(queue, count=5, timeout_ms=10)
+    none = await client.get_message(queue, timeout_ms=10)
+    consumers = len(client.broker.consumers["work"])
+    await client.ack_messages(first + rest)
+    await client.close()
+
+    assert payloads(first) == [0, 1]
+    assert payloads(rest) == [2]
+    assert none is None
+    # Every pull is served by the same consumer
+    assert consumers == 1
+
+
+async def test_stream_stops_once_messages_stop_arriving():
+    client = await setup_client(published=2)
+
+    streamed = [
+        message async for message in client.stream_get_messages(Queue("work"), 5, max_time_between_messages_ms=10)
+    ]
+    await client.ack_messages(streamed)
+    await client.close()
+
+    assert payloads(streamed) == [0, 1]
+
+
+async def test_closing_requeues_messages_that_were_never_pulled():
+    client = await setup_client(published=3)
+
+    pulled = await client.get_message(Queue("work"), timeout_ms=10)
+    await pulled.ack()
+    await client.close()
+
+    assert sorted(json.loads(message.body)["n"] for *_, message, _ in client.broker.queues["work"]) == [1, 2]
+
+
+async def test_deadlines_in_seconds_are_deprecated():
+    client = await setup_client(published=1)
+
+    with pytest.deprecated_call():
+        messages = await client.get_messages(Queue("work"), 1, timeout=0.01)
+    with pytest.raises(TypeError, match="either"):
+        await client.get_message(Queue("work"), timeout=1, timeout_ms=1000)
+    await client.ack_messages(messages)
+    await client.close()
+
+    assert payloads(messages) == [0]
+
+
+async def test_large_pulls_raise_the_prefetch_only_while_they_last():
+    client = await setup_client(published=30)
+    queue = Queue("work")
+
+    puller = await client.get_puller(queue, prefetch_count=10)
+    pulled = await client.get_messages(queue, count=25, timeout_ms=10)
+    prefetch_count = puller.channel.prefetch_count
+    await client.ack_messages(pulled)
+    await client.close()
+
+    assert payloads(pulled) == list(range(25))
+    assert prefetch_count == puller.base_prefetch_count
+
+
+async def test_buffered_messages_are_dropped_with_their_lost_channel():
+    client = await setup_client(published=3)
+
+    pulled = await client.get_message(Queue("work"), timeout_ms=10)
+    puller = client._pullers["work"]
+    buffered = puller.buffered
+    puller.channel.connection.simulate_disconnect()
+    left = puller.buffered
+    await pulled.ack()
+    await client.close()
+
+    assert buffered
+    assert not left
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from sakura.metrics import instruments
+from sakura.pubsub.client import PubSubClient
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq.qos import AdaptivePrefetch
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Exchange, Queue
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+from sakura.tests.mocks import PassthroughApp
+
+
+def test_prefetch_follows_the_goal_within_bounds():
+    by_latency = AdaptivePrefetch(max_prefetch=100, target_latency=1, interval=1)
+    by_utilization = AdaptivePrefetch(max_prefetch=100, target_utilization=0.8, interval=1)
+
+    assert [
+        # 4 workers taking 50ms a delivery get through 80 deliveries a second, but it only doubles per interval,
+        # and at 200ms a delivery they only get through 20, but it only halves
+        by_latency.next_prefetch(10, 4, busy_time=1, completed=20, inflight=10, queue_depth=None),
+        by_latency.next_prefetch(80, 4, busy_time=4, completed=20, inflight=80, queue_depth=None),
+        # Starved while the queue has messages, busy with deliveries waiting, starved on an empty queue
+        by_utilization.next_prefetch(10, 4, busy_time=2, completed=40, inflight=4, queue_depth=500),
+        by_utilization.next_prefetch(80, 4, busy_time=4, completed=40, inflight=80, queue_depth=500),
+        by_utilization.next_prefetch(10, 4, busy_time=2, completed=40, inflight=1, queue_depth=0),
+        by_utilization.next_prefetch(80, 4, busy_time=2, completed=40, inflight=4, queue_depth=500),
+    ] == [20, 40, 20, 70, 10, 100]
+
+
+@pytest.mark.anyio()
+async def test_subscriber_grows_prefetch_of_the_running_consumer():
+    initial = 2
+
+    async def handler(_request: PubSubRequest):
+        await asyncio.sleep(0.01)
+
+    client = FakeRabbitMQClient()
+    await client.setup()
+    queue = Queue("telemetry", exchange=Exchange("telemetry"))
+    policy = AdaptivePrefetch(max_prefetch=64, target_latency=0.2, interval=0.02)
+    subscriber = RabbitMQSubscriber(
+        "test", queue, prefetch_count=initial, concurrency=2, concurrency_mode="asyncio", adaptive_prefetch=policy,
+    )
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0.01)
+
+    await client.produce_many(Exchange("telemetry"), "telemetry", [{"n": n} for n in range(1000)])
+    await asyncio.sleep(0.3)
+
+    channel = next(iter(client._qos_channels.values()))
+    await subscriber.shutdown(client, PassthroughApp(), handler)
+    # The tuner can still change the prefetch while the subscriber drains
+    exported = instruments.prefetch_count.labels("telemetry").value
+
+    assert subscriber.prefetch_count > initial
+    assert subscriber.prefetch_count == channel.prefetch_count == exported
+
+
+@pytest.mark.anyio()
+async def test_clients_that_cant_change_prefetch_report_it():
+    class FixedPrefetchClient(PubSubClient):
+        pass
+
+    assert await FixedPrefetchClient().set_prefetch(Queue("telemetry"), 10) is False
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from sakura.inmemory import InMemoryClient
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.retry import REDELIVERED_COUNT, RetryPolicy
+from sakura.rabbitmq.types import Queue
+from sakura.tests.mocks import PassthroughApp
+
+
+def test_policy_declares_one_delay_queue_per_tier():
+    policy = RetryPolicy(delays=(1, 10), max_retries=5)
+
+    assert [queue.name for queue in policy.queues(Queue("orders"))] == [
+        "orders.retry.1000", "orders.retry.10000", "orders.dlq",
+    ]
+    assert policy.delay_queue(Queue("orders"), 4).arguments == {
+        "x-message-ttl": 10000,
+        "x-dead-letter-exchange": "",
+        "x-dead-letter-routing-key": "orders",
+    }
+
+
+@pytest.mark.anyio()
+async def test_failing_messages_are_delayed_then_dead_lettered():
+    attempts = []
+
+    async def handler(request: PubSubRequest):
+        attempts.append(request.message_headers.get(REDELIVERED_COUNT, 0))
+        raise RuntimeError("poison")
+
+    client = InMemoryClient(broker="retry")
+    await client.setup()
+    queue = Queue("orders")
+    policy = RetryPolicy(delays=(0.01, 0.02), max_retries=3)
+    subscriber = RabbitMQSubscriber("test", queue, retry=policy)
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0)
+
+    client.broker.publish("", "orders", {"id": 1}, message_id="1")
+    await asyncio.sleep(0.2)
+
+    dead = await client.get_messages(policy.dead_letter_queue(queue), count=2, timeout_ms=0)
+    await client.drain(timeout=1)
+    await client.close()
+
+    assert attempts == [0, 1, 2, 3]
+    assert [(message.payload, message.headers[REDELIVERED_COUNT]) for message in dead] == [({"id": 1}, 3)]
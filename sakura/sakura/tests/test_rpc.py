@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from sakura.inmemory import InMemoryClient
+from sakura.pubsub.types import PubSubRequest
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Exchange, Queue
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+from sakura.tests.mocks import PassthroughApp
+
+pytestmark = pytest.mark.anyio
+
+
+async def double(request: PubSubRequest):
+    return {"n": request.data["n"] * 2}
+
+
+@pytest.mark.parametrize("client_type", [FakeRabbitMQClient, InMemoryClient])
+async def test_call_returns_the_subscribers_reply(client_type):
+    client = client_type()
+    await client.setup()
+    queue = Queue("rpc")
+    subscriber = RabbitMQSubscriber("test", queue)
+    await subscriber.startup(client, PassthroughApp(), double)
+    await asyncio.sleep(0.01)
+
+    replies = await asyncio.gather(*(client.call(Exchange(""), "rpc", {"n": n}, timeout=1) for n in range(3)))
+    await client.drain(timeout=1)
+    await client.close()
+
+    assert replies == [{"n": 0}, {"n": 2}, {"n": 4}]
+
+
+async def test_calls_time_out_and_forget_their_correlation_id():
+    client = FakeRabbitMQClient()
+    await client.setup()
+    client.broker.declare_queue("nobody-listens")
+
+    with pytest.raises(asyncio.TimeoutError):
+        await client.call(Exchange(""), "nobody-listens", {"n": 1}, timeout=0.01)
+
+    pending = [reply_consumer.pending for reply_consumer in client._reply_consumers.values()]
+    await client.close()
+
+    assert pending == [{}]
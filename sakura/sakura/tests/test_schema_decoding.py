@@ -0,0 +1,111 @@
+import pydantic
+import pytest
+
+from sakura.codecs import get_decoder, get_encoder
+from sakura.decoders.payload_decoder import PayloadDecoder
+from sakura.decoders.schema_decoder import SchemaDecoder
+from sakura.exceptions import ValidationError
+from sakura.inmemory import InMemoryClient
+from sakura.pubsub.types import PubSubRequest
+from sakura.pubsub.validation import get_handler_schema
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Queue
+from sakura.tests.mocks import PassthroughApp
+
+
+class Item(pydantic.BaseModel):
+    sku: str
+    quantity: int
+
+
+class Order(pydantic.BaseModel):
+    id: int  # noqa: A003
+    items: list[Item]
+
+
+def test_validates_json_body_into_model():
+    order = SchemaDecoder(Order).decode(b'{"id": 1, "items": [{"sku": "a", "quantity": "2"}]}')
+
+    assert order == Order(id=1, items=[Item(sku="a", quantity=2)])
+    assert type(order) is Order
+
+
+def test_invalid_json_is_a_validation_error():
+    with pytest.raises(ValidationError):
+        SchemaDecoder(Order).decode(b'{"id": 1,')
+
+
+def test_validates_other_content_types_after_decoding():
+    body = get_encoder("application/msgpack").encode({"sku": "a", "quantity": 2})
+
+    items = SchemaDecoder(list[Item], get_decoder("application/msgpack")).decode(
+        get_encoder("application/msgpack").encode([{"sku": "a", "quantity": 2}]),
+    )
+
+    assert SchemaDecoder(Item, get_decoder("application/msgpack")).decode(body) == Item(sku="a", quantity=2)
+    assert items == [Item(sku="a", quantity=2)]
+
+
+def test_payload_objects_are_validated_instead_of_decoded():
+    payload = {"sku": "a", "quantity": 2}
+
+    assert PayloadDecoder({"sku": "a", "quantity": "2"}, SchemaDecoder(Item)).decode(None) == Item(sku="a", quantity=2)
+    assert PayloadDecoder(payload, get_decoder("application/json")).decode(None) is payload
+    with pytest.raises(ValidationError):
+        PayloadDecoder({"sku": "a"}, SchemaDecoder(Item)).decode(None)
+
+
+def test_validation_errors_are_mapped_with_field_paths():
+    with pytest.raises(ValidationError, match="items.0.quantity"):
+        SchemaDecoder(Order).decode(b'{"id": 1, "items": [{"sku": "a", "quantity": "many"}]}')
+
+
+def test_handler_schema_comes_from_signature():
+    async def handler(self, order: Order):  # noqa: ARG001
+        return order
+
+    async def batch_handler(orders: list[Order]):
+        return orders
+
+    async def request_handler(request: PubSubRequest):
+        return request
+
+    assert get_handler_schema(handler) is Order
+    assert get_handler_schema(batch_handler, batch=True) is Order
+    assert get_handler_schema(request_handler) is None
+
+
+def test_handler_schema_only_comes_from_the_payload_parameter():
+    async def with_dependency(order: Order, item: Item):
+        return order, item
+
+    async def request_with_dependency(request: PubSubRequest, order: Order):
+        return request, order
+
+    async def unannotated_payload(order, item: Item):
+        return order, item
+
+    async def keyword_only(*, order: Order):
+        return order
+
+    assert get_handler_schema(with_dependency) is Order
+    assert get_handler_schema(request_with_dependency) is None
+    assert get_handler_schema(unannotated_payload) is None
+    assert get_handler_schema(keyword_only) is None
+
+
+@pytest.mark.anyio()
+async def test_handler_annotated_with_an_unvalidatable_type_fails_at_startup():
+    class Opaque:
+        pass
+
+    async def handler(payload: Opaque):
+        return payload
+
+    client = InMemoryClient(broker="unvalidatable")
+    await client.setup()
+    subscriber = RabbitMQSubscriber("test", Queue("work"))
+
+    with pytest.raises(RuntimeError, match="no validator found"):
+        await subscriber.startup(client, PassthroughApp(), handler)
+    await client.close()
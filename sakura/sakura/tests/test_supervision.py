@@ -0,0 +1,89 @@
+import asyncio
+import signal
+
+import pytest
+
+from sakura.pubsub.supervision import Backoff, SubscriberState
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Queue
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+from sakura.tests.mocks import PassthroughApp
+
+
+def test_backoff_grows_exponentially_with_jitter_up_to_the_maximum():
+    backoff = Backoff(initial=1, maximum=8)
+
+    delays = [backoff.delay(attempt) for attempt in range(6)]
+
+    for delay, ceiling in zip(delays, [1, 2, 4, 8, 8, 8]):
+        assert ceiling / 2 <= delay <= ceiling
+
+
+@pytest.mark.anyio()
+async def test_failed_consumer_is_restarted_and_reports_its_health():
+    async def handler(_request):
+        pass
+
+    client = FakeRabbitMQClient()
+    await client.setup()
+    # The queue doesn't exist yet, so consuming it without declaring it fails
+    subscriber = RabbitMQSubscriber("test", Queue("work"), declare=False, retry_interval=0.2)
+    app = PassthroughApp()
+    await subscriber.startup(client, app, handler)
+    supervisor = asyncio.ensure_future(subscriber.main_loop(client, app, handler))
+    await asyncio.sleep(0.05)
+    failed = subscriber.get_health()
+
+    client.broker.declare_queue("work")
+    await asyncio.wait_for(client.wait_consuming(), 1)
+    recovered = subscriber.get_health()
+
+    await client.connections[0].simulate_reconnect()
+    reconnected = subscriber.health.state
+
+    subscriber.handle_exit(signal.SIGTERM)
+    await supervisor
+    await subscriber.shutdown(client, app, handler)
+
+    assert failed["state"] == SubscriberState.BACKOFF
+    assert failed["last_error"].startswith("LookupError")
+    assert not failed["healthy"]
+    assert recovered["state"] == SubscriberState.RUNNING
+    assert recovered["restarts"] == 1
+    assert recovered["consecutive_failures"] == 0
+    assert reconnected == SubscriberState.RUNNING
+    assert subscriber.health.state == SubscriberState.STOPPED
+
+
+@pytest.mark.anyio()
+async def test_health_follows_the_consumer_channel_only():
+    async def handler(_request):
+        pass
+
+    client = FakeRabbitMQClient()
+    await client.setup()
+    client.broker.declare_queue("work")
+    subscriber = RabbitMQSubscriber("test", Queue("work"))
+    app = PassthroughApp()
+    await subscriber.startup(client, app, handler)
+    await asyncio.wait_for(client.wait_consuming(), 1)
+    consumer_connection = next(c for c in client.connections if any(channel.consumers for channel in c.channels))
+    publisher_connection = await client._publisher_connections.get()
+
+    publisher_connection.simulate_disconnect()
+    after_publisher_loss = subscriber.health.state
+    consumer_connection.simulate_disconnect()
+    after_consumer_loss = subscriber.health.state
+    publisher_connection.simulate_restore()
+    after_publisher_restore = subscriber.health.state
+    consumer_connection.simulate_restore()
+    after_consumer_restore = subscriber.health.state
+
+    subscriber.handle_exit(signal.SIGTERM)
+    await subscriber.shutdown(client, app, handler)
+
+    assert publisher_connection is not consumer_connection
+    assert after_publisher_loss == SubscriberState.RUNNING
+    assert after_consumer_loss == SubscriberState.RECONNECTING
+    assert after_publisher_restore == SubscriberState.RECONNECTING
+    assert after_consumer_restore == SubscriberState.RUNNING
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+
+import pytest
+
+from sakura.providers import Provider
+from sakura.pubsub.supervision import Backoff
+from sakura.sakura import Sakura
+from sakura.supervisor import WorkerSupervisor, current_worker
+from sakura.tests.test_lifecycle import SilentLogger
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="Worker mode needs os.fork()")
+
+
+def test_crashed_workers_are_restarted_until_they_exit_cleanly(tmp_path):
+    def target():
+        worker = current_worker()
+        runs = tmp_path / f"worker-{worker.index}-of-{worker.count}"
+        with runs.open("a") as f:
+            f.write("run\n")
+        # Every worker crashes on its first run
+        if len(runs.read_text().splitlines()) == 1:
+            raise RuntimeError("crashed")
+
+    supervisor = WorkerSupervisor(target, 2, backoff=Backoff(initial=0.01, maximum=0.02))
+    supervisor.run()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["worker-0-of-2", "worker-1-of-2"]
+    assert all(path.read_text() == "run\nrun\n" for path in tmp_path.iterdir())
+    assert not supervisor.workers
+
+
+def test_workers_exiting_without_a_code_are_not_restarted(tmp_path):
+    def target():
+        runs = tmp_path / f"worker-{current_worker().index}"
+        with runs.open("a") as f:
+            f.write("run\n")
+        if len(runs.read_text().splitlines()) == 1:
+            sys.exit()
+
+    supervisor = WorkerSupervisor(target, 2, backoff=Backoff(initial=0.01, maximum=0.02))
+    supervisor.run()
+
+    assert all(path.read_text() == "run\n" for path in tmp_path.iterdir())
+    assert not supervisor.workers
+
+
+def test_sigterm_is_fanned_out_to_the_workers():
+    def target():
+        time.sleep(30)
+
+    shutdown_timeout = 5
+    supervisor = WorkerSupervisor(target, 2, shutdown_timeout=shutdown_timeout)
+    threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGTERM)).start()
+    started = time.monotonic()
+    supervisor.run()
+
+    # The workers were stopped rather than restarted, long before they'd have exited on their own
+    assert supervisor.should_exit
+    assert not supervisor.workers
+    assert time.monotonic() - started < shutdown_timeout
+
+
+class SetupRecordingProvider(Provider):
+    def __init__(self, calls: list):
+        self.calls = calls
+
+    def setup(self):
+        self.calls.append(os.getpid())
+
+    def get_dependency(self):
+        return self
+
+
+def test_providers_are_only_set_up_once_the_service_starts():
+    calls = []
+    service = Sakura({"recording": SetupRecordingProvider(calls)}, loggers=[SilentLogger()])
+
+    # Worker mode forks between declaring the service and starting it
+    service.setup()
+    before_start = list(calls)
+    asyncio.run(service.start())
+
+    assert before_start == []
+    assert calls == [os.getpid()]
+    assert service.recording.calls is calls
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from sakura.rabbitmq.types import Exchange, Queue
+from sakura.tests.fake_amqp import FakeRabbitMQClient
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_topology_is_declared_once_per_connection():
+    client = FakeRabbitMQClient()
+    await client.setup()
+    queue = Queue("orders", exchange=Exchange("orders"), routing_key="created")
+
+    await asyncio.gather(*(client.get_queue(queue, declare=True) for _ in range(3)))
+    published = 3
+    for n in range(published):
+        await client.produce(Exchange("orders"), "created", {"n": n})
+    declared = dict(client.broker.declarations)
+
+    await client.connections[0].simulate_reconnect()
+    await client.get_queue(queue, declare=True)
+    await client.close()
+
+    assert declared == {"queue": 1, "exchange": 1, "binding": 1}
+    assert len(client.broker.queues["orders"]) == published
+    # A reconnect may come back to a broker that lost non-durable topology, so it's declared again
+    assert client.broker.declarations == {"queue": 2, "exchange": 2, "binding": 2}
+
+
+async def test_handles_belong_to_the_channel_they_are_used_on():
+    client = FakeRabbitMQClient()
+    await client.setup()
+    channels = [await client._get_channel() for _ in range(2)]
+
+    exchanges = await asyncio.gather(*(client._get_exchange(Exchange("orders"), channel) for channel in channels))
+    queues = await asyncio.gather(
+        *(client._get_queue(Queue("orders"), channel, declare=True) for channel in channels),
+    )
+    declared = dict(client.broker.declarations)
+    await client.close()
+
+    assert [exchange.channel for exchange in exchanges] == channels
+    assert [queue.channel for queue in queues] == channels
+    assert declared == {"exchange": 1, "queue": 1}
+
+
+async def test_message_count_outlives_a_stopped_consumer():
+    async def callback(message):
+        await message.ack()
+
+    client = FakeRabbitMQClient()
+    await client.setup()
+    queue = Queue("work")
+    stop = asyncio.Event()
+    consumer = asyncio.ensure_future(client.consume(queue, callback, stop=stop))
+    await client.wait_consuming()
+    stop.set()
+    await consumer
+
+    await client.produce(Exchange(""), "work", {"n": 1}, declare=False)
+    count = await client.message_count(queue)
+    await client.close()
+
+    assert count == 1
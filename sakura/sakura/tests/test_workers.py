@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+import pytest
+
+from sakura.inmemory import InMemoryClient
+from sakura.pubsub.types import ConcurrencyMode, PubSubRequest
+from sakura.rabbitmq.rabbitmq_subscriber import RabbitMQSubscriber
+from sakura.rabbitmq.types import Exchange, PublishAddress, Queue
+from sakura.tests.mocks import PassthroughApp
+
+pytestmark = pytest.mark.anyio
+
+
+async def async_handler(request: PubSubRequest):
+    return {"doubled": request.data["n"] * 2, "off_loop": False}
+
+
+def thread_handler(request: PubSubRequest):
+    return {"doubled": request.data["n"] * 2, "off_loop": threading.current_thread() is not threading.main_thread()}
+
+
+def process_handler(payload: dict):
+    # Runs in a worker process, which only gets the decoded payload
+    return {"doubled": payload["n"] * 2, "off_loop": True}
+
+
+@pytest.mark.parametrize(
+    ("mode", "handler", "off_loop"),
+    [
+        (ConcurrencyMode.INLINE, async_handler, False),
+        (ConcurrencyMode.ASYNCIO, async_handler, False),
+        (ConcurrencyMode.THREAD, thread_handler, True),
+        (ConcurrencyMode.PROCESS, process_handler, True),
+    ],
+)
+async def test_handler_runs_in_every_concurrency_mode(mode, handler, off_loop):
+    client = InMemoryClient(broker=f"workers-{mode.value}")
+    await client.setup()
+    source = Queue("source")
+    sink = Queue("sink", exchange=Exchange("out"), routing_key="done")
+    client.broker.declare_queue(sink)
+    subscriber = RabbitMQSubscriber(
+        "test", source, publish_address=PublishAddress(sink.exchange, "done"), concurrency=2, concurrency_mode=mode,
+    )
+    await subscriber.startup(client, PassthroughApp(), handler)
+    await asyncio.sleep(0)
+
+    for n in range(3):
+        await client.produce(Exchange(""), "source", {"n": n})
+    published = await client.get_messages(sink, count=3, timeout_ms=5000)
+    await client.ack_messages(published)
+    await subscriber.shutdown(client, PassthroughApp(), handler)
+
+    assert sorted(message.payload["doubled"] for message in published) == [0, 2, 4]
+    assert all(message.payload["off_loop"] is off_loop for message in published)
+
+
+def test_process_mode_requires_auto_ack():
+    with pytest.raises(ValueError, match="approve or decline"):
+        RabbitMQSubscriber("test", Queue("work"), auto_ack=False, concurrency_mode="process")
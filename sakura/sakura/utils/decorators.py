@@ -26,30 +26,37 @@ def get_class_that_defined_method(method):
 
 
 class DynamicSelfFunc:
-    _instance: Any
+    """
+    Passes the service instance as `self` to functions declared in the service class body.
+    Whether to inject `self` (the first parameter is named `self`) and whether the function is async are
+    resolved once here, so the wrapper's per-call cost is a single extra call.
+    """
+
+    _instance: Any = None
 
     def __init__(self, func: Callable):
         self.func = func
-
-    def __call__(self, *args, **kwargs):  # noqa: ARG002
-        old_signature = inspect.signature(self.func)
-
-        @functools.wraps(self.func)
-        def sync_decorator(*deco_args, **deco_kwargs):
-            if len(old_signature.parameters) == len(deco_args + tuple(deco_kwargs.values())):
-                return self.func(*deco_args, **deco_kwargs)
-
-            return self.func(self._instance, *deco_args, **deco_kwargs)
-
-        @functools.wraps(self.func)
-        async def async_decorator(*deco_args, **deco_kwargs):
-            if len(old_signature.parameters) == len(deco_args + tuple(deco_kwargs.values())):
-                return await self.func(*deco_args, **deco_kwargs)
-
-            return await self.func(self._instance, *deco_args, **deco_kwargs)
-
-        decorator = async_decorator if inspect.iscoroutinefunction(self.func) else sync_decorator
-
-        params = [param for param in old_signature.parameters.values() if param.name != "self"]
-        decorator.__signature__ = old_signature.replace(parameters=params)
-        return decorator
+        self.wrapper = self._compile(func)
+
+    def __call__(self, *args, **kwargs) -> Callable:  # noqa: ARG002
+        return self.wrapper
+
+    @staticmethod
+    def _compile(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        params = list(signature.parameters.values())
+        if not params or params[0].name != "self":
+            return func
+
+        # The instance only exists once the service class is created, so it's looked up on each call
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await func(DynamicSelfFunc._instance, *args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                return func(DynamicSelfFunc._instance, *args, **kwargs)
+
+        wrapper.__signature__ = signature.replace(parameters=params[1:])
+        return wrapper
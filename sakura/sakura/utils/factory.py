@@ -1,3 +1,6 @@
+import importlib
+from typing import Any, Optional, Union
+
 from sakura.exceptions import UnsupportedClientError
 
 
@@ -16,17 +19,92 @@ def get_inheritors_dict(class_to_check: type) -> dict[str, type]:
     return transporters
 
 
+class TypeRegistry:
+    """
+    Resolves the type names used in settings (e.g. `type: RabbitMQProvider`) to classes, importing only the
+    module of the requested type.
+    Names are looked up in the registered import paths, then among the already imported subclasses of `base`
+    and last in the `group` entry points of the installed distributions. Resolved types are cached.
+    """
+
+    def __init__(self, base: type, group: str):
+        self.base = base
+        self.group = group
+        self._paths: dict[str, str] = {}
+        self._types: dict[str, type] = {base.__name__: base}
+        self._entry_points: Optional[dict[str, Any]] = None
+
+    def register(self, name: str, target: Union[type, str]):
+        """
+        Registers a type, or its `"module:attribute"` import path to be imported on first use.
+        """
+        if isinstance(target, str):
+            self._paths[name] = target
+            self._types.pop(name, None)
+        else:
+            self._types[name] = target
+
+    def resolve(self, name: str) -> Optional[type]:
+        if found := self._types.get(name):
+            return found
+
+        # Subclasses defined in application code are only known once their module was imported
+        found = self._import_path(name) or get_inheritors_dict(self.base).get(name) or self._load_entry_point(name)
+        if found is not None:
+            self._types[name] = found
+        return found
+
+    def _import_path(self, name: str) -> Optional[type]:
+        if not (path := self._paths.get(name)):
+            return None
+
+        module_name, _, attribute = path.partition(":")
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            return None
+        return getattr(module, attribute)
+
+    def _load_entry_point(self, name: str) -> Optional[type]:
+        if entry_point := self._get_entry_points().get(name):
+            return entry_point.load()
+        return None
+
+    def _get_entry_points(self) -> dict[str, Any]:
+        if self._entry_points is None:
+            # Scanning the installed distributions is slow, so it's only done for names nothing else knows
+            import importlib.metadata
+
+            entry_points = importlib.metadata.entry_points()
+            if hasattr(entry_points, "select"):
+                group = entry_points.select(group=self.group)
+            else:  # pragma: no cover - Python 3.9
+                group = entry_points.get(self.group, ())
+            self._entry_points = {entry_point.name: entry_point for entry_point in group}
+
+        return self._entry_points
+
+
+_registries: dict[type, TypeRegistry] = {}
+
+
+def get_registry(base: type, group: Optional[str] = None) -> TypeRegistry:
+    if base not in _registries:
+        _registries[base] = TypeRegistry(base, group or f"sakura.{base.__name__.lower()}s")
+
+    return _registries[base]
+
+
 def list_factory(settings: dict, factory_type: type) -> list:
     objects = []
-    inheritors_dict = get_inheritors_dict(factory_type)
+    registry = get_registry(factory_type)
 
     for key, value in settings.items():
-        if key not in inheritors_dict:
+        if (object_type := registry.resolve(key)) is None:
             raise ValueError(f"Object of type {key} is not supported, check whether it's installed")
 
-        settings = inheritors_dict[key].Settings.from_dynaconf(value)
-        obj = inheritors_dict[key](settings)
-        objects.append(obj)
+        settings = object_type.Settings.from_dynaconf(value)
+        objects.append(object_type(settings))
 
     return objects
 
@@ -34,24 +112,20 @@ def list_factory(settings: dict, factory_type: type) -> list:
 # TODO: remove references to provider
 def dict_factory(settings: dict, parent_type: type) -> dict:
     objects: dict[str, object] = {}
-    inheritors_dict = get_inheritors_dict(parent_type)
+    registry = get_registry(parent_type)
 
     for name, value in settings.items():
-        if value["type"] not in inheritors_dict:
+        if (object_type := registry.resolve(value["type"])) is None:
             raise ValueError(f"Object of type {value['type']} is not supported, check whether it's installed")
 
-        settings = inheritors_dict[value["type"]].Settings.from_dynaconf(value["params"])
-
-        provider = inheritors_dict[value["type"]](settings)
-        objects[name] = provider
+        settings = object_type.Settings.from_dynaconf(value["params"])
+        objects[name] = object_type(settings)
 
     return objects
 
 
 def client_factory(settings: dict, client_type: str, factory_type: type):
-    inheritors_dict = get_inheritors_dict(factory_type)
-
-    if client_type not in inheritors_dict:
+    if (object_type := get_registry(factory_type).resolve(client_type)) is None:
         raise UnsupportedClientError
 
-    return inheritors_dict[client_type](**settings)
+    return object_type(**settings)